@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Benchmark of harmonic inversion (terapy.filters.harminv)
+
+    Usage:
+        python benchmarks/harminv.py [-n SAMPLES] [nf [nf ...]]
+
+    Times HarminvFilter.run() on a synthetic trace (three damped cosines
+    plus noise, 0.05 time step) for each given number of basis functions,
+    and prints the modes found. To compare two versions, run the script
+    on a checkout of each of them.
+
+"""
+
+import sys
+import argparse
+import numpy as np
+from time import time
+from terapy.filters.harminv import HarminvFilter
+
+def make_trace(N, seed=1):
+    """
+    
+        Build synthetic trace.
+        
+        Parameters:
+            N       -    number of samples (int)
+            seed    -    random noise seed (int)
+        
+        Output:
+            time step (float), trace (numpy array)
+    
+    """
+    dt = 0.05
+    t = np.arange(N)*dt
+    y = np.exp(-0.1*t)*np.cos(2*np.pi*1.3*t+0.3)
+    y += 0.5*np.exp(-0.05*t)*np.cos(2*np.pi*3.1*t)
+    y += 0.3*np.exp(-0.2*t)*np.cos(2*np.pi*6.0*t+1)
+    y += 1e-3*np.random.RandomState(seed).standard_normal(N)
+    return dt, y
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time harmonic inversion on a synthetic trace.")
+    parser.add_argument("nf", type=int, nargs="*", default=[100,200,300,400,500], help="numbers of basis functions (default: 100 200 300 400 500)")
+    parser.add_argument("-n", "--samples", type=int, default=4000, help="trace length (default: 4000)")
+    args = parser.parse_args(argv)
+
+    dt, y = make_trace(args.samples)
+    for nf in args.nf:
+        hf = HarminvFilter(signal=y, dt=dt, fmin=0, fmax=10, nf=nf)
+        t0 = time()
+        freqs, amps, decays = hf.run()[:3]
+        t1 = time()
+        modes = ["%0.4f (%0.4f)" % (f, abs(a)) for f, a in zip(np.ravel(freqs), np.ravel(amps)) if abs(a)>1e-2]
+        print "nf=%d: %0.2f s, modes: %s" % (nf, t1-t0, ", ".join(modes))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,7 +16,7 @@ setup(name='terapy',
       py_modules=['tera'],
       packages=['terapy','terapy.core','terapy.files','terapy.filters','terapy.hardware','terapy.hardware.axes','terapy.hardware.input','terapy.icons','terapy.plot','terapy.scan'],
       package_data={'terapy':['icons/*.png','icons/*.ico']},
-      entry_points={'console_scripts':['terapy = tera:main']},
+      entry_points={'console_scripts':['terapy = tera:main','terapy-batch = terapy.batch:main','terapy-export = terapy.plot.export:main']},
 	  console=['tera.py'],
 	  install_requires=['wxPython','matplotlib','numpy','scipy','pint','h5py', 'xlrd', 'xlwt', 'xlutils' ,'statsmodels', 'pyWavelets', 'pandas' ,'PyVISA'],
 )
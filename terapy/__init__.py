@@ -35,6 +35,7 @@ from wx.lib.pubsub import pub
 # plotting and data treatment
 from terapy.filters.control import FilterControl
 from terapy.plot.notebook import PlotNotebook
+from terapy.plot.scheduler import scheduler
 # filesystem handling
 from terapy.core import user_path
 import os
@@ -212,6 +213,8 @@ class TeraPyMainFrame(wx.Frame):
         menuFile = wx.Menu()
         mitem = menuFile.Append(wx.NewId(), "&Open scan")
         self.Bind(wx.EVT_MENU, self.OnLoad, id=mitem.Id)
+        mitem = menuFile.Append(wx.NewId(), "Search &measurements")
+        self.Bind(wx.EVT_MENU, self.OnCatalog, id=mitem.Id)
         menuFile.AppendSeparator()
         mitem = menuFile.Append(wx.NewId(), "&Settings")
         self.Bind(wx.EVT_MENU, self.OnSettings, id=mitem.Id)
@@ -590,6 +593,19 @@ class TeraPyMainFrame(wx.Frame):
         
         """
         pub.sendMessage("load_data")
+    
+    def OnCatalog(self, event = None):
+        """
+        
+            Show measurement search dialog.
+            
+            Parameters:
+                event    -    event object (wx.Event)
+        
+        """
+        from terapy.core.catalog import CatalogDialog
+        dlg = CatalogDialog(self)
+        dlg.Show()
                     
     def ToggleScanControls(self, inst = True):
         """
@@ -623,7 +639,8 @@ class TeraPyMainFrame(wx.Frame):
         # status bar
         pub.sendMessage("set_status_text",inst="Scan finished")
         
-        # update plots
+        # update plots, after last live updates
+        scheduler.flush()
         for x in meas.data:
             if x.plot!=None:
                 x.plot.Recompute()
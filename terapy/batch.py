@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Batch post-processing of measurement files with a saved filter bank
+
+    Usage:
+        terapy-batch [-h] [-o OUTPUT] [-f FORMAT] [-r REFERENCE] [-i INDEX]
+                     [-d DIM] [-a AXIS] [-j JOBS] [--overwrite] bank files [files ...]
+
+    Each data set of each input file is processed by the filter bank, and
+    results are written to the output folder with a file filter selected
+    from its extension. Files are processed in parallel by a process pool.
+    If input files share a name, their paths relative to their common folder
+    are kept in the output folder.
+
+"""
+
+import os
+import sys
+import argparse
+import traceback
+from multiprocessing import Pool, cpu_count
+
+bank = None # filter bank of current worker process
+
+def find_saver(ext):
+    """
+
+        Find file filter able to save files with given extension.
+
+        Parameters:
+            ext    -    file extension, without dot (str)
+
+        Output:
+            file filter (FileFilter), or None if not found
+
+    """
+    from terapy.files import modules
+    for x in modules:
+        ff = x()
+        if ff.can_save and ff.match_extension("file." + ext):
+            return ff
+    return None
+
+def output_names(fnames, folder):
+    """
+
+        Build unique output names, without extension, for given input files.
+        Output files are named after input files. If names clash (e.g. same
+        name in different folders), input paths relative to their common
+        folder are kept, and a number is appended to names still clashing.
+
+        Parameters:
+            fnames    -    input file names (list of str)
+            folder    -    output folder (str)
+
+        Output:
+            output names (list of str)
+
+    """
+    names = [os.path.splitext(os.path.basename(x))[0] for x in fnames]
+    if len(set(names))<len(names):
+        paths = [os.path.abspath(x) for x in fnames]
+        common = os.path.commonprefix([os.path.dirname(x) + os.sep for x in paths])
+        common = common[:common.rfind(os.sep)+1]
+        names = [os.path.relpath(os.path.splitext(x)[0], common) for x in paths]
+    res = []
+    for x in names:
+        name = x
+        n = 1
+        while res.count(name)>0 or (name!=x and names.count(name)>0):
+            n += 1
+            name = "%s_%d" % (x, n)
+        res.append(name)
+    return [os.path.join(folder, x) for x in res]
+
+def load_bank(fname, dim=1, reference=None, index=0, axis=None):
+    """
+
+        Load filter bank and compute its reference, if any.
+
+        Parameters:
+            fname        -    filter bank file name (str)
+            dim          -    dimension of data treated by bank (int)
+            reference    -    file containing reference data (str)
+            index        -    index of reference data set in reference file (int)
+            axis         -    axis along which 1D filters are applied (int), as saved in bank if None
+
+        Output:
+            filter bank (FilterBank)
+
+    """
+    from terapy.filters import FilterBank
+    from terapy import files
+    fb = FilterBank(children=[], filters=[], dim=dim)
+    fb.LoadFilterList(fname)
+    if axis!=None:
+        fb.SetAxis(axis)
+    if fb.HasReference():
+        if reference==None:
+            print "WARNING: filter bank has a reference filter, but no reference was given"
+        else:
+            data = files.read(reference)
+            if data==None or len(data)<=index:
+                raise IOError("can't read reference data from '" + reference + "'")
+            fb.ComputeReference(data[index])
+    return fb
+
+def init_worker(fname, dim, reference, index, axis=None):
+    """
+
+        Initialize worker process: load filter bank once per process.
+
+        Parameters:
+            see load_bank
+
+    """
+    global bank
+    bank = load_bank(fname, dim, reference, index, axis)
+
+def process_file(job):
+    """
+
+        Process given file with filter bank of current worker.
+
+        Parameters:
+            job    -    (input file name, output file name, output extension, overwrite) (tuple)
+
+        Output:
+            (input file name, number of processed data sets, error message or None) (tuple)
+
+    """
+    fname, oname, ext, overwrite = job
+    try:
+        from terapy import files
+        saver = find_saver(ext)
+        data = files.read(fname)
+        if data==None:
+            return fname, 0, "can't read file"
+        if saver.multi_data:
+            names = [oname]
+        else:
+            names = [oname] if len(data)==1 else ["%s.%d.%s" % (oname[:-len(ext)-1],n+1,ext) for n in range(len(data))]
+        for x in names:
+            if os.path.exists(x):
+                if not(overwrite):
+                    return fname, 0, "output file '" + x + "' exists"
+                os.remove(x)
+        count = 0
+        for n in range(len(data)):
+            if len(data[n].shape)!=bank.dim:
+                continue # incompatible data set
+            res = bank.ApplyFilters(data[n])
+            if saver.multi_data:
+                saver.save(names[0], res, name="M_"+str(n))
+            else:
+                saver.save(names[n], res)
+            count += 1
+        return fname, count, None
+    except:
+        return fname, 0, traceback.format_exc()
+
+def main(argv=None):
+    """
+
+        Command line entry point.
+
+        Parameters:
+            argv    -    command line arguments, sys.argv[1:] if None (list of str)
+
+        Output:
+            exit status (int)
+
+    """
+    parser = argparse.ArgumentParser(description="Apply a saved filter bank to measurement files.")
+    parser.add_argument("bank", help="filter bank file (.ini)")
+    parser.add_argument("files", nargs="+", help="measurement files")
+    parser.add_argument("-o", "--output", default=os.curdir, help="output folder (default: current folder)")
+    parser.add_argument("-f", "--format", default="h5", help="output file extension, selects file filter (default: h5)")
+    parser.add_argument("-r", "--reference", default=None, help="file containing reference data for reference filters")
+    parser.add_argument("-i", "--index", type=int, default=0, help="index of reference data set in reference file (default: 0)")
+    parser.add_argument("-d", "--dim", type=int, default=1, help="dimension of processed data (default: 1)")
+    parser.add_argument("-a", "--axis", type=int, default=None, help="axis along which 1D filters are applied to multi-dimensional data, from 0 (default: as saved in bank)")
+    parser.add_argument("-j", "--jobs", type=int, default=cpu_count(), help="number of worker processes (default: number of cores)")
+    parser.add_argument("--overwrite", action="store_true", help="overwrite existing output files")
+    args = parser.parse_args(argv)
+
+    ext = args.format.lstrip(".").lower()
+    if find_saver(ext)==None:
+        print "ERROR: no file filter can save '." + ext + "' files"
+        return 1
+    if not(os.path.isdir(args.output)):
+        os.makedirs(args.output)
+
+    # check bank and reference once before starting workers
+    try:
+        fb = load_bank(args.bank, args.dim, args.reference, args.index, args.axis)
+    except:
+        print "ERROR: can't load filter bank: " + str(sys.exc_info()[1])
+        return 1
+    if len(fb.filters)==0:
+        print "ERROR: no filters for dimension %d in '%s'" % (args.dim, args.bank)
+        return 1
+
+    jobs = []
+    for x, base in zip(args.files, output_names(args.files, args.output)):
+        if not(os.path.isdir(os.path.dirname(base))):
+            os.makedirs(os.path.dirname(base))
+        jobs.append((x, base + "." + ext, ext, args.overwrite))
+
+    pool = Pool(max(1,args.jobs), init_worker, (args.bank, args.dim, args.reference, args.index, args.axis))
+    failed = 0
+    try:
+        for fname, count, error in pool.imap_unordered(process_file, jobs):
+            if error==None:
+                print "%s: %d data set(s) processed" % (fname, count)
+            else:
+                failed += 1
+                print "ERROR: %s: %s" % (fname, error)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        return 1
+    pool.join()
+    print "%d file(s) processed, %d failed" % (len(jobs)-failed, failed)
+    return int(failed>0)
+
+if __name__ == "__main__":
+    sys.exit(main())
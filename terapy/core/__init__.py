@@ -23,6 +23,7 @@
 """
 
 import os
+import tempfile
 from xml.dom import minidom
 from terapy.core.storage import Storage
 import plotpanel
@@ -79,6 +80,10 @@ for cnd in candidates:
                         left_width = int(y.attributes['value'].value)
                     elif nn == 'right_width':
                         right_width = int(y.attributes['value'].value)
+                    elif nn == 'scratch_path':
+                        scratch_path = y.attributes['value'].value
+                    elif nn == 'history_budget':
+                        history_budget = float(y.attributes['value'].value)
                     elif nn == 'units':
                         default_units[str(y.attributes['type'].value)] = str(y.attributes['symbol'].value) 
         main_config_file = cnd
@@ -103,9 +108,13 @@ if not('left_width' in locals()):
     left_width = 200                    # min. width of left panel in pixels 
 if not('right_width' in locals()):
     right_width = 200                    # min. width of right panel in pixels 
+if not('scratch_path' in locals()):
+    scratch_path = tempfile.gettempdir() # where history data exceeding memory budget are written
+if not('history_budget' in locals()):
+    history_budget = 1024.0             # memory budget of history data (in MB)
 
 # test if folders exist
-for x in ['default_path', 'user_path', 'config_path', 'filter_path', 'module_path']:
+for x in ['default_path', 'user_path', 'config_path', 'filter_path', 'module_path', 'scratch_path']:
     if not(os.path.exists(locals()[x])):
         print "WARNING: %s = %s is invalid. Setting to %s" % (x, locals()[x], app_path)
         locals()[x] = app_path
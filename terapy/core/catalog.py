@@ -0,0 +1,405 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Catalog of saved measurements, and search dialog
+
+"""
+
+import os
+import wx
+import sqlite3
+import threading
+from time import time, strftime, localtime
+from wx.lib.pubsub import setupkwargs
+from wx.lib.pubsub import pub
+
+class Catalog():
+    """
+
+        Catalog of saved measurements
+
+        Metadata of data sets contained in measurement files are stored in an
+        SQLite database. Indexed folders are scanned incrementally: only files
+        whose modification time or size changed are read again.
+
+    """
+    def __init__(self, fname=None):
+        """
+
+            Initialization.
+
+            Parameters:
+                fname    -    database file name (str), catalog.db in configuration folder if None
+
+        """
+        if fname==None:
+            from terapy.core import config_path
+            fname = os.path.join(config_path, "catalog.db")
+        self.fname = fname
+        db = self.Connect()
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER);
+            CREATE TABLE IF NOT EXISTS datasets (path TEXT, position INTEGER, name TEXT, dim INTEGER, shape TEXT,
+                axes TEXT, input TEXT, devices TEXT, sequence TEXT, time REAL, text TEXT);
+            CREATE INDEX IF NOT EXISTS datasets_path ON datasets (path);
+            CREATE INDEX IF NOT EXISTS datasets_time ON datasets (time);
+        """)
+        db.commit()
+        db.close()
+
+    def Connect(self):
+        """
+
+            Open connection to database.
+            A new connection is needed in each thread.
+
+            Output:
+                connection (sqlite3.Connection)
+
+        """
+        return sqlite3.connect(self.fname)
+
+    def GetFolders(self):
+        """
+
+            Return indexed folders.
+
+            Output:
+                folder names (list of str)
+
+        """
+        db = self.Connect()
+        folders = [x[0] for x in db.execute("SELECT path FROM folders ORDER BY path")]
+        db.close()
+        return folders
+
+    def AddFolder(self, path):
+        """
+
+            Add folder to indexed folders.
+
+            Parameters:
+                path    -    folder name (str)
+
+        """
+        db = self.Connect()
+        db.execute("INSERT OR IGNORE INTO folders VALUES (?)", (os.path.abspath(path),))
+        db.commit()
+        db.close()
+
+    def Update(self, folders=None, callback=None):
+        """
+
+            Index new and modified files in given folders, and forget deleted files.
+
+            Parameters:
+                folders     -    folder names (list of str), all indexed folders if None
+                callback    -    function called with number of checked files and current file name (function)
+
+            Output:
+                number of (read, removed) files (tuple)
+
+        """
+        from terapy import files
+        if folders==None:
+            folders = self.GetFolders()
+        readers = [x() for x in files.modules if x().can_read]
+        db = self.Connect()
+        known = dict([(x[0], (x[1], x[2])) for x in db.execute("SELECT path, mtime, size FROM files")])
+        seen = set()
+        read = 0
+        count = 0
+        for folder in folders:
+            for root, dirs, fnames in os.walk(folder):
+                for x in fnames:
+                    fname = os.path.join(root, x)
+                    if not(any([ff.match_extension(fname) for ff in readers])):
+                        continue
+                    try:
+                        st = os.stat(fname)
+                    except OSError:
+                        continue
+                    seen.add(fname)
+                    count += 1
+                    if callback!=None and count%100==0:
+                        callback(count, fname)
+                    if known.get(fname)==(st.st_mtime, st.st_size):
+                        continue # unchanged
+                    info = files.read_info(fname)
+                    db.execute("DELETE FROM datasets WHERE path=?", (fname,))
+                    if info!=None:
+                        for n in range(len(info)):
+                            db.execute("INSERT INTO datasets VALUES (?,?,?,?,?,?,?,?,?,?,?)", self.MakeRow(fname, n, info[n], st.st_mtime))
+                    db.execute("INSERT OR REPLACE INTO files VALUES (?,?,?)", (fname, st.st_mtime, st.st_size))
+                    read += 1
+        # forget files that disappeared from indexed folders
+        removed = 0
+        for fname in known.keys():
+            if not(fname in seen) and any([fname.startswith(os.path.join(x,"")) for x in folders]):
+                db.execute("DELETE FROM datasets WHERE path=?", (fname,))
+                db.execute("DELETE FROM files WHERE path=?", (fname,))
+                removed += 1
+        db.commit()
+        db.close()
+        return read, removed
+
+    def MakeRow(self, fname, position, info, mtime):
+        """
+
+            Build database row from data set metadata.
+
+            Parameters:
+                fname       -    file name (str)
+                position    -    data set position in file (int)
+                info        -    metadata (dict, see terapy.files.base.make_info)
+                mtime       -    file modification time, used if measurement time is unknown (float)
+
+            Output:
+                row (tuple)
+
+        """
+        shape = "x".join([str(x) for x in info['shape']])
+        axes = "; ".join(info['axes'])
+        devices = "; ".join(info['devices'])
+        t = info['time'] if info['time']!=None else mtime
+        text = " ".join([info['name'], info['sequence'], axes, info['input'], devices, os.path.basename(fname)]).lower()
+        return (fname, position, info['name'], len(info['shape']), shape, axes, info['input'], devices, info['sequence'], t, text)
+
+    def Search(self, text="", dim=0, limit=1000):
+        """
+
+            Search data sets matching given words.
+
+            Parameters:
+                text     -    words that must all appear in metadata (str)
+                dim      -    data set dimension, any if 0 (int)
+                limit    -    max. number of results (int)
+
+            Output:
+                matching data sets, most recent first (list of tuples (path, position, name, shape, sequence, time))
+
+        """
+        where = []
+        args = []
+        for x in text.lower().split():
+            where.append("text LIKE ?")
+            args.append("%" + x + "%")
+        if dim>0:
+            where.append("dim=?")
+            args.append(dim)
+        query = "SELECT path, position, name, shape, sequence, time FROM datasets"
+        if len(where)>0:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY time DESC LIMIT ?"
+        args.append(limit)
+        db = self.Connect()
+        result = db.execute(query, args).fetchall()
+        db.close()
+        return result
+
+class CatalogDialog(wx.Dialog):
+    """
+
+        Measurement search dialog
+
+    """
+    def __init__(self, parent = None, title="Search measurements"):
+        """
+
+            Initialization.
+
+            Parameters:
+                parent    -    parent window (wx.Window)
+                title     -    dialog title (str)
+
+        """
+        wx.Dialog.__init__(self, parent, title=title, size=(700,450), style=wx.DEFAULT_DIALOG_STYLE|wx.RESIZE_BORDER)
+        self.catalog = Catalog()
+        self.results = []
+
+        self.text_search = wx.SearchCtrl(self, -1, style=wx.TE_PROCESS_ENTER)
+        self.choice_dim = wx.Choice(self, -1, choices=["Any dimension","1D","2D","3D","4D"])
+        self.choice_dim.SetSelection(0)
+        self.list = wx.ListCtrl(self, -1, style=wx.LC_REPORT)
+        for n, x in enumerate(["Name","Sequence","Shape","Time","File"]):
+            self.list.InsertColumn(n, x)
+        self.label_status = wx.StaticText(self, -1, "")
+        self.button_folder = wx.Button(self, -1, "Add folder...")
+        self.button_update = wx.Button(self, -1, "Update index")
+        self.button_load = wx.Button(self, -1, "Load")
+        self.button_close = wx.Button(self, wx.ID_CLOSE)
+
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        hbox.Add(self.text_search, 1, wx.RIGHT|wx.EXPAND, 2)
+        hbox.Add(self.choice_dim, 0, wx.EXPAND)
+        bbox = wx.BoxSizer(wx.HORIZONTAL)
+        bbox.Add(self.button_folder, 0, wx.RIGHT, 5)
+        bbox.Add(self.button_update, 0, wx.RIGHT, 5)
+        bbox.AddStretchSpacer(1)
+        bbox.Add(self.button_load, 0, wx.RIGHT, 5)
+        bbox.Add(self.button_close, 0, wx.RIGHT, 5)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(hbox, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.list, 1, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_status, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(bbox, 0, wx.ALL|wx.EXPAND, 2)
+        self.SetSizer(sizer)
+
+        self.Bind(wx.EVT_TEXT, self.OnSearch, self.text_search)
+        self.Bind(wx.EVT_CHOICE, self.OnSearch, self.choice_dim)
+        self.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.OnLoad, self.list)
+        self.Bind(wx.EVT_BUTTON, self.OnAddFolder, self.button_folder)
+        self.Bind(wx.EVT_BUTTON, self.OnUpdate, self.button_update)
+        self.Bind(wx.EVT_BUTTON, self.OnLoad, self.button_load)
+        self.Bind(wx.EVT_BUTTON, lambda x: self.Close(), self.button_close)
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
+
+        if len(self.catalog.GetFolders())==0:
+            # index data folders by default
+            from terapy.core import default_path, user_path
+            for x in [default_path, user_path]:
+                self.catalog.AddFolder(x)
+        self.OnSearch()
+
+    def OnSearch(self, event=None):
+        """
+
+            Search catalog and display results.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        t0 = time()
+        self.results = self.catalog.Search(self.text_search.GetValue(), self.choice_dim.GetSelection())
+        t1 = time()
+        self.list.Freeze()
+        self.list.DeleteAllItems()
+        for x in self.results:
+            n = self.list.InsertStringItem(self.list.GetItemCount(), x[2])
+            self.list.SetStringItem(n, 1, x[4])
+            self.list.SetStringItem(n, 2, x[3])
+            self.list.SetStringItem(n, 3, strftime("%Y-%m-%d %H:%M:%S", localtime(x[5])))
+            self.list.SetStringItem(n, 4, x[0])
+        for n in range(5):
+            self.list.SetColumnWidth(n, wx.LIST_AUTOSIZE_USEHEADER)
+        self.list.Thaw()
+        self.label_status.SetLabel("%d data set(s) found in %0.1f ms" % (len(self.results), (t1-t0)*1000))
+
+    def OnAddFolder(self, event=None):
+        """
+
+            Ask user for folder to index, and index it.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        dlg = wx.DirDialog(self, "Choose folder to index")
+        if dlg.ShowModal() == wx.ID_OK:
+            self.catalog.AddFolder(dlg.GetPath())
+            self.OnUpdate()
+        dlg.Destroy()
+
+    def OnUpdate(self, event=None):
+        """
+
+            Update index in background.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        self.button_update.Enable(False)
+        self.button_folder.Enable(False)
+        self.label_status.SetLabel("Updating index...")
+        threading.Thread(target=self.UpdateThread).start()
+
+    def UpdateThread(self):
+        """
+
+            Update index. Run in separate thread.
+
+        """
+        callback = lambda n, fname: wx.CallAfter(self.ShowProgress, "Updating index... (%d files checked)" % (n))
+        try:
+            read, removed = self.catalog.Update(callback=callback)
+            msg = "Index updated: %d file(s) read, %d removed" % (read, removed)
+        except:
+            msg = "Index update failed"
+        wx.CallAfter(self.OnUpdated, msg)
+
+    def ShowProgress(self, msg):
+        """
+
+            Show progress message, if dialog still exists.
+
+            Parameters:
+                msg    -    message (str)
+
+        """
+        if self:
+            self.label_status.SetLabel(msg)
+
+    def OnUpdated(self, msg):
+        """
+
+            Actions triggered when index update is over.
+
+            Parameters:
+                msg    -    status message (str)
+
+        """
+        if not(self):
+            return # dialog closed meanwhile
+        self.button_update.Enable(True)
+        self.button_folder.Enable(True)
+        self.OnSearch()
+        self.label_status.SetLabel(msg)
+
+    def OnLoad(self, event=None):
+        """
+
+            Load files of selected data sets in history.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        paths = []
+        n = self.list.GetFirstSelected()
+        while n>-1:
+            if paths.count(self.results[n][0])==0:
+                paths.append(self.results[n][0])
+            n = self.list.GetNextSelected(n)
+        if len(paths)>0:
+            pub.sendMessage("history.load_files", inst=paths)
+
+    def OnClose(self, event=None):
+        """
+
+            Actions triggered when dialog is closed.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        self.Destroy()
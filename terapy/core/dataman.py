@@ -356,6 +356,7 @@ class DataArray():
         self.filename = "" # file name
         self.input = None # input device
         self.axes = [None]*len(shape) # axis devices
+        self.timestamps = None # acquisition times, in seconds since epoch (array of same shape as data, if recorded)
         map(lambda x: self.coords.append(np.zeros(x)),shape)
     
     def Increment(self,dim):
@@ -489,6 +490,7 @@ class DataArray():
         narray.name = self.name
         narray.scanDim = self.scanDim
         narray.filename = self.filename
+        narray.timestamps = self.timestamps
         try:
             narray.input = self.input.copy()
             narray.axes = [x.copy() for x in self.axes]
@@ -25,6 +25,8 @@
 import sys
 import wx
 import os
+import threading
+from multiprocessing.pool import ThreadPool
 from terapy import files
 from terapy.core.dragdrop import HistoryDrop, HistoryDragObject
 from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
@@ -33,6 +35,7 @@ from wx.lib.pubsub import pub
 from terapy.core import icon_path
 from terapy.icons import DataIconList
 from terapy.core.dataman import DataArray
+from terapy.core.storage import ArrayStore
 
 class HistoryMixin(object):
     """
@@ -50,6 +53,7 @@ class HistoryMixin(object):
         self.id = -sys.maxint
         self.map = {}
         self.ref = {}
+        self.store = ArrayStore() # keeps data arrays within memory budget
         self.Bind(wx.EVT_LIST_DELETE_ITEM, self.OnDeleteItem)
         self.Bind(wx.EVT_LIST_DELETE_ALL_ITEMS, self.OnDeleteAllItems)
         pub.subscribe(self.BroadcastArrays, "request_arrays")
@@ -64,7 +68,10 @@ class HistoryMixin(object):
          
         """
         try:
+            data = self.map[event.Data]
             del self.map[event.Data]
+            # release data later, as item may be re-inserted right away (e.g. when moved)
+            wx.CallAfter(self.ReleaseData, data)
             self.BroadcastArrays()
         except KeyError:
             pass
@@ -80,8 +87,33 @@ class HistoryMixin(object):
          
         """
         self.map.clear()
+        self.store.Clear()
         pub.sendMessage("history.arrays", inst=[])
         event.Skip()
+    
+    def ReleaseData(self, data):
+        """
+        
+            Unregister data from array store, if no item is associated with them anymore
+            
+            Parameters:
+                data    -    data (any type)
+        
+        """
+        if isinstance(data,DataArray) and self.GetItemId(data)==0:
+            self.store.Remove(data)
+    
+    def ShowStoreStatus(self, count=1):
+        """
+        
+            Show memory usage of array store in status bar
+            
+            Parameters:
+                count    -    number of arrays moved to or from disk, nothing shown if 0 (int)
+        
+        """
+        if count>0:
+            pub.sendMessage("set_status_text", inst=self.store.GetStatus())
 
     def SetItemPyData(self, idp, data):
         """
@@ -100,6 +132,8 @@ class HistoryMixin(object):
             self.id += 1
         else:
             self.map[idx] = data
+        if isinstance(data,DataArray):
+            self.ShowStoreStatus(self.store.Add(data))
         self.BroadcastArrays()
             
     def GetItemPyData(self, idp):
@@ -344,6 +378,8 @@ class HistoryControl(wx.Panel):
         pub.subscribe(self.OnLoad, 'load_data')
         pub.subscribe(self.SetCanvas, 'broadcast_canvas')
         pub.subscribe(self.SetWindow, 'broadcast_window')
+        pub.subscribe(self.OnScanFinished, 'scan.after')
+        pub.subscribe(self.OnLoadFiles, 'history.load_files')
     
     def Move(self, disp):
         """
@@ -413,38 +449,84 @@ class HistoryControl(wx.Panel):
         
         """
         # load previous scan data 
-        dialog = wx.FileDialog(self, "Choose input file", os.getcwd(),"", files.read_wildcards(), wx.OPEN)
+        dialog = wx.FileDialog(self, "Choose input file", os.getcwd(),"", files.read_wildcards(), wx.OPEN|wx.MULTIPLE)
         if dialog.ShowModal() == wx.ID_OK:
-            # actualize canvas reference
-            pub.sendMessage('request_canvas')
-            #
-            pub.sendMessage("set_status_text",inst="Loading old scan data...")
-            for ff in files.modules:
-                data = None
-                if ff().can_read:
-                    try:
-                        data = ff().read(dialog.GetPath())
-                    except:
-                        pass
-                if data!=None:
-                    break
-            for x in data:
-                # fix axes list in case it isn't the right length
-                if len(x.axes)<len(x.shape):
-                    x.axes.extend([None]*(len(x.shape)-len(x.axes)))
-                elif len(x.axes)>len(x.shape):
-                    x.axes = x.axes[:len(x.shape)]
-                # add plot entry to list
-                self.list.InsertImageStringItem(0,x.name,len(x.shape))
-                self.list.SetItemPyData(0,x)
-                # add plot to appropriate plot canvas
-                x.plot = self.canvas.AddPlot(array=x)
-                if len(x.shape)==2: # 2D
-                    x.plot.SetName(x.name)
-                pub.sendMessage("plot.color_change")
-                #pub.sendMessage("history.post_process",data=x)
-        pub.sendMessage("set_status_text",inst="Finished!")
+            self.LoadFiles(dialog.GetPaths())
         dialog.Destroy()
+    
+    def OnLoadFiles(self, inst):
+        """
+        
+            Actions triggered by file load request.
+            
+            Parameters:
+                inst    -    file names (list of str)
+        
+        """
+        self.LoadFiles(inst)
+    
+    def LoadFiles(self, paths):
+        """
+        
+            Load given files in background and insert their content in history as it comes.
+            
+            Parameters:
+                paths    -    file names (list of str)
+        
+        """
+        if len(paths)==0:
+            return
+        # actualize canvas reference
+        pub.sendMessage('request_canvas')
+        pub.sendMessage("set_status_text",inst="Loading old scan data...")
+        threading.Thread(target=self.LoadThread, args=(list(paths),)).start()
+    
+    def LoadThread(self, paths):
+        """
+        
+            Read given files on a worker pool. Run in separate thread.
+            
+            Parameters:
+                paths    -    file names (list of str)
+        
+        """
+        pool = ThreadPool(min(len(paths),4))
+        n = 0
+        for data in pool.imap_unordered(files.read, paths):
+            n+=1
+            wx.CallAfter(self.AddData, data)
+            wx.CallAfter(pub.sendMessage, "set_status_text", inst="Loading old scan data... (%d/%d)" % (n,len(paths)))
+        pool.close()
+        wx.CallAfter(pub.sendMessage, "set_status_text", inst="Finished!")
+    
+    def AddData(self, data):
+        """
+        
+            Insert loaded data in history and plot them.
+            
+            Parameters:
+                data    -    loaded data (list of DataArray)
+        
+        """
+        if data==None:
+            return
+        for x in data:
+            # fix axes list in case it isn't the right length
+            if len(x.axes)<len(x.shape):
+                x.axes.extend([None]*(len(x.shape)-len(x.axes)))
+            elif len(x.axes)>len(x.shape):
+                x.axes = x.axes[:len(x.shape)]
+            # add plot entry to list, data are kept in memory until plotted
+            self.list.store.Pin(x)
+            self.list.InsertImageStringItem(0,x.name,len(x.shape))
+            self.list.SetItemPyData(0,x)
+            # add plot to appropriate plot canvas
+            x.plot = self.canvas.AddPlot(array=x)
+            self.list.store.Pin(x, False)
+            if len(x.shape)==2: # 2D
+                x.plot.SetName(x.name)
+            pub.sendMessage("plot.color_change")
+            #pub.sendMessage("history.post_process",data=x)
 
     def SetCanvas(self, inst):
         """
@@ -496,12 +578,33 @@ class HistoryControl(wx.Panel):
         if array.plot!=None: # a plot exists, must be removed
             array.plot.Delete()
             array.plot = None
+            # hidden data may now be written to disk
+            self.list.ShowStoreStatus(self.list.store.Touch(array))
         else:
+            # load data back from disk if needed
+            count = int(self.list.store.IsSpilled(array))
+            self.list.store.Load(array)
             # actualize canvas reference
             pub.sendMessage('request_canvas')
             array.plot = self.canvas.AddPlot(target="current",array=array)
+            self.list.ShowStoreStatus(count + self.list.store.Enforce())
         pub.sendMessage("plot.color_change")
     
+    def OnScanFinished(self, inst=None):
+        """
+        
+            Actions triggered at the end of a measurement.
+            
+            Parameters:
+                inst    -    pubsub data (Measurement)
+        
+        """
+        if inst==None: return
+        # measured data may now be written to disk
+        for x in inst.data:
+            self.list.store.Pin(x, False)
+        self.list.ShowStoreStatus(self.list.store.Enforce())
+    
     def OnPlotDeleted(self, event=None):
         """
         
@@ -678,7 +781,8 @@ class HistoryControl(wx.Panel):
             ext = " " + str(n)
             n+=1
         name = name + ext
-        # insert item
+        # insert item, data are kept in memory while being measured
+        self.list.store.Pin(arr)
         self.list.InsertImageStringItem(pos,name,len(arr.shape))
         self.list.SetItemPyData(0,arr)
         # return modified name
@@ -697,6 +801,7 @@ class HistoryControl(wx.Panel):
         self.TagAsReference(inst)
         self.ChangeReference(inst)
         arr = self.list.GetItemPyData(inst)
+        self.list.store.Load(arr)
         pub.sendMessage('history.set_reference', inst=arr)
     
     def ChangeReference(self, inst):
@@ -26,7 +26,7 @@ import wx.grid
 from terapy.core.validator import PositiveFloatValidator, PositiveIntegerValidator
 from collections import OrderedDict
 
-settings = OrderedDict([('default_path',['Backup folder','f']),('user_path',['User folder','f']),('config_path',['Configuration folder','f']),('filter_path',['Filter bank folder','f']),('module_path',['Module folder','f']),('refresh_delay',['Refresh delay during scan','n']),('left_width',['Min. width of left panel (px)','i']),('right_width',['Min. width of right panel (px)','i'])])
+settings = OrderedDict([('default_path',['Backup folder','f']),('user_path',['User folder','f']),('config_path',['Configuration folder','f']),('filter_path',['Filter bank folder','f']),('module_path',['Module folder','f']),('refresh_delay',['Refresh delay during scan','n']),('left_width',['Min. width of left panel (px)','i']),('right_width',['Min. width of right panel (px)','i']),('scratch_path',['Scratch folder','f']),('history_budget',['Memory budget of history (MB)','n'])])
 
 class SettingsDialog(wx.Dialog):
     """
@@ -18,10 +18,17 @@
 
 """
 
-   Simple storage class 
+   Storage classes
 
 """
 
+import os
+import shutil
+import atexit
+import tempfile
+import numpy as np
+from collections import OrderedDict
+
 class Storage():
     def __init__(self):
         self._taglist = []
@@ -45,3 +52,284 @@ class Storage():
         
     def GetTags(self):
         return self._taglist
+
+class ArrayStore():
+    """
+    
+        Memory-bounded store of data arrays
+        
+        Data of registered arrays are kept in memory up to a given budget.
+        Beyond it, data of least recently used arrays are written to native files
+        in a scratch folder and replaced by copy-on-write memory maps of these
+        files, such that they remain readable. Arrays are loaded back in memory when needed.
+        Displayed (plot!=None) and pinned arrays are never written to disk.
+    
+    """
+    def __init__(self, budget=None, path=None):
+        """
+        
+            Initialization.
+            
+            Parameters:
+                budget    -    memory budget in bytes (int), history_budget setting if None
+                path      -    parent folder of scratch files (str), scratch_path setting if None
+        
+        """
+        self.budget = budget
+        self.path = path
+        self.folder = None # scratch folder, created when needed
+        self.arrays = OrderedDict() # registered arrays, least recently used first
+        self.files = {} # scratch file names of arrays written to disk
+        self.pinned = []
+        from terapy.files.native import Native
+        self.filter = Native() # scratch file format
+    
+    def GetBudget(self):
+        """
+        
+            Return memory budget.
+            
+            Output:
+                budget in bytes (int)
+        
+        """
+        if self.budget==None:
+            from terapy.core import history_budget
+            return int(history_budget*2**20)
+        return self.budget
+    
+    def GetFolder(self):
+        """
+        
+            Return scratch folder, create it if needed.
+            
+            Output:
+                folder name (str)
+        
+        """
+        if self.folder==None:
+            path = self.path
+            if path==None:
+                from terapy.core import scratch_path
+                path = scratch_path
+            self.folder = tempfile.mkdtemp(prefix="terapy-", dir=path)
+            atexit.register(self.Clear)
+        return self.folder
+    
+    def Add(self, array):
+        """
+        
+            Register data array, and enforce memory budget.
+            
+            Parameters:
+                array    -    data array (DataArray)
+            
+            Output:
+                number of arrays written to disk (int)
+        
+        """
+        self.arrays[id(array)] = array
+        return self.Touch(array)
+    
+    def Remove(self, array):
+        """
+        
+            Unregister data array, and delete its scratch file.
+            
+            Parameters:
+                array    -    data array (DataArray)
+        
+        """
+        key = id(array)
+        if self.arrays.has_key(key):
+            del self.arrays[key]
+        if self.pinned.count(array)>0:
+            self.pinned.remove(array)
+        if self.files.has_key(key):
+            try:
+                os.remove(self.files[key])
+            except:
+                pass # file still mapped (Windows), removed with scratch folder
+            del self.files[key]
+    
+    def Clear(self):
+        """
+        
+            Unregister all arrays, and delete scratch folder.
+        
+        """
+        self.arrays.clear()
+        self.files.clear()
+        self.pinned = []
+        if self.folder!=None:
+            shutil.rmtree(self.folder, ignore_errors=True)
+            self.folder = None
+    
+    def Pin(self, array, state=True):
+        """
+        
+            Pin/unpin data array, e.g. while it is being measured.
+            
+            Parameters:
+                array    -    data array (DataArray)
+                state    -    if True, array is kept in memory (bool)
+        
+        """
+        if state:
+            self.Load(array)
+            if self.pinned.count(array)==0:
+                self.pinned.append(array)
+        elif self.pinned.count(array)>0:
+            self.pinned.remove(array)
+    
+    def Touch(self, array):
+        """
+        
+            Mark data array as most recently used, and enforce memory budget.
+            
+            Parameters:
+                array    -    data array (DataArray)
+            
+            Output:
+                number of arrays written to disk (int)
+        
+        """
+        key = id(array)
+        if self.arrays.has_key(key):
+            del self.arrays[key]
+            self.arrays[key] = array
+        return self.Enforce()
+    
+    def IsSpilled(self, array):
+        """
+        
+            Tell if data of given array are on disk.
+            
+            Parameters:
+                array    -    data array (DataArray)
+            
+            Output:
+                True/False
+        
+        """
+        return self.files.has_key(id(array))
+    
+    def Spill(self, array):
+        """
+        
+            Write data and coordinates of given array to disk, and map them back from file.
+            
+            Parameters:
+                array    -    data array (DataArray)
+        
+        """
+        key = id(array)
+        if self.files.has_key(key):
+            return
+        fname = os.path.join(self.GetFolder(), "%x.tpd" % (key))
+        self.filter.create(fname)
+        self.filter.save(fname, array)
+        self.files[key] = fname
+        spilled = self.filter.read(fname)[0]
+        array.data = spilled.data
+        array.coords = spilled.coords
+        array.timestamps = spilled.timestamps
+    
+    def Load(self, array):
+        """
+        
+            Load data of given array back in memory, and delete scratch file.
+            Array is marked as most recently used.
+            
+            Parameters:
+                array    -    data array (DataArray)
+        
+        """
+        key = id(array)
+        if self.arrays.has_key(key):
+            del self.arrays[key]
+            self.arrays[key] = array
+        if not(self.files.has_key(key)):
+            return
+        array.data = np.array(array.data)
+        array.coords = [np.array(x) for x in array.coords]
+        if array.timestamps is not None:
+            array.timestamps = np.array(array.timestamps)
+        fname = self.files.pop(key)
+        try:
+            os.remove(fname)
+        except:
+            pass
+    
+    def Enforce(self):
+        """
+        
+            Write least recently used arrays to disk until memory budget is met.
+            
+            Output:
+                number of arrays written to disk (int)
+        
+        """
+        budget = self.GetBudget()
+        size = self.GetResidentSize()
+        count = 0
+        for x in self.arrays.values():
+            if size<=budget:
+                break
+            if self.IsSpilled(x) or x.plot!=None or self.pinned.count(x)>0 or not(isinstance(x.data,np.ndarray)):
+                continue
+            size -= x.data.nbytes
+            self.Spill(x)
+            count += 1
+        return count
+    
+    def GetResidentSize(self):
+        """
+        
+            Return size of data kept in memory.
+            
+            Output:
+                size in bytes (int)
+        
+        """
+        return sum([x.data.nbytes for x in self.arrays.values() if not(self.IsSpilled(x)) and isinstance(x.data,np.ndarray)])
+    
+    def GetSpilledSize(self):
+        """
+        
+            Return size of data written to disk.
+            
+            Output:
+                size in bytes (int)
+        
+        """
+        return sum([x.data.nbytes for x in self.arrays.values() if self.IsSpilled(x)])
+    
+    def GetStatus(self):
+        """
+        
+            Return memory usage summary.
+            
+            Output:
+                summary (str)
+        
+        """
+        return "History: %s in memory, %s on disk" % (FormatSize(self.GetResidentSize()), FormatSize(self.GetSpilledSize()))
+
+def FormatSize(size):
+    """
+    
+        Format size in bytes with suitable unit.
+        
+        Parameters:
+            size    -    size in bytes (int)
+        
+        Output:
+            formatted size (str)
+    
+    """
+    for unit in ["B","kB","MB","GB"]:
+        if size<1024.0:
+            return "%0.1f %s" % (size, unit)
+        size /= 1024.0
+    return "%0.1f TB" % (size)
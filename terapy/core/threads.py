@@ -23,6 +23,9 @@
 """
 
 import threading
+import traceback
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 from time import sleep
 from terapy.core import refresh_delay
 from wx.lib.pubsub import setupkwargs
@@ -155,3 +158,127 @@ class WidgetUpdateThread(threading.Thread):
 	
 	def stop(self):
 		self.can_run = False
+
+class PostProcessPool():
+	"""
+	
+		Pool of worker threads evaluating filter banks away from GUI thread.
+		
+		Jobs are submitted by owner (e.g. a canvas or a plot) and generation.
+		Starting a new generation for an owner makes its pending jobs stale:
+		they are skipped if not started yet, and their results are discarded.
+		Results are delivered on GUI thread.
+	
+	"""
+	def __init__(self, size=None):
+		"""
+		
+			Initialization.
+			
+			Parameters:
+				size	-	number of worker threads, default is number of cores (int)
+		
+		"""
+		self.size = size
+		self.pool = None # created on first job
+		self.generations = {}
+		self.lock = threading.Lock()
+	
+	def new_generation(self, owner):
+		"""
+		
+			Start new job generation for given owner, and cancel older jobs.
+			
+			Parameters:
+				owner	-	job owner (object)
+			
+			Output:
+				generation number (int)
+		
+		"""
+		with self.lock:
+			gen = self.generations.get(id(owner),0) + 1
+			self.generations[id(owner)] = gen
+		return gen
+	
+	def cancel(self, owner):
+		"""
+		
+			Cancel all jobs of given owner.
+			
+			Parameters:
+				owner	-	job owner (object)
+		
+		"""
+		self.new_generation(owner)
+	
+	def is_current(self, owner, gen):
+		"""
+		
+			Tell if given generation is the current one for given owner.
+			
+			Parameters:
+				owner	-	job owner (object)
+				gen		-	generation number (int)
+			
+			Output:
+				True/False
+		
+		"""
+		with self.lock:
+			return self.generations.get(id(owner),0)==gen
+	
+	def submit(self, owner, gen, func, args, callback):
+		"""
+		
+			Submit job computing func(*args).
+			
+			Parameters:
+				owner		-	job owner (object)
+				gen			-	generation number, as returned by new_generation (int)
+				func		-	function to evaluate (function)
+				args		-	function arguments (tuple)
+				callback	-	function called on GUI thread with result (None on failure), if still current (function)
+		
+		"""
+		if self.pool==None:
+			self.pool = ThreadPool(self.size or cpu_count())
+		self.pool.apply_async(self.run, (owner, gen, func, args), callback=lambda result: self.deliver(owner, gen, callback, result))
+	
+	def run(self, owner, gen, func, args):
+		"""
+		
+			Evaluate job in worker thread.
+			
+			Output:
+				function output, or None if job is stale or failed
+		
+		"""
+		if not(self.is_current(owner, gen)):
+			return None
+		try:
+			return func(*args)
+		except:
+			# a stale job may fail because its filter bank changed meanwhile
+			if self.is_current(owner, gen):
+				traceback.print_exc()
+			return None
+	
+	def deliver(self, owner, gen, callback, result):
+		"""
+		
+			Forward job result to GUI thread.
+		
+		"""
+		wx.CallAfter(self.post, owner, gen, callback, result)
+	
+	def post(self, owner, gen, callback, result):
+		"""
+		
+			Call job callback on GUI thread, unless job became stale.
+		
+		"""
+		if self.is_current(owner, gen):
+			callback(result)
+
+postprocess_pool = PostProcessPool() # shared pool for post-processing
@@ -109,3 +109,70 @@ def save_wildcards(allfiles=True):
         return wc + "All files (*.*)|*.*"
     else:
         return wc[:-1]
+
+def find_filters(fname):
+    """
+    
+        Find file filters able to read given file, from file signature and extension.
+        
+        Parameters:
+            fname    -    file name (str)
+        
+        Output:
+            file filter classes, most likely first (list of FileFilter classes)
+    
+    """
+    header = FileFilter().read_header(fname)
+    scores = []
+    for x in modules:
+        try:
+            scores.append(x().probe(fname, header))
+        except:
+            scores.append(0)
+    candidates = [modules[n] for n in sorted(range(len(modules)), key=lambda n: -scores[n]) if scores[n]>0]
+    if len(candidates)==0:
+        # unknown file type => try all readers
+        candidates = [x for x in modules if x().can_read]
+    return candidates
+
+def read(fname):
+    """
+    
+        Read given file with appropriate file filter.
+        
+        Parameters:
+            fname    -    file name (str)
+        
+        Output:
+            data (list of DataArray), or None if file can't be read
+    
+    """
+    for ff in find_filters(fname):
+        try:
+            data = ff().read(fname)
+        except:
+            data = None
+        if data!=None:
+            return data
+    return None
+
+def read_info(fname):
+    """
+    
+        Read metadata of data sets contained in given file, with appropriate file filter.
+        
+        Parameters:
+            fname    -    file name (str)
+        
+        Output:
+            metadata (list of dict, see base.make_info), or None if file can't be read
+    
+    """
+    for ff in find_filters(fname):
+        try:
+            info = ff().read_info(fname)
+        except:
+            info = None
+        if info!=None:
+            return info
+    return None
@@ -23,6 +23,9 @@
 """
 
 import os
+from fnmatch import fnmatch
+from xml.dom import minidom
+
 class FileFilter():
     """
     
@@ -35,6 +38,7 @@ class FileFilter():
         self.can_save = True
         self.can_read = True
         self.multi_data = False
+        self.magic = [] # file signatures (list of str)
     
     def read(self,fname):
         """
@@ -49,6 +53,25 @@ class FileFilter():
         
         """
         return []
+    
+    def read_info(self, fname):
+        """
+        
+            Read metadata of data sets contained in given file.
+            By default, whole file is read. Filters able to read metadata
+            alone should override this.
+            
+            Parameters:
+                fname    -    file name (str)
+            
+            Output:
+                metadata of each data set (list of dict, see make_info), or None if file can't be read
+        
+        """
+        data = self.read(fname)
+        if data==None:
+            return None
+        return [array_info(x) for x in data]
 
     def save(self, fname, data):
         """
@@ -62,6 +85,71 @@ class FileFilter():
         """
         return True
     
+    def probe(self, fname, header=None):
+        """
+        
+            Tell whether given file can be read by this filter, without parsing it.
+            If signatures are defined, file header must start with one of them.
+            Otherwise, file extension must match one of the filter's extensions.
+            
+            Parameters:
+                fname    -    file name (str)
+                header   -    first bytes of file, read from file if None (str)
+            
+            Output:
+                0 if file can't be read, 1 if extension matches, 2 if signature matches (int)
+        
+        """
+        if not(self.can_read):
+            return 0
+        if len(self.magic)>0:
+            if header==None:
+                header = self.read_header(fname)
+            for x in self.magic:
+                if header.startswith(x):
+                    return 2
+            return 0
+        return int(self.match_extension(fname))
+    
+    def match_extension(self, fname):
+        """
+        
+            Check whether given file name matches one of the filter's extensions.
+            
+            Parameters:
+                fname    -    file name (str)
+            
+            Output:
+                True if yes
+        
+        """
+        tname = os.path.basename(fname).lower()
+        for x in self.ext:
+            if x!="*.*" and fnmatch(tname,x.lower()):
+                return True
+        return False
+    
+    def read_header(self, fname, size=2056):
+        """
+        
+            Read first bytes of given file.
+            
+            Parameters:
+                fname    -    file name (str)
+                size     -    number of bytes (int)
+            
+            Output:
+                file header (str)
+        
+        """
+        try:
+            f = open(fname,'rb')
+            header = f.read(size)
+            f.close()
+        except:
+            header = ""
+        return header
+    
     def wildcard(self):
         """
         
@@ -96,3 +184,63 @@ class FileFilter():
         tname[-1] = ""
         tname = ".".join(tname)
         return tname
+
+def make_info(name, shape, axes=[], input="", time=None, xml="", state=""):
+    """
+    
+        Build metadata of a data set.
+        
+        Parameters:
+            name     -    data set name (str)
+            shape    -    data set shape (list of int)
+            axes     -    axes labels (list of str)
+            input    -    input label (str)
+            time     -    measurement time, in seconds since epoch (float), or None if unknown
+            xml      -    event tree (XML str)
+            state    -    system state (XML str)
+        
+        Output:
+            metadata (dict), with keys name, shape, axes, input, time, sequence and devices
+    
+    """
+    info = {'name':name, 'shape':list(shape), 'axes':list(axes), 'input':input, 'time':time, 'sequence':"", 'devices':[]}
+    # sequence name is name of root event
+    try:
+        info['sequence'] = minidom.parseString(xml).getElementsByTagName('item')[0].getAttribute('name')
+    except:
+        pass
+    # devices are listed in system state, and prefix extended axis labels ("device - label")
+    devices = []
+    try:
+        doc = minidom.parseString(state)
+        for tag in ['input','axis']:
+            devices.extend([x.getAttribute('name') for x in doc.getElementsByTagName(tag)])
+    except:
+        pass
+    for x in list(axes) + [input]:
+        if x.count(" - ")>0:
+            devices.append(x.split(" - ")[0])
+    for x in devices:
+        if info['devices'].count(x)==0 and x!="":
+            info['devices'].append(x)
+    return info
+
+def array_info(array):
+    """
+    
+        Build metadata of given data array.
+        
+        Parameters:
+            array    -    data array (DataArray)
+        
+        Output:
+            metadata (dict, see make_info)
+    
+    """
+    labels = []
+    for x in array.axes + [array.input]:
+        try:
+            labels.append(x.extended())
+        except:
+            labels.append("")
+    return make_info(array.name, array.shape, labels[:-1], labels[-1], xml=getattr(array,'xml',""))
@@ -22,10 +22,10 @@
 
 """
 
-from terapy.files.base import FileFilter
+from terapy.files.base import FileFilter, make_info
 from terapy.core.dataman import DataArray
 import h5py as h5
-from time import strftime, localtime
+from time import strftime, strptime, localtime, mktime
 from numpy import number as npnumber
 from xml.dom import minidom
 
@@ -40,6 +40,16 @@ class HDF5(FileFilter):
 		self.ext = ["*.h5","*.dat"]
 		self.desc = "HDF5 files"
 		self.multi_data = True
+		self.magic = ["\x89HDF\r\n\x1a\n"]
+
+	def probe(self, fname, header=None):
+		# signature may be preceded by a user block of 512, 1024, 2048 bytes
+		if header==None:
+			header = self.read_header(fname)
+		for n in [0,512,1024,2048]:
+			if header[n:].startswith(self.magic[0]):
+				return 2
+		return 0
 
 	def read(self,fname):
 		try:
@@ -52,8 +62,11 @@ class HDF5(FileFilter):
 
 		data = []
 		xml = ""
+		timestamps = {}
 		for x in f.items():
-			if x[1].dtype==npnumber:
+			if x[0].startswith("Timestamps "):
+				timestamps[tname+" "+x[0][11:]] = x[1][...]
+			elif x[1].dtype==npnumber:
 				data.append(DataArray(shape=list(x[1].shape),name=tname+" "+x[0]))
 				data[-1].data = x[1][...]
 				for n in range(len(data[-1].shape)):
@@ -69,10 +82,41 @@ class HDF5(FileFilter):
 			for x in data:
 				# add event tree to data arrays
 				x.xml = xml
+		for x in data:
+			x.timestamps = timestamps.get(x.name)
 		
 		f.close()
 		return data
 	
+	def read_info(self, fname):
+		# read data set attributes only
+		try:
+			f = h5.File(fname,'r')
+		except:
+			return None
+		
+		tname = self.strip(fname)
+		sets = []
+		xml = ""
+		state = ""
+		for x in f.items():
+			if x[0].startswith("Timestamps "):
+				continue
+			elif x[1].dtype==npnumber:
+				attrs = x[1].attrs
+				axes = ["%s" % (attrs.get('Axis '+str(n),"")) for n in range(len(x[1].shape))]
+				try:
+					t = mktime(strptime(attrs['Time'], "%d-%m-%Y %H:%M:%S"))
+				except:
+					t = None
+				sets.append((tname+" "+x[0], x[1].shape, axes, "%s" % (attrs.get('Input',"")), t))
+			elif x[0]=="Event tree":
+				xml = str(x[1][...])
+			elif x[0]=="System state":
+				state = str(x[1][...])
+		f.close()
+		return [make_info(*(x + (xml, state))) for x in sets]
+	
 	def save(self, fname, arr, name="M_0"):
 		f = h5.File(fname,'a')
 		# write data set
@@ -88,4 +132,7 @@ class HDF5(FileFilter):
 			dset.attrs['Coordinates '+str(m)] = arr.coords[m]
 		dset.attrs['Input'] = "%s" % (arr.input.extended())
 		dset.attrs['Time'] = strftime("%d-%m-%Y %H:%M:%S", localtime())
+		# acquisition times, if recorded
+		if arr.timestamps is not None and list(arr.timestamps.shape)==list(arr.shape):
+			f.create_dataset("Timestamps "+name, data=arr.timestamps)
 		f.close()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+	Native binary file filter
+
+	File layout:
+		bytes 0-7      -    signature
+		bytes 8-15     -    position of header (little-endian unsigned 64-bit int)
+		from byte 64   -    raw little-endian data and coordinate arrays, each aligned on 64 bytes
+		header         -    JSON header, up to end of file
+
+	Header holds event tree, system state and, for each data set, its name,
+	shape, time, axes and input infos, and position and type of its arrays
+	(data, coordinates and acquisition times if recorded).
+	Data sets are added by writing their arrays over the previous header,
+	and writing the header again after them. Space used by a replaced data
+	set isn't recovered.
+	Arrays are mapped from file when read, such that no data is copied.
+
+"""
+
+from terapy.files.base import FileFilter, make_info
+from terapy.core.dataman import DataArray
+from terapy.core.axedit import AxisInfos
+import json
+import struct
+import numpy as np
+from time import time
+
+class Native(FileFilter):
+	"""
+
+		Native binary file filter
+
+	"""
+	def __init__(self):
+		FileFilter.__init__(self)
+		self.ext = ["*.tpd"]
+		self.desc = "TeraPy data files"
+		self.multi_data = True
+		self.magic = ["\x89TPD\r\n\x1a\n"]
+		self.align = 64 # array alignment, in bytes
+
+	def read(self, fname):
+		header = self.read_info_header(fname)
+		if header==None:
+			return None
+
+		# data name
+		tname = self.strip(fname)
+
+		data = []
+		for x in header['arrays']:
+			arr = DataArray(shape=[], name=tname+" "+x['name'])
+			arr.shape = list(x['shape'])
+			arr.data = self.map_array(fname, x['data'])
+			arr.coords = [self.map_array(fname, c) for c in x['coords']]
+			if x.get('timestamps')!=None:
+				arr.timestamps = self.map_array(fname, x['timestamps'])
+			arr.idx = np.zeros(len(arr.shape), dtype=int)
+			arr.axes = [make_axis(a) for a in x['axes']]
+			arr.input = make_axis(x['input'])
+			if header['xml']!="":
+				arr.xml = header['xml']
+			data.append(arr)
+		return data
+
+	def read_info(self, fname):
+		# metadata are all in header, arrays aren't touched
+		header = self.read_info_header(fname)
+		if header==None:
+			return None
+
+		tname = self.strip(fname)
+		info = []
+		for x in header['arrays']:
+			axes = [axis_label(a) for a in x['axes']]
+			info.append(make_info(tname+" "+x['name'], x['shape'], axes, axis_label(x['input']), x['time'], header['xml'], header['state']))
+		return info
+
+	def read_info_header(self, fname):
+		"""
+
+			Read file header.
+
+			Parameters:
+				fname    -    file name (str)
+
+			Output:
+				header (dict), or None if file isn't a native file
+
+		"""
+		try:
+			f = open(fname, 'rb')
+			magic, offset = struct.unpack("<8sQ", f.read(16))
+			if magic!=self.magic[0]:
+				f.close()
+				return None
+			f.seek(offset)
+			header = json.loads(f.read())
+			f.close()
+		except:
+			return None
+		return header
+
+	def map_array(self, fname, desc):
+		"""
+
+			Map array stored in file.
+
+			Parameters:
+				fname    -    file name (str)
+				desc     -    array description, from header (dict)
+
+			Output:
+				array (numpy memmap), copy-on-write
+
+		"""
+		shape = tuple(desc['shape'])
+		if np.prod(shape)==0:
+			return np.zeros(shape, dtype=desc['dtype']) # empty arrays can't be mapped
+		return np.memmap(fname, dtype=desc['dtype'], mode='c', offset=desc['offset'], shape=shape)
+
+	def create(self, fname, xml="", state=""):
+		"""
+
+			Create empty file with given event tree and system state.
+
+			Parameters:
+				fname    -    file name (str)
+				xml      -    event tree (XML str)
+				state    -    system state (XML str)
+
+		"""
+		f = open(fname, 'wb')
+		f.write("\0"*self.align)
+		self.write_header(f, {'xml':xml, 'state':state, 'arrays':[]}, self.align)
+		f.close()
+
+	def save(self, fname, arr, name="M_0"):
+		header = self.read_info_header(fname)
+		if header==None:
+			self.create(fname, getattr(arr,'xml',""))
+			header = self.read_info_header(fname)
+		f = open(fname, 'r+b')
+		offset = struct.unpack("<8sQ", f.read(16))[1]
+
+		entry = {'name':name, 'shape':list(arr.shape), 'time':time()}
+		entry['axes'] = [axis_desc(x) for x in arr.axes]
+		entry['input'] = axis_desc(arr.input)
+		# one write per array, over previous header
+		entry['data'], offset = self.write_array(f, arr.data, offset)
+		entry['coords'] = []
+		for x in arr.coords:
+			desc, offset = self.write_array(f, x, offset)
+			entry['coords'].append(desc)
+		# acquisition times, if recorded
+		entry['timestamps'] = None
+		if arr.timestamps is not None and list(arr.timestamps.shape)==list(arr.shape):
+			entry['timestamps'], offset = self.write_array(f, arr.timestamps, offset)
+
+		# data set with same name is replaced
+		header['arrays'] = [x for x in header['arrays'] if x['name']!=name] + [entry]
+		self.write_header(f, header, offset)
+		f.close()
+		return True
+
+	def write_array(self, f, array, offset):
+		"""
+
+			Write array at first aligned position after given offset.
+
+			Parameters:
+				f         -    file, opened for writing (file)
+				array     -    array (numpy array)
+				offset    -    position from which array can be written (int)
+
+			Output:
+				array description (dict), position of array end (int)
+
+		"""
+		array = np.asarray(array)
+		dtype = array.dtype.newbyteorder('<')
+		if dtype!=array.dtype:
+			array = array.astype(dtype) # only big-endian arrays are copied
+		offset = -(-offset//self.align)*self.align
+		f.seek(offset)
+		array.tofile(f)
+		return {'offset':offset, 'shape':list(array.shape), 'dtype':array.dtype.str}, offset + array.nbytes
+
+	def write_header(self, f, header, offset):
+		"""
+
+			Write header at given position, and truncate file after it.
+
+			Parameters:
+				f         -    file, opened for writing (file)
+				header    -    header (dict)
+				offset    -    header position (int)
+
+		"""
+		f.seek(offset)
+		f.write(json.dumps(header))
+		f.truncate()
+		f.seek(0)
+		f.write(struct.pack("<8sQ", self.magic[0], offset))
+
+class DeviceName():
+	"""
+
+		Stand-in for device of loaded axis infos, carrying device name only
+
+	"""
+	def __init__(self, name=""):
+		self.name = name
+
+def axis_desc(axis):
+	"""
+
+		Describe axis infos for file header.
+
+		Parameters:
+			axis    -    axis infos (AxisInfos), or None
+
+		Output:
+			description (dict), or None
+
+	"""
+	if axis==None:
+		return None
+	desc = {'name':"%s" % (axis.name), 'units':"%s" % (axis.units), 'device':""}
+	if hasattr(axis.device,'name'):
+		desc['device'] = "%s" % (axis.device.name)
+	return desc
+
+def make_axis(desc):
+	"""
+
+		Build axis infos from file header description.
+
+		Parameters:
+			desc    -    description (dict), or None
+
+		Output:
+			axis infos (AxisInfos), or None
+
+	"""
+	if desc==None:
+		return None
+	axis = AxisInfos(str(desc['name']), str(desc['units']))
+	if desc['device']!="":
+		axis.device = DeviceName(desc['device'])
+	return axis
+
+def axis_label(desc):
+	"""
+
+		Build extended axis label from file header description.
+
+		Parameters:
+			desc    -    description (dict), or None
+
+		Output:
+			label (str)
+
+	"""
+	if desc==None:
+		return ""
+	try:
+		return make_axis(desc).extended()
+	except:
+		return desc['name']
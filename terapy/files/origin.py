@@ -43,6 +43,7 @@ class OPJ(FileFilter):
         self.can_read = True
         self.can_save = False
         self.multi_data = True
+        self.magic = ["CPYA"]
         self.valueflags = {1:'B',2:'h',4:'i',8:'d'}
     
     def read(self,fname):
@@ -37,112 +37,195 @@ class Text(FileFilter):
 		FileFilter.__init__(self)
 		self.ext = ["*.dat","*.csv","*.txt"]
 		self.desc = "ASCII data files"
+		self.chunk_size = 2**22 # number of bytes (read) or values (save) processed at once
+	
+	def probe(self, fname, header=None):
+		if not(self.match_extension(fname)):
+			return 0
+		if header==None:
+			header = self.read_header(fname)
+		if header.count("\0")>0: # binary file
+			return 0
+		return 1
 	
 	def read(self,fname):
 		# data name
 		tname = self.strip(fname)
-		# test file type
-		fp = open(fname, 'r')
-		args = fp.readline().split('\t')
-		fp.close()
-		if len(args)==2: # 1D
-			return self.read1D(fname,tname)
-		elif len(args)==3: # 2D or 1D + std
-			# must find out from support .txt file whether 1D or 2D
-			sfname = fname.split('.')
-			sfname[-1] = 'txt'
-			sfname = ".".join(sfname)
+		table = self.read_table(fname)
+		if table is None:
+			return None
+		
+		if table.shape[1]==2: # 1D
+			return self.read1D(table,tname)
+		elif table.shape[1]==3: # 2D or 1D + std
+			if self.is_2D(table, fname):
+				return self.read2D(table,tname)
+			else:
+				return self.read1Dv(table,tname)
+		elif table.shape[1]==4: # 2D + std
+			return self.read2D(table,tname)
+		
+		return None
+	
+	def is_2D(self, table, fname):
+		"""
+		
+			Tell whether 3-column table holds 2D data or 1D data + std.
+			2D files are written by blocks: 1st coordinate is repeated over
+			consecutive lines, while 2nd coordinate cycles through same values
+			in each block. If table doesn't clearly show this layout, the
+			information file (.txt) written along with data is checked.
+			
+			Parameters:
+				table    -    table of values (2D numpy array)
+				fname    -    file name (str)
+			
+			Output:
+				True if 2D
+		
+		"""
+		# length of first block
+		Ny = len(table)
+		nz = np.flatnonzero(table[:,0]!=table[0,0])
+		if len(nz)>0:
+			Ny = nz[0]
+		if Ny>1 and 2*Ny<=len(table) and len(table)%Ny==0:
+			y = table[:Ny,1]
+			if len(np.unique(y))==Ny and np.all(table[Ny:2*Ny,1]==y) and np.all(table[Ny:2*Ny,0]==table[Ny,0]):
+				return True
+		
+		# ambiguous => information file tells if there are 2 axes
+		sfname = fname.split('.')
+		sfname[-1] = 'txt'
+		sfname = ".".join(sfname)
+		if sfname==fname:
+			return False
+		try:
 			f = open(sfname,'r')
 			fc = f.read()
 			f.close()
+		except:
+			return False
+		return fc.count("Axis X")>0
+	
+	def read_table(self, fname):
+		"""
+		
+			Read numeric columns from text file.
+			File is parsed by blocks of chunk_size bytes. Heading text lines are skipped.
 			
-			if fc.count("Axis X")==0:
-				return self.read1Dv(fname,tname)
-			else:
-				return self.read2D(fname,tname)
-		elif len(args)==4: # 2D + std
-			return self.read2D(fname,tname)
+			Parameters:
+				fname    -    file name (str)
+			
+			Output:
+				table of values, one column per data column (2D numpy array), or None if not readable
 		
-		return None
-
-	def read1D(self, fname, tname):
-		# open file and read column 0 and 1, separator is tab
-		data_t = []
-		data_x = []
+		"""
 		fp = open(fname, 'r')
-		for l in fp:
-			args = l.split('\t')
-			if args[0][0].isalpha() == 0:
-				data_t.append(float(args[0]))
-				data_x.append(float(args[1]))
+		# skip heading text lines and find number of columns
+		ncols = 0
+		sep = None
+		l = fp.readline()
+		while l!="":
+			if len(l.strip())>0 and not(l.lstrip()[0].isalpha()):
+				if l.count('\t')==0 and l.count(',')>0:
+					sep = ','
+				ncols = len(self.parse_block(l,sep))
+				break
+			l = fp.readline()
+		if ncols==0:
+			fp.close()
+			return None
+		
+		blocks = [self.parse_block(l,sep)]
+		rest = ""
+		while True:
+			chunk = fp.read(self.chunk_size)
+			if chunk=="":
+				break
+			chunk = rest + chunk
+			n = chunk.rfind('\n')+1
+			rest = chunk[n:]
+			if n>0:
+				blocks.append(self.parse_block(chunk[:n],sep,ncols))
+		if rest.strip()!="":
+			blocks.append(self.parse_block(rest+'\n',sep,ncols))
 		fp.close()
 		
-		data = DataArray(name=tname, shape=[len(data_t)])
-		data.coords = [np.array(data_t)]
-		data.data = np.array(data_x)
-		data.shape = [len(data_x)]
+		blocks = [x for x in blocks if len(x)>0]
+		return np.concatenate(blocks).reshape((-1,ncols))
+	
+	def parse_block(self, block, sep=None, ncols=0):
+		"""
+		
+			Parse block of text lines into values.
+			
+			Parameters:
+				block    -    complete text lines (str)
+				sep      -    column separator if not white space (str)
+				ncols    -    number of columns, used to check parsing (int)
+			
+			Output:
+				values (1D numpy array)
+		
+		"""
+		if sep!=None:
+			block = block.replace(sep,' ')
+		values = np.fromstring(block, sep=' ')
+		if ncols>0 and len(values)!=block.count('\n')*ncols:
+			# block contains empty or text lines => parse valid lines only
+			lines = [l for l in block.splitlines() if len(l.strip())>0 and not(l.lstrip()[0].isalpha())]
+			values = np.fromstring("\n".join(lines), sep=' ')
+			if len(values)!=len(lines)*ncols:
+				values = values[:(len(values)//ncols)*ncols]
+		return values
+
+	def read1D(self, table, tname):
+		# column 0 is coordinate, column 1 is data
+		data = DataArray(name=tname, shape=[len(table)])
+		data.coords = [table[:,0].copy()]
+		data.data = table[:,1].copy()
+		data.shape = [len(table)]
 		return [data]
 
-	def read1Dv(self, fname, tname):
-		# open file and read column 0, 1 and 2 (variance), separator is tab
-		data_t = []
-		data_x = []
-		data_v = []
-		fp = open(fname, 'r')
-		for l in fp:
-			args = l.split('\t')
-			if args[0][0].isalpha() == 0:
-				data_t.append(float(args[0]))
-				data_x.append(float(args[1]))
-				data_v.append(float(args[2]))
-		fp.close()
-		if len(data_v)<len(data_x):
-			data_v = np.zeros(len(data_x))
-		
-		data1 = DataArray(name=tname+" 0", shape=[len(data_t)])
-		data2 = DataArray(name=tname+" 1", shape=[len(data_t)])
-		
-		data1.coords = [np.array(data_t)]
-		data1.data = np.array(data_x)
-		data1.shape = [len(data_x)]
-		data2.coords = [np.array(data_t)]
-		data2.data = np.array(data_v)
-		data2.shape = [len(data_v)]
+	def read1Dv(self, table, tname):
+		# column 0 is coordinate, column 1 is data, column 2 is variance
+		data1 = DataArray(name=tname+" 0", shape=[len(table)])
+		data2 = DataArray(name=tname+" 1", shape=[len(table)])
+		
+		data1.coords = [table[:,0].copy()]
+		data1.data = table[:,1].copy()
+		data1.shape = [len(table)]
+		data2.coords = [table[:,0].copy()]
+		data2.data = table[:,2].copy()
+		data2.shape = [len(table)]
 		return [data1, data2]
 
-	def read2D(self, fname, tname):
-		fp = open(fname, 'r')
-		x = []
-		y = []
-		z = []
-		for l in fp:
-			args = l.split('\t')
-			if args[0][0].isalpha() == 0:
-				x.append(float(args[0]))
-				y.append(float(args[1]))
-				z.append(float(args[2]))
-		fp.close()
-		x = np.array(x)
-		y = np.array(y)
-		z = np.array(z)
-		
-		data_x = np.unique(x)
-		data_y = np.unique(y)
+	def read2D(self, table, tname):
+		# columns 0 and 1 are coordinates, column 2 is data; points may come in any order
+		data_x, ix = np.unique(table[:,0], return_inverse=True)
+		data_y, iy = np.unique(table[:,1], return_inverse=True)
 		data_2d = np.zeros((len(data_x),len(data_y)))
-		if False: # accurate but very slow way of sorting 
-			for nx in range(len(data_x)):
-				for ny in range(len(data_y)):
-					data_2d[nx,ny] = z[(x==data_x[nx])*(y==data_y[ny])]
-		else:
-			for ny in range(len(data_y)):
-					data_2d[:,ny] = z[ny*len(data_x):(ny+1)*len(data_x)]
+		data_2d[ix,iy] = table[:,2]
 		
 		data = DataArray(name=tname, shape=list(data_2d.shape))
-		data.coords.append(data_x)
-		data.coords.append(data_y)
+		data.coords = [data_x, data_y]
 		data.data = data_2d
 		return [data]
 	
+	def write_block(self, f, block):
+		"""
+		
+			Write block of values as tab-separated text lines.
+			
+			Parameters:
+				f        -    file handle (file)
+				block    -    values, one line per row (2D numpy array)
+		
+		"""
+		fmt = "\t".join(["%e"]*block.shape[1]) + "\n"
+		f.write((fmt*block.shape[0]) % tuple(block.ravel()))
+	
 	def save(self, fname, arr):
 		if len(arr.shape)<1 or len(arr.shape)>2:
 			return False
@@ -150,12 +233,16 @@ class Text(FileFilter):
 		f = open(".".join(fname), 'w')
 		
 		if len(arr.shape)==1: # 1D file
-			for r in range(arr.shape[0]):
-				f.write("%e\t%e\n" % (arr.coords[0][r], arr.data[r]))
-		elif len(arr.shape)==2: # 2D file
-			for r in range(arr.shape[0]):
-				for s in range(arr.shape[1]):
-					f.write("%e\t%e\t%e\n" % (arr.coords[0][r], arr.coords[0][s], arr.data[r,s]))
+			N = max(1,self.chunk_size//2)
+			for r in range(0,arr.shape[0],N):
+				self.write_block(f, np.column_stack((arr.coords[0][r:r+N], arr.data[r:r+N])))
+		elif len(arr.shape)==2: # 2D file, written by blocks of whole rows
+			Ny = arr.shape[1]
+			N = max(1,self.chunk_size//(3*Ny))
+			for r in range(0,arr.shape[0],N):
+				x = arr.coords[0][r:r+N]
+				block = np.column_stack((np.repeat(x,Ny), np.tile(arr.coords[1],len(x)), np.ravel(arr.data[r:r+N])))
+				self.write_block(f, block)
 		f.close()
 		
 		fname[-1] = "txt"
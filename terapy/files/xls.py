@@ -42,6 +42,7 @@ class XLS(FileFilter):
 		self.ext = ["*.xls"]
 		self.desc = "Excel workbooks"
 		self.can_read = True
+		self.magic = ["\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"] # OLE2 compound document
 	
 	def read(self,fname):
 		# data name
@@ -38,8 +38,12 @@ from terapy.core.axedit import AxisInfos
 from wx.lib.pubsub import setupkwargs
 from wx.lib.pubsub import pub
 from xml.dom import minidom
+import numpy as np
+import hashlib
 import wx
 
+block_size = 2**16 # number of elements processed at once by runs of element-wise filters
+
 ####
 def GetFilterFiles(dim=1):
     """
@@ -94,6 +98,7 @@ def GetModules(dim=1):
     mods = []
     for x in modules:
         if x.dim==dim: mods.append(x)
+        elif dim>1 and x.dim==1 and x.multi_dim: mods.append(x) # 1D filters applied along one axis
     return mods
 
 class FilterBank():
@@ -102,7 +107,7 @@ class FilterBank():
         Filter bank class
     
     """
-    def __init__(self, parent=None, children=[], filters=[], name = "Filter bank", dim = 1):
+    def __init__(self, parent=None, children=[], filters=[], name = "Filter bank", dim = 1, axis = -1):
         """
         
             Initialization.
@@ -113,13 +118,16 @@ class FilterBank():
                 filters   -    filters (list of Filter)
                 name      -    filter bank name (str)
                 dim       -    dimension of data treated by this bank (int)
+                axis      -    axis along which 1D filters are applied (int)
         
         """
         self.filters = filters
         self.parent = parent
         self.name = name
         self.dim = dim
+        self.axis = axis
         self.children = children
+        self.reference_key = None # identifies data and filters from which reference was computed
         pub.subscribe(self.ComputeReference, "history.change_reference")
         pub.subscribe(self.RemoveReference, "history.clear_reference")
     
@@ -168,6 +176,8 @@ class FilterBank():
             
             if fdim == self.dim:
                 self.name = name
+                if x.attributes.has_key("axis"):
+                    self.axis = int(x.attributes["axis"].value)
                 for y in x.childNodes:
                     if y.nodeName == 'item':
                         if ml.count(y.attributes['class'].value)>0:
@@ -177,6 +187,7 @@ class FilterBank():
                                 ft.name = y.attributes["name"].value
                             else:
                                 ft.name = ft.__extname__
+                            ft.axis = self.axis
                             self.filters.append(ft)
                             ParseAttributes(y.attributes,ft)
         if len(self.filters) == 0:
@@ -199,6 +210,7 @@ class FilterBank():
         root = doc.createElement("filters")
         root.attributes["name"] = self.name
         root.attributes["dimension"] = str(self.dim)
+        root.attributes["axis"] = str(self.axis)
         croot.appendChild(root)
         for n in range(len(self.filters)):
             ft = self.filters[n]
@@ -223,6 +235,7 @@ class FilterBank():
                 ft     -    filter (Filter)
         
         """
+        ft.axis = self.axis
         self.filters.insert(pos,ft)
         if ft.is_reference:
             self.RecomputeReference()
@@ -251,6 +264,22 @@ class FilterBank():
         self.filters.pop(pos)
         pub.sendMessage("filter.change", inst=self)
     
+    def SetAxis(self, axis):
+        """
+        
+            Set axis along which 1D filters are applied.
+            
+            Parameters:
+                axis    -    axis index (int)
+        
+        """
+        self.axis = axis
+        for ft in self.filters:
+            ft.axis = axis
+        if self.HasReference():
+            self.RecomputeReference()
+        pub.sendMessage("filter.change", inst=self)
+    
     def __del__(self):
         """
         
@@ -300,28 +329,76 @@ class FilterBank():
             array = inst.data
         else:
             array = inst
-        narray = DataArray(shape=array.shape[:])
-        narray.coords = array.coords[:]
-        narray.data = array.data[:]
-        # build reference data
-        # first apply previous filter banks
-        bank = self
-        while bank.parent!=None:
-            bank = bank.parent
-        while bank!=self:
-            narray = bank.ApplyFilters(narray)
-            bank = bank.children[-1]
-        # then apply current filter bank up to reference filter
-        for ft in self.filters:
-            if not(ft.is_reference):
+        ref = self.GetReferenceFilter()
+        if ref==None:
+            return
+        # build reference data, unless neither reference data nor upstream filters changed
+        key = self.GetReferenceKey(array)
+        if key!=self.reference_key or ref.ref==None:
+            narray = DataArray(shape=array.shape[:])
+            narray.coords = array.coords[:]
+            narray.data = array.data[:]
+            # first apply previous filter banks
+            bank = self
+            while bank.parent!=None:
+                bank = bank.parent
+            while bank!=self:
+                narray = bank.ApplyFilters(narray)
+                bank = bank.children[-1]
+            # then apply current filter bank up to reference filter
+            for ft in self.filters:
+                if ft.is_reference:
+                    break
                 if ft.is_active:
                     ft.apply_filter(narray)
-            else:
-                ft.ref = narray
-                ft.source = array
-                if inst!=array:
-                    pub.sendMessage("filter.change", inst=self) # send filter change notification with filter bank as object
+            ref.ref = narray
+            self.reference_key = key
+        ref.source = array
+        if inst!=array:
+            pub.sendMessage("filter.change", inst=self) # send filter change notification with filter bank as object
+    
+    def GetSignature(self, stop=None):
+        """
+        
+            Return signature of filter configuration.
+            
+            Parameters:
+                stop    -    filter at which signature stops, excluded (Filter)
+            
+            Output:
+                signature (tuple)
+        
+        """
+        sig = [self.axis]
+        for ft in self.filters:
+            if ft==stop:
                 break
+            sig.append((ft.__class__.__name__, ft.is_active, ft.axis, tuple([str(getattr(ft,x)) for x in ft.config])))
+        return tuple(sig)
+    
+    def GetReferenceKey(self, array):
+        """
+        
+            Return key identifying reference computed from given data.
+            It depends on data, and on configuration of filters applied before reference filter.
+            
+            Parameters:
+                array    -    reference data (DataArray)
+            
+            Output:
+                key (tuple)
+        
+        """
+        digest = hashlib.md5(np.ascontiguousarray(array.data))
+        for x in array.coords:
+            digest.update(np.ascontiguousarray(x))
+        key = [digest.hexdigest(), tuple(array.shape)]
+        bank = self
+        while bank.parent!=None:
+            bank = bank.parent
+            key.append((bank.GetSignature(), bank.reference_key))
+        key.append(self.GetSignature(self.GetReferenceFilter()))
+        return tuple(key)
     
     def RecomputeReference(self):
         """
@@ -331,7 +408,8 @@ class FilterBank():
         """
         for ft in self.filters:
             if ft.is_reference and ft.is_active:
-                self.ComputeReference(ft.source)
+                if ft.source!=None: # otherwise, reference hasn't been chosen yet
+                    self.ComputeReference(ft.source)
                 break
     
     def RemoveReference(self, inst=None):
@@ -370,16 +448,63 @@ class FilterBank():
         units = [x.units for x in narray.axes]
         units.append(narray.input.units)
 
+        ops = [] # current run of element-wise filters
         for ft in self.filters:
             if ft.is_active:
-                ft.apply_filter(narray)
+                op = ft.get_operator(narray)
+                if op!=None:
+                    ops.append(op)
+                else:
+                    self.ApplyOperators(narray, ops)
+                    ops = []
+                    ft.apply_filter(narray)
                 units = ft.get_units(units)
+        self.ApplyOperators(narray, ops)
         
         for n in range(len(narray.axes)): narray.axes[n].units = units[n]
         narray.input.units = units[-1]
         
         return narray
     
+    def ApplyOperators(self, array, ops):
+        """
+        
+            Apply run of element-wise filter operations to given data array.
+            Operations are done in place on a single buffer, by blocks of traces
+            when possible, and give the same result as sequential filter application.
+            
+            Parameters:
+                array    -    data array (DataArray)
+                ops      -    list of (operation, operand) pairs (see Filter.get_operator)
+        
+        """
+        if len(ops)==0:
+            return
+        # split run where data type changes, as sequential processing would do
+        dtype = array.data.dtype
+        runs = [[dtype, []]]
+        for (op, operand) in ops:
+            if operand is not None:
+                dtype = np.result_type(dtype, operand)
+            if dtype!=runs[-1][0]:
+                runs.append([dtype, []])
+            runs[-1][1].append(op)
+        
+        data = array.data
+        ndim = data.ndim
+        for (dtype, fns) in runs:
+            data = np.array(data, dtype=dtype) # own buffer, source data is left untouched
+            if ndim>1 and self.axis%ndim!=0:
+                # process blocks of traces sliced along first axis, to stay in cache
+                step = max(1, block_size*data.shape[0]//max(data.size,1))
+                blocks = [data[n:n+step] for n in range(0,data.shape[0],step)]
+            else:
+                blocks = [data]
+            for block in blocks:
+                for fn in fns:
+                    fn(block)
+        array.data = data
+    
     def GetUnits(self, units):
         """
         
@@ -26,6 +26,7 @@ from terapy.filters.base import Filter
 import numpy as np
 import wx
 from terapy.core import icon_path
+from terapy.filters.cache import cached
 
 class ApodizationWindow(Filter):
     """
@@ -35,6 +36,7 @@ class ApodizationWindow(Filter):
     """
     __extname__ = "Apodization window"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.window_list = ["Boxcar","Bartlett","Blackman","Hamming","Hanning","Blackman-Harris","Lanczos","Custom..."]
@@ -44,40 +46,24 @@ class ApodizationWindow(Filter):
         self.config = ["custom","type"]
         
     def apply_filter(self, array):
-        if len(array.shape)!=1:
-            return False # need 2D data
-        nx = array.shape[0]
-        # Apodization function
-        if self.type == 1:
-            ft = np.bartlett(nx)
-        elif self.type == 2:
-            ft = np.blackman(nx)
-        elif self.type == 3:
-            ft = np.hamming(nx)
-        elif self.type == 4:
-            ft = np.hanning(nx)
-        elif self.type == 5:
-            # Blackman-Harris window
-            a0 = 0.35875
-            a1 = 0.48829
-            a2 = 0.14128
-            a3 = 0.01168
-            x = np.linspace(0,1,nx)
-            ft = a0 - a1*np.cos(2*np.pi*x) + a2*np.cos(4*np.pi*x) + a3*np.cos(6*np.pi*x) 
-        elif self.type == 6:
-            # Lanczos window
-            x = np.linspace(-1,1,nx)
-            ft = np.sinc(x)
-        elif self.type == 7:
-            x = np.linspace(-1,1,nx)
-            exec('x='+self.custom)
-            ft = x
-        else:
-            ft = np.ones(nx)
+        axis = self.get_axis(array)
+        if axis==None:
+            return False
+        nx = array.shape[axis]
+        ft = cached(window, self.type, nx, self.custom)
         
-        array.data = array.data*ft
+        array.data = array.data*self.expand(ft,array,axis)
         return True
     
+    def get_operator(self, array):
+        axis = self.get_axis(array)
+        if axis==None:
+            return None
+        ft = self.expand(cached(window, self.type, array.shape[axis], self.custom),array,axis)
+        def op(data):
+            data *= ft
+        return op, ft
+    
     def set_filter(self, parent = None):
         dlg = WindowSelectionDialog(parent, wlist = self.window_list, sel = self.type, custom = self.custom)
         if dlg.ShowModal() == wx.ID_OK:
@@ -91,6 +77,49 @@ class ApodizationWindow(Filter):
     def get_icon(self):
         return wx.Image(icon_path + "filter-window.png").ConvertToBitmap()
 
+def window(type, nx, custom = ""):
+    """
+    
+        Compute apodization window.
+        
+        Parameters:
+            type      -    window type, as in ApodizationWindow.window_list (int)
+            nx        -    number of points (int)
+            custom    -    custom window function of x defined on (-1,1) (str)
+        
+        Output:
+            window (numpy array)
+    
+    """
+    # Apodization function
+    if type == 1:
+        ft = np.bartlett(nx)
+    elif type == 2:
+        ft = np.blackman(nx)
+    elif type == 3:
+        ft = np.hamming(nx)
+    elif type == 4:
+        ft = np.hanning(nx)
+    elif type == 5:
+        # Blackman-Harris window
+        a0 = 0.35875
+        a1 = 0.48829
+        a2 = 0.14128
+        a3 = 0.01168
+        x = np.linspace(0,1,nx)
+        ft = a0 - a1*np.cos(2*np.pi*x) + a2*np.cos(4*np.pi*x) + a3*np.cos(6*np.pi*x) 
+    elif type == 6:
+        # Lanczos window
+        x = np.linspace(-1,1,nx)
+        ft = np.sinc(x)
+    elif type == 7:
+        x = np.linspace(-1,1,nx)
+        exec('x='+custom)
+        ft = x
+    else:
+        ft = np.ones(nx)
+    return ft
+
 class WindowSelectionDialog(wx.Dialog):
     def __init__(self, parent = None, title="Apodization window", wlist = [], sel = 0, custom = ""):
         wx.Dialog.__init__(self, parent, title=title)
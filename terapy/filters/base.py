@@ -23,6 +23,7 @@
 """
 
 import wx
+import numpy as np
 from terapy.core import icon_path
 
 class Filter():
@@ -33,10 +34,12 @@ class Filter():
         Properties:
             __extname__    -    long name (str)
             dim            -    dimension of data that this filter can treat (int)
+            multi_dim      -    if True, 1D filter can also be applied along one axis of N-D data (bool)
     
     """
     __extname__ = "Generic filter"
     dim = -1
+    multi_dim = False
     def __init__(self):
         """
         
@@ -50,6 +53,7 @@ class Filter():
         self.is_visible = True # if True, filter is visible in interface
         self.config = []
         self.name = self.__extname__
+        self.axis = -1 # axis along which filter is applied to N-D data
     
     def apply_filter(self, array):
         """
@@ -62,6 +66,96 @@ class Filter():
         """
         return True
     
+    def get_operator(self, array):
+        """
+        
+            Return element-wise, in-place equivalent of filter for given array.
+            Filter banks use it to process runs of such filters on a single buffer.
+            The operation acts on whole traces along filter axis, but may be
+            called on a block of traces (sliced along first axis) at a time.
+            
+            Parameters:
+                array    -    data array (DataArray)
+            
+            Output:
+                (operation, operand) pair, or None if filter can't be applied this way
+                operation    -    function modifying given data block in place (function)
+                operand      -    value combined with data, used to determine result type (scalar, numpy array or None)
+        
+        """
+        return None
+    
+    def get_axis(self, array):
+        """
+        
+            Return axis along which filter must be applied to given array.
+            
+            Parameters:
+                array    -    data array (DataArray)
+            
+            Output:
+                axis index (int), or None if filter can't treat given array
+        
+        """
+        ndim = len(array.shape)
+        if ndim==0 or (ndim>1 and not(self.multi_dim)):
+            return None
+        axis = self.axis
+        if axis<0:
+            axis += ndim
+        if axis<0 or axis>=ndim:
+            return None
+        return axis
+    
+    def get_units_axis(self, units):
+        """
+        
+            Return index of processed axis in given unit list.
+            
+            Parameters:
+                units    -    list of units, one per axis plus data units (list of quantities)
+            
+            Output:
+                axis index (int)
+        
+        """
+        ndim = max(1,len(units)-1)
+        return min(max(0,self.axis+ndim if self.axis<0 else self.axis),ndim-1)
+    
+    def expand(self, v, array, axis):
+        """
+        
+            Reshape 1D vector so that it broadcasts along given axis of array.
+            
+            Parameters:
+                v        -    vector (numpy array)
+                array    -    data array (DataArray)
+                axis     -    axis index (int)
+            
+            Output:
+                reshaped vector (numpy array)
+        
+        """
+        shape = [1]*len(array.shape)
+        shape[axis] = -1
+        return np.reshape(v,shape)
+    
+    def slice_axis(self, data, sl, axis):
+        """
+        
+            Index data along given axis only.
+            
+            Parameters:
+                data     -    data (numpy array)
+                sl       -    index or slice (int or slice)
+                axis     -    axis index (int)
+            
+            Output:
+                indexed data (numpy array)
+        
+        """
+        return data[(slice(None),)*axis + (sl,)]
+    
     def set_filter(self, parent = None):
         """
         
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Caches for quantities derived by filters (coefficients, windows, ...)
+
+"""
+
+import numpy as np
+import threading
+from collections import OrderedDict
+
+class LRUCache():
+    """
+
+        Bounded least-recently-used cache
+
+    """
+    def __init__(self, size = 64):
+        """
+
+            Initialization.
+
+            Parameters:
+                size    -    max. number of stored items (int)
+
+        """
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default = None):
+        """
+
+            Get item for given key.
+
+            Parameters:
+                key        -    item key (hashable)
+                default    -    value returned if key is not in cache
+
+            Output:
+                stored item, or default
+
+        """
+        with self.lock:
+            if key in self.items:
+                value = self.items.pop(key)
+                self.items[key] = value # move to most recent position
+                return value
+        return default
+
+    def set(self, key, value):
+        """
+
+            Store item for given key. Oldest items are dropped if cache is full.
+
+            Parameters:
+                key      -    item key (hashable)
+                value    -    item
+
+        """
+        with self.lock:
+            if key in self.items:
+                self.items.pop(key)
+            self.items[key] = value
+            while len(self.items)>self.size:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        """
+
+            Remove all items.
+
+        """
+        with self.lock:
+            self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
+
+kernels = LRUCache(128) # shared cache for filter kernels
+
+def freeze(value):
+    """
+
+        Make numpy arrays read-only, such that cached items can't be modified in place.
+
+        Parameters:
+            value    -    array, or tuple of arrays
+
+        Output:
+            same value
+
+    """
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, tuple):
+        for x in value: freeze(x)
+    return value
+
+def cached(func, *args):
+    """
+
+        Return func(*args), computed only if not found in kernel cache.
+        Returned arrays are read-only.
+
+        Parameters:
+            func    -    function computing kernel (function)
+            args    -    function arguments (hashable)
+
+        Output:
+            function output
+
+    """
+    key = (func,) + args
+    value = kernels.get(key)
+    if value is None:
+        value = freeze(func(*args))
+        kernels.set(key, value)
+    return value
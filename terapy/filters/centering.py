@@ -35,32 +35,42 @@ class Centering(Filter):
     """
     __extname__ = "Center max value"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
     
     def apply_filter(self, array):
         # re-center data with zero-padding
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
         
         data_y = array.data
-        data_x = array.coords[0]
-        pm = abs(data_y).argmax()
-        if pm>len(data_y)/2:
+        data_x = array.coords[axis]
+        N = len(data_x)
+        # in N-D data, center maximum of all traces
+        prof = abs(data_y)
+        if prof.ndim>1:
+            prof = np.rollaxis(prof,axis,prof.ndim).reshape((-1,N)).max(axis=0)
+        pm = prof.argmax()
+        shape = list(data_y.shape)
+        if pm>N//2:
             dx = data_x[1] - data_x[0]
-            nz = 2*(pm - len(data_y)/2)
-            data_y = np.concatenate((data_y, np.zeros(nz)))
-            data_x = np.linspace(data_x.min(), data_x.max() + dx*nz, len(data_y))
-        elif pm<len(data_y)/2:
+            nz = 2*(pm - N//2)
+            shape[axis] = nz
+            data_y = np.concatenate((data_y, np.zeros(shape)), axis=axis)
+            data_x = np.linspace(data_x.min(), data_x.max() + dx*nz, data_y.shape[axis])
+        elif pm<N//2:
             dx = data_x[1] - data_x[0]
-            nz = 2*(len(data_y)/2 - pm)
-            data_y = np.concatenate((np.zeros(nz), data_y))
-            data_x = np.linspace(data_x.min() - dx*nz, data_x.max(), len(data_y))
+            nz = 2*(N//2 - pm)
+            shape[axis] = nz
+            data_y = np.concatenate((np.zeros(shape), data_y), axis=axis)
+            data_x = np.linspace(data_x.min() - dx*nz, data_x.max(), data_y.shape[axis])
         
-        array.coords[0] = data_x
+        array.coords[axis] = data_x
         array.data = data_y
-        array.shape = data_y.shape
+        array.shape = list(data_y.shape)
         return True
-
+    
     def get_icon(self):
         return wx.Image(icon_path + "filter-center.png").ConvertToBitmap()
@@ -430,6 +430,14 @@ class FilterControl(wx.Panel):
                 else:
                     mitem = menu.Append(id=wx.NewId(), text="&Enable")
                 self.Bind(wx.EVT_MENU, lambda x: self.OnEnableFilter(itm), id=mitem.Id)
+            # axis along which 1D filters are applied to multi-dimensional data
+            if self.dim>1:
+                menuAxis = wx.Menu()
+                for n in range(self.dim):
+                    mitem = menuAxis.AppendRadioItem(wx.NewId(), "Axis %d" % (n+1))
+                    mitem.Check(self.bank.axis%self.dim==n)
+                    self.Bind(wx.EVT_MENU, functools.partial(self.OnSetAxis,n), id=mitem.Id)
+                menu.AppendSubMenu(menuAxis,"Filter a&xis")
             # Load/Save filter list
             mitem = menu.Append(id=wx.NewId(),text="&Load filter list")
             self.Bind(wx.EVT_MENU, self.LoadFilterList, id=mitem.Id)
@@ -437,6 +445,18 @@ class FilterControl(wx.Panel):
             self.Bind(wx.EVT_MENU, self.SaveFilterList, id=mitem.Id)
         self.PopupMenu(menu)
     
+    def OnSetAxis(self, axis, event = None):
+        """
+        
+            Set axis along which 1D filters are applied.
+            
+            Parameters:
+                axis     -    axis index (int)
+                event    -    wx.Event
+        
+        """
+        self.bank.SetAxis(axis)
+    
     def OnEnableFilter(self, pos):
         """
         
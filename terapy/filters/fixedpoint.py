@@ -23,8 +23,8 @@
 """
 
 from terapy.filters.base import Filter
-from scipy.interpolate import interp1d
-from numpy import floor, unwrap, arctan2, pi, exp, log
+from terapy.filters.resample import resample
+from numpy import floor, unwrap, arctan2, pi, exp, log, diff, cumsum, concatenate, where, ones, isfinite, errstate
 import wx
 from terapy.core import icon_path
 from wx.lib.pubsub import setupkwargs
@@ -51,16 +51,16 @@ class FixedPoint(Filter):
         self.methods = ["nearest","linear","quadratic","cubic"]
         self.imaginary = False
         self.host = 1.0 # index of surrounding medium
-        self.config = ["thickness","deviation","host","imaginary","imethod"]
+        self.accelerate = 0 # if 1, use Steffensen acceleration in fixed-point iteration
+        self.config = ["thickness","deviation","host","imaginary","imethod","accelerate"]
         pub.subscribe(self.set_arrays, "history.arrays")
 
     def apply_filter(self, array):
         c = 299792458e6 # speed of light in um/s
         if len(array.shape)!=1 or self.ref==None:
             return False
-        i1d = interp1d(array.coords[0],array.data,kind=self.methods[self.imethod],bounds_error=False,fill_value=0.0)
+        array.data = resample(array.coords[0],array.data,self.ref.coords[0],kind=self.methods[self.imethod])
         array.coords[0] = self.ref.coords[0]
-        array.data = i1d(self.ref.coords[0])
         omega = 2*pi*array.coords[0]*1e12
         
         # pick source data
@@ -81,39 +81,65 @@ class FixedPoint(Filter):
         ratio = array.data/self.ref.data
         phase = unwrap(-arctan2(ratio.imag,ratio.real))
         p0 = self.thickness/c*(ns0-self.host) # slope estimate
-        for n in range(len(phase)-1):
-            dp = (omega[n+1]-omega[n])*p0*self.deviation
-            if abs(phase[n+1]-phase[n])>dp:
-                phase[n+1:] = phase[n+1:] - phase[n+1] + phase[n] + dp 
-        
-        phase = phase - phase[0]
-        
-        # fixed-point iteration
-        for n in range(len(phase)):
-            ns = ns0
-            ns1 = ns0 + self.host
-            nit = 0
-            while abs(ns1-ns)>1e-12:
+        # steps exceeding expected slope are replaced by maximum allowed step
+        dp = diff(omega)*p0*self.deviation
+        dphase = diff(phase)
+        phase = concatenate(([0.0],cumsum(where(abs(dphase)>dp,dp,dphase))))
+        
+        # fixed-point iteration, all frequencies at once
+        ns = ones(len(phase))*(ns0+0j)
+        active = ones(len(phase),dtype=bool) # bins that haven't converged yet
+        nit = 0
+        with errstate(divide='ignore',invalid='ignore'):
+            while active.any():
                 nit+=1
-                ns1 = ns
-                Fp = self.fabry_perot(self.host, ns, omega[n], self.thickness, Nr)
-                Hm = ratio[n]/Fp
-                Fpp = -arctan2(Fp.imag,Fp.real)
-                cor = 4.0*ns/(ns+self.host)**2
-                ns = c/(omega[n]*self.thickness)*(phase[n]-Fpp+arctan2(cor.imag,cor.real)) + self.host
-                ks = -c/(omega[n]*self.thickness)*(log(abs(Hm))-log(abs(cor)))
-                ns = abs(ns) - 1j*abs(ks)
+                x0 = ns[active]
+                args = (ratio[active], phase[active], omega[active], Nr)
+                x1 = self.fixed_point_step(x0, *args)
+                if self.accelerate:
+                    # Steffensen (Aitken delta-squared) step
+                    x2 = self.fixed_point_step(x1, *args)
+                    den = x2 - 2*x1 + x0
+                    xa = x0 - (x1-x0)**2/den
+                    x1 = where(isfinite(xa) & (abs(den)>0), xa, x2)
+                ns[active] = x1
+                active[active] = abs(x1-x0)>1e-12
                 
                 if nit>100: break # stop after 100 iterations
-            
-            if self.imaginary:
-                array.data[n] = -ns.imag
-            else:
-                array.data[n] = ns.real
+        
+        if self.imaginary:
+            array.data[:] = -ns.imag
+        else:
+            array.data[:] = ns.real
         
         array.shape = self.ref.shape
         return True
     
+    def fixed_point_step(self, ns, ratio, phase, omega, Nr):
+        """
+        
+            Compute one fixed-point iteration for refractive index.
+            
+            Parameters:
+                ns       -    current refractive index estimate (complex array)
+                ratio    -    sample to reference spectral ratio (complex array)
+                phase    -    corrected phase of ratio (float array)
+                omega    -    angular frequencies (float array)
+                Nr       -    number of reflections to take into account (int)
+            
+            Output:
+                new refractive index estimate (complex array) 
+        
+        """
+        c = 299792458e6 # speed of light in um/s
+        Fp = self.fabry_perot(self.host, ns, omega, self.thickness, Nr)
+        Hm = ratio/Fp
+        Fpp = -arctan2(Fp.imag,Fp.real)
+        cor = 4.0*ns/(ns+self.host)**2
+        nr = c/(omega*self.thickness)*(phase-Fpp+arctan2(cor.imag,cor.real)) + self.host
+        ks = -c/(omega*self.thickness)*(log(abs(Hm))-log(abs(cor)))
+        return abs(nr) - 1j*abs(ks)
+    
     def fabry_perot(self,n1,ns,om,L,Nmax):
         """
         
@@ -122,7 +148,7 @@ class FixedPoint(Filter):
             Parameters:
                 n1    -    refractive index of surrounding medium (complex)
                 ns    -    refractive index of slab (complex)
-                om    -    angular frequency (float)
+                om    -    angular frequency (float or array)
                 L     -    slab thickness in micrometers (float)
                 Nmax  -    number of reflections to take into account (int)
             
@@ -135,9 +161,11 @@ class FixedPoint(Filter):
         rsa = (ns-n1)/(n1+ns)
         ps = exp(-1j*2*ns*om/c*L)
         
-        Emod = 0
-        for nr in range(Nmax+1):
-            Emod += (rsa**2*ps)**nr
+        if Nmax<0: return rsa*0
+        # geometric series sum_{nr=0..Nmax} q^nr
+        q = rsa**2*ps
+        with errstate(divide='ignore',invalid='ignore'):
+            Emod = where(q==1, Nmax+1, (1-q**(Nmax+1))/(1-q))
         
         return Emod
     
@@ -173,15 +201,16 @@ class FixedPoint(Filter):
             idp = reflist.index(self.source)
         else:
             idp = 0
-        dlg = FixedPointSelectionDialog(parent, reflist=refnames, sel = idp, isel = self.imethod, thickness = self.thickness, host = self.host, deviation = self.deviation, imaginary = self.imaginary)
+        dlg = FixedPointSelectionDialog(parent, reflist=refnames, sel = idp, isel = self.imethod, thickness = self.thickness, host = self.host, deviation = self.deviation, imaginary = self.imaginary, accelerate = self.accelerate)
         if dlg.ShowModal() == wx.ID_OK:
-            idp, imethod, thickness, host, deviation, imaginary = dlg.GetValue()
+            idp, imethod, thickness, host, deviation, imaginary, accelerate = dlg.GetValue()
             if idp>-1:
                 self.imethod = imethod
                 self.thickness = thickness
                 self.host = host
                 self.deviation = deviation
                 self.imaginary = imaginary
+                self.accelerate = accelerate
                 dlg.Destroy()
                 self.source = reflist[idp]
                 pub.sendMessage("filter.change_reference",inst=self.arrays.index(self.source))
@@ -201,7 +230,7 @@ class FixedPoint(Filter):
         return wx.Image(icon_path + "filter-normalize.png").ConvertToBitmap()
 
 class FixedPointSelectionDialog(wx.Dialog):
-    def __init__(self, parent = None, title="Reference measurement", reflist = [], sel = 0, isel = 1, thickness = 1.0, host = 1.0, deviation = 2.0, imaginary = False):
+    def __init__(self, parent = None, title="Reference measurement", reflist = [], sel = 0, isel = 1, thickness = 1.0, host = 1.0, deviation = 2.0, imaginary = False, accelerate = 0):
         wx.Dialog.__init__(self, parent, title=title)
         self.label_reference = wx.StaticText(self, -1, "Reference scan")
         self.choice_reference = wx.Choice(self, -1, choices=reflist)
@@ -216,6 +245,8 @@ class FixedPointSelectionDialog(wx.Dialog):
         self.label_output = wx.StaticText(self, -1, "Computed value")
         self.choice_output = wx.Choice(self, -1, choices=["Real part","Imaginary part"])
         self.choice_output.SetSelection(imaginary*1.0)
+        self.check_accelerate = wx.CheckBox(self, -1, "Accelerate convergence (Steffensen)")
+        self.check_accelerate.SetValue(accelerate)
         
         self.button_OK = wx.Button(self, wx.ID_OK)
         self.button_Cancel = wx.Button(self, wx.ID_CANCEL)
@@ -237,6 +268,7 @@ class FixedPointSelectionDialog(wx.Dialog):
         sizer.Add(self.input_deviation, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(self.label_output, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(self.choice_output, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.check_accelerate, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(hbox, 0, wx.ALL|wx.EXPAND, 2)
         self.SetSizer(sizer)
         self.Fit()
@@ -248,4 +280,4 @@ class FixedPointSelectionDialog(wx.Dialog):
         self.choice_interp.SetSelection(isel)
     
     def GetValue(self):
-        return self.choice_reference.GetSelection(), self.choice_interp.GetSelection(), float(self.input_thickness.GetValue()), float(self.input_host.GetValue()), float(self.input_deviation.GetValue()), self.choice_output.GetSelection()==1
+        return self.choice_reference.GetSelection(), self.choice_interp.GetSelection(), float(self.input_thickness.GetValue()), float(self.input_host.GetValue()), float(self.input_deviation.GetValue()), self.choice_output.GetSelection()==1, int(self.check_accelerate.GetValue())
@@ -23,7 +23,7 @@
 """
 
 from terapy.filters.base import Filter
-from scipy.fftpack import fft as fft 
+from terapy.filters.spectrum import get_spectrum, frequency_axis, next_fast_length
 import numpy as np
 import wx
 from terapy.core import icon_path
@@ -36,49 +36,51 @@ class FourierTransform(Filter):
     """
     __extname__ = "Fourier transform"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.is_transform = True
         self.output_names = ["Complex (full spectrum)","Amplitude","Phase","Real","Imaginary"]
         self.output_qty = 1 # by default, return amplitude
-        self.config = ["output_qty"]
+        self.fast_length = 0 # if 1, zero-pad data to next fast transform length
+        self.config = ["output_qty","fast_length"]
     
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
+        N = array.shape[axis]
+        span = array.coords[axis][-1] - array.coords[axis][0]
+        dt = array.coords[axis][1]-array.coords[axis][0]
+        # calculate spectrum (shared with other filter banks processing the same data)
+        sp = get_spectrum(array.data, dt, axis, self.fast_length)
         # make frequency axis
-        df  = 1/abs(array.coords[0][-1] - array.coords[0][0])    # time is stored in ps -> 1/ps = THz
-        data_f = np.linspace(0, df*(array.shape[0]-1), array.shape[0])
-        # calculate spectrum 
-        if self.output_qty==0:
-            data_s = fft(array.data)*(array.coords[0][1]-array.coords[0][0]) # complex-valued
-        elif self.output_qty==1:
-            data_s = abs(fft(array.data))*(array.coords[0][1]-array.coords[0][0])
-        elif self.output_qty==2:
-            ft = fft(array.data)
-            data_s = np.arctan2(ft.imag,ft.real)
-        elif self.output_qty==3:
-            data_s = fft(array.data).real*(array.coords[0][1]-array.coords[0][0])
-        elif self.output_qty==4:
-            data_s = fft(array.data).imag*(array.coords[0][1]-array.coords[0][0])
-        
-        array.coords[0] = data_f[:len(data_f)/2-1]
-        array.data = data_s[:len(data_f)/2-1]
-        array.shape = array.data.shape
+        if self.fast_length:
+            # zero-padded length => time span grows accordingly
+            M = next_fast_length(N)
+            span = span*(M-1)/(N-1.0)
+            N = M
+        array.coords[axis] = frequency_axis(N, span)
+        array.data = sp.get(self.output_qty)
+        array.shape = list(array.data.shape)
         return True
 
     def get_units(self, units):
-        if len(units)!=2: return [1,1]
+        if len(units)<2: return [1,1]
+        axis = self.get_units_axis(units)
+        units = units[:]
         if self.output_qty==2:
             from terapy.core.axedit import urg
-            return [1/units[0], urg["rad"]]
+            units[-1] = urg["rad"]
         else:
-            return [1/units[0], units[1]*units[0]]
+            units[-1] = units[-1]*units[axis]
+        units[axis] = 1/units[axis]
+        return units
 
     def set_filter(self, parent = None):
-        dlg = FourierTransformSelectionDialog(parent, title="Fourier transform", output_names = self.output_names, output_qty = self.output_qty)
+        dlg = FourierTransformSelectionDialog(parent, title="Fourier transform", output_names = self.output_names, output_qty = self.output_qty, fast_length = self.fast_length)
         if dlg.ShowModal() == wx.ID_OK:
-            self.output_qty = dlg.GetValue()
+            self.output_qty, self.fast_length = dlg.GetValue()
             dlg.Destroy()
             return True
         else:
@@ -89,11 +91,13 @@ class FourierTransform(Filter):
         return wx.Image(icon_path + "filter-transform.png").ConvertToBitmap()
 
 class FourierTransformSelectionDialog(wx.Dialog):
-    def __init__(self, parent = None, title="Fourier transform", output_names = [], output_qty = 0):
+    def __init__(self, parent = None, title="Fourier transform", output_names = [], output_qty = 0, fast_length = 0):
         wx.Dialog.__init__(self, parent, title=title)
         self.label_output = wx.StaticText(self, -1, "Computed value")
         self.choice_output = wx.Choice(self, -1, choices=output_names)
         self.choice_output.SetSelection(output_qty)
+        self.check_fast = wx.CheckBox(self, -1, "Zero-pad to fast transform length")
+        self.check_fast.SetValue(fast_length)
         self.button_OK = wx.Button(self, wx.ID_OK)
         self.button_Cancel = wx.Button(self, wx.ID_CANCEL)
         
@@ -104,9 +108,10 @@ class FourierTransformSelectionDialog(wx.Dialog):
         sizer = wx.BoxSizer(wx.VERTICAL)
         sizer.Add(self.label_output, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(self.choice_output, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.check_fast, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(hbox, 0, wx.ALL|wx.EXPAND, 2)
         self.SetSizer(sizer)
         self.Fit()
     
     def GetValue(self):
-        return self.choice_output.GetSelection()
+        return self.choice_output.GetSelection(), int(self.check_fast.GetValue())
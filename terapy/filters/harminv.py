@@ -66,10 +66,9 @@ class Harminv(Filter):
         amps = abs(camps)
         phases = np.arctan2(camps.imag,camps.real)
         decays = abs(np.array(res[2]))
-        rc = np.zeros(array.data.shape)*1j
         coords = array.coords[0] - min(array.coords[0])
-        for i in range(len(res[0])):
-            rc = rc + amps[i]*np.exp(-2j*np.pi*res[0][i]*coords + 1j*phases[i] - decays[i]*coords) 
+        # sum all modes at once: exp(outer(t, -2j*pi*f - decay)) . (amp*exp(1j*phase))
+        rc = np.dot(np.exp(np.outer(coords, -2j*np.pi*np.array(res[0]) - decays)), amps*np.exp(1j*phases))
         array.data = rc.real
         return True
     
@@ -91,13 +90,13 @@ class HarminvFilter():
         # adapted from harminv C++ library
         density = 1.0 # must see if it is useful or not to play with this
         self.nb = (fmax-fmin)*dt*density*len(signal)
-        self.c = signal
+        self.c = np.array(signal)
         self.n = len(signal)
         self.nfreqs = -1 # number of computed modes (none at that stage)
         self.nf = nf # number of spectral basis functions
         self.fmin = fmin*dt
         self.fmax = fmax*dt
-        self.K = self.n/2 - 1
+        self.K = self.n//2 - 1
         self.dt = dt
         freqs = np.linspace(fmin*dt,fmax*dt,self.nf)
         self.z = np.exp(-1j*2*np.pi*freqs)
@@ -120,99 +119,73 @@ class HarminvFilter():
         self.D0 = None
         self.generate_U(self.U0, self.U1, 0, self.z, self.z, store_G=True)
     
+    def spectral_sums(self, z, p):
+        # compute G, G_M and D sums over signal for given spectral grid
+        K = self.K
+        M = K - 1
+        m = np.arange(K)
+        c1 = self.c[p:p+K]
+        c2 = self.c[p+K:p+2*K]
+        z_inv = 1.0/z
+        P = np.exp(np.outer(np.log(z_inv),m)) # z_inv^m for all points of grid
+        G = np.dot(P,c1)
+        G_M = np.dot(P,c2)
+        D = np.dot(P,c1*(m+1)) + np.dot(P,c2*(M-m)) * z_inv**M * z_inv
+        return G, G_M, D
+    
     def generate_U(self, U, U1, p, z, z2, store_G=False):
         small = 1e-12
         J = U.shape[0]
         J2 = U.shape[1]
-        K = self.K
-        M = K - 1
-        c = self.c
-        i=0
-        j=0
-        m=0
+        M = self.K - 1
         #if n>=2*K+p: return # too few coefficients
         #if J!=J2: return # invalid size
-        if self.G0!=None:
+        if self.G0 is not None and p==0:
             D = self.D0
             G = self.G0
             G_M = self.G0_M
         else:
-            D = np.zeros(J)*1j
-            G = np.zeros(J)*1j
-            G_M = np.zeros(J)*1j
+            G, G_M, D = self.spectral_sums(z, p)
         
         if J==J2:
             z2_neq_z = (z2!=z).all()
         else:
             z2_neq_z = True
         
-        z_inv = 1.0/z
-        z_m = np.ones(J)+np.zeros(J)*1j
-        z_M = z_inv**M
-        
-        if z2_neq_z:
-            z2_inv = 1.0/z2
-            z2_m = np.ones(J2)+np.zeros(J2)*1j
-            z2_M = z2_inv**M
-            G2 = np.zeros(J2)*1j
-            G2_M = np.zeros(J2)*1j
+        z_M = (1.0/z)**M
+        zi = z[:,np.newaxis]
+        z_Mi = z_M[:,np.newaxis]
+        Gi = G[:,np.newaxis]
+        G_Mi = G_M[:,np.newaxis]
         
-        # loop over signal array to build up spectral functions
-        for m in range(K):
-            c1 = c[m+p]
-            c2 = c[m+p+M+1]
-            d = m+1
-            d2 = M-m
-            if self.G0==None:
-                x1 = z_m*c1
-                x2 = z_m*c2
-                G += x1
-                G_M += x2
-                D += x1 * d + x2 * d2 * z_M * z_inv
-                z_m = z_inv**(m+1)
-            if z2_neq_z:
-                G2 += z2_m*c1
-                G2_M += z2_m*c2
-                z2_m = z2_inv**(m+1)
-            
         if z2_neq_z:
-            for i in range(J):
-                for j in range(J2):
-                    if np.abs(z[i]-z2[j])<small:
-                        U[i, j] = D[i]
-                    else:
-                        U[i, j] = (z[i] * G2[j] - z2[j] * G[i] + z2_M[j] * G_M[i] - z_M[i] * G2_M[j]) / (z[i] - z2[j])
-                
-            if U1!=None:
-                for i in range(J):
-                    for j in range(J2):
-                        if np.abs(z[i]-z2[j])<small:
-                            U1[i, j] = z[i] * (D[i] - G[i]) + z_M[i] * G_M[i]
-                        else:
-                            U1[i, j] = (z[i] * z2[j] * (G2[j] - G[i]) + z2_M[j] * z[i] * G_M[i] - z_M[i] * z2[j] * G2_M[j]) / (z[i] - z2[j])
+            G2, G2_M, D2 = self.spectral_sums(z2, p)
+            z2_M = (1.0/z2)**M
+            # fill spectral matrices for all (i,j) pairs at once
+            dz = zi - z2
+            same = np.abs(dz)<small
+            dz[same] = 1.0
+            U[:,:] = np.where(same, D[:,np.newaxis], (zi * G2 - z2 * Gi + z2_M * G_Mi - z_Mi * G2_M) / dz)
+            if U1 is not None:
+                U1[:,:] = np.where(same, zi * (D[:,np.newaxis] - Gi) + z_Mi * G_Mi, (zi * z2 * (G2 - Gi) + z2_M * zi * G_Mi - z_Mi * z2 * G2_M) / dz)
         else: # z == z2
-            for i in range(J):
-                U[i, i] = D[i]
-                for j in range(i+1,J):
-                    U[i, j] = (z[i] * G[j] - z[j] * G[i] + z_M[j] * G_M[i] - z_M[i] * G_M[j]) / (z[i] - z[j])
+            # compute upper triangle, then mirror it
+            dz = zi - z
+            iu = np.triu_indices(J,1)
+            dz[np.diag_indices(J)] = 1.0
+            V = (zi * G - z * Gi + z_M * G_Mi - z_Mi * G_M) / dz
+            U[:,:] = 0
+            U[iu] = V[iu]
+            U += U.T
+            U[np.diag_indices(J)] = D
+            if U1 is not None:
+                V = (zi * z * (G - Gi) + z_M * zi * G_Mi - z_Mi * z * G_M) / dz
+                U1[:,:] = 0
+                U1[iu] = V[iu]
+                U1 += U1.T
+                U1[np.diag_indices(J)] = z * (D - G) + z_M * G_M
         
-            if U1!=None:
-                for i in range(J):
-                    U1[i, i] = z[i] * (D[i] - G[i]) + z_M[i] * G_M[i]
-                    for j in range(i+1,J):
-                        U1[i, j] = (z[i] * z[j] * (G[j] - G[i]) + z_M[j] * z[i] * G_M[i] - z_M[i] * z[j] * G_M[j]) / (z[i] - z[j])
-                
-                    
-        if not(z2_neq_z):
-            for i in range(J):
-                for j in range(i+1,J):
-                    U[j, i] = U[i, j]
-            
-            if U1!=None:
-                for i in range(J):
-                    for j in range(i+1,J):
-                        U1[j, i] = U1[i, j]
-        if store_G and self.G0==None:
+        if store_G and self.G0 is None:
             self.D0 = D
             self.G0 = G
             self.G0_M = G_M
@@ -226,59 +199,37 @@ class HarminvFilter():
         
         isort = self.isort()
         
-        freqs = map(lambda j: self.get_freq(j)/self.dt, isort)
-        amp = map(lambda j: self.get_amplitude(j), isort)
-        decay = map(lambda j: self.get_decay(j) / abs(self.dt), isort)
-        Q = map(lambda j: self.get_Q(j), isort)
-        err = map(lambda j: self.get_freq_error(j), isort)
+        freqs = self.get_freq()[isort]/self.dt
+        amp = np.array(self.get_amplitude())[isort]
+        decay = self.get_decay()[isort] / abs(self.dt)
+        Q = self.get_Q()[isort]
+        err = np.array(self.get_freq_error())[isort]
         
         self.mode_ok(-2, ok_d)
         
-        q = np.argwhere(map(lambda x: x>=self.fmin/self.dt and x<=self.fmax/self.dt, freqs))
-        q.reshape((q.shape[0],))
-        freqs = map(lambda j: freqs[j], q)
-        amp = map(lambda j: amp[j], q)
-        decay = map(lambda j: decay[j], q)
-        Q = map(lambda j: Q[j], q)
-        err = map(lambda j: err[j], q)
-        
-        return freqs,amp,decay,Q,err
+        q = (freqs>=self.fmin/self.dt) & (freqs<=self.fmax/self.dt)
+        return freqs[q],amp[q],decay[q],Q[q],err[q]
 
     def solve_eigenvects(self, A0):
         [D,W] = npl.eig(A0)
         W = W.T
-        for i in range(W.shape[0]):
-            vnorm = 1.0/np.sqrt(np.sum(W[i,:]*W[i,:]))
-            W[i,:] = W[i,:]*vnorm
+        W = W/np.sqrt(np.sum(W*W,axis=1))[:,np.newaxis]
         return D,W
     
     def harminv_solve_once(self):
         singular_threshold = 1e-5
-        J = self.J
         
         v0,V0 = self.solve_eigenvects(self.U0)
         
         v = np.abs(v0)
         
         max_v0 = np.max(v)
-        self.nfreqs = J
         
-        #v0 = map(lambda x: 0 if np.abs(x)<singular_threshold*max_v0 else x, v0)
-        #self.nfreqs -= sum(map(lambda x:x==0,v0))
-        
-        for i in range(J):
-            if np.abs(v0[i]) < singular_threshold * max_v0:
-                v0[i] = 0
-                self.nfreqs -= 1
-        for i in range(J-2,-1,-1):
-            if v0[i]==0:
-                V0[i:i+1,:] = V0[i+1:i+2,:]
-                v0[i] = v0[i+1]
-                v0[i+1] = 0
-            s = 1.0 / np.sqrt(v0[i])
-            V0[i,:] = V0[i,:]*s
-
-        V0 = V0[:self.nfreqs,:]
+        # drop singular eigenvalues, then normalize remaining eigenvectors
+        keep = v >= singular_threshold * max_v0
+        v0 = v0[keep]
+        V0 = V0[keep,:]/np.sqrt(v0)[:,np.newaxis]
+        self.nfreqs = len(v0)
         
         H1 = np.dot(np.dot(V0,self.U1),V0.T)
         
@@ -305,25 +256,18 @@ class HarminvFilter():
                 nf_ok = cur_nf
 
     def harminv_solve_again(self, ok, ok_d):
-        mode_ok = []
         if self.nfreqs==0: return # no eigensolutions to work with
         if ok:
             ok(-1, ok_d) # initialize
-            for i in range(self.nfreqs):
-                mode_ok.append(ok(i, ok_d))
-                
-        # Spectral grid needs to be on the unit circle or system is unstable
-        j = 0
-        for i in range(self.nfreqs):
-            if not(ok) or mode_ok[i]:
-                self.u[j] = self.u[i]/abs(self.u[i])
-                j+=1
-        self.nfreqs = j
-        
-        if ok:
+            mode_ok = np.array([ok(i, ok_d) for i in range(self.nfreqs)], dtype=bool)
             ok(-2, ok_d) # finish
+        else:
+            mode_ok = np.ones(self.nfreqs, dtype=bool)
         
-        self.u = self.u[:self.nfreqs]
+        # Spectral grid needs to be on the unit circle or system is unstable
+        u = self.u[:self.nfreqs][mode_ok]
+        self.u = u/abs(u)
+        self.nfreqs = len(self.u)
         if self.nfreqs==0: return # no eigensolutions to work with
         
         self.z = self.u
@@ -332,110 +276,104 @@ class HarminvFilter():
         self.nfreqs = 0
         self.harminv_solve_once()
 
-    def get_freq(self, k):
+    def get_freq(self, k=None):
+        # k = None returns values for all modes
+        if k==None:
+            u = self.u[:self.nfreqs]
+            return -np.arctan2(u.imag,u.real)/(2*np.pi)
         if k>=0 and k<self.nfreqs:
             return -np.arctan2(self.u[k].imag,self.u[k].real)/(2*np.pi)
     
-    def get_decay(self, k):
+    def get_decay(self, k=None):
+        if k==None:
+            return -np.log(abs(self.u[:self.nfreqs]))
         if k>=0 and k<self.nfreqs:
             return -np.log(abs(self.u[k]))
     
-    def get_Q(self, k):
-        if k>=0 and k<self.nfreqs:
+    def get_Q(self, k=None):
+        if k==None or (k>=0 and k<self.nfreqs):
             return 2*np.pi*abs(self.get_freq(k))/(2*self.get_decay(k))
 
-    def get_omega(self, k):
+    def get_omega(self, k=None):
+        if k==None:
+            return 1j*np.log(self.u[:self.nfreqs])
         if k>=0 and k<self.nfreqs:
             return 1j*np.log(self.u[k])
     
-    def get_amplitude(self, k):
+    def get_amplitude(self, k=None):
         if not(hasattr(self, 'amps')):
             self.amps = self.compute_amplitudes()
+        if k==None:
+            return self.amps
         return self.amps[k]
 
-    def get_freq_error(self, k):
+    def get_freq_error(self, k=None):
         if not(hasattr(self, 'freqerrs')):
             self.freqerrs = self.compute_frequency_errors()
+        if k==None:
+            return self.freqerrs
         return self.freqerrs[k]
     
     def isort(self,criterion=SORT_FREQUENCY):
         # sort computed eigenvalues by given criterion and return sorted indices
         if criterion==SORT_FREQUENCY:
-            v = map(lambda i: self.get_freq(i),range(self.nfreqs))
+            v = self.get_freq()
         if criterion==SORT_DECAY:
-            v = map(lambda i: self.get_decay(i),range(self.nfreqs))
+            v = self.get_decay()
         if criterion==SORT_ERROR:
-            v = map(lambda i: self.get_freq_error(i),range(self.nfreqs))
+            v = self.get_freq_error()
         if criterion==SORT_AMPLITUDE:
-            v = map(lambda i: self.get_amplitude(i),range(self.nfreqs))
+            v = self.get_amplitude()
         if criterion==SORT_Q:
-            v = map(lambda i: self.get_freq(i)/self.get_decay(i),range(self.nfreqs))
+            v = self.get_freq()/self.get_decay()
         return np.argsort(v)
 
     def u_near_unity(self, u, n):
+        # works on single values as well as arrays
         nlagbsu = n*np.log(abs(u))
-        return (np.log(UNITY_THRESH) < nlagbsu and nlagbsu < -np.log(UNITY_THRESH))
+        return (np.log(UNITY_THRESH) < nlagbsu) & (nlagbsu < -np.log(UNITY_THRESH))
 
     # Return an array (of size self.nfreqs of complex
     # amplitudes of each sinusoid in the solution.
     def compute_amplitudes(self):
-        if self.nfreqs==0: return
-        u = []
-        for k in range(self.nfreqs):
-            if self.u_near_unity(self.u[k],self.n):
-                u.append(self.u[k])
+        if self.nfreqs==0: return np.array([])*1j
+        near = self.u_near_unity(self.u[:self.nfreqs],self.n)
+        u = self.u[:self.nfreqs][near]
         
         Uu = np.zeros((self.J,len(u)))*1j
-        self.generate_U(Uu, None, 0, self.z, np.array(u), store_G=True)
+        self.generate_U(Uu, None, 0, self.z, u, store_G=True)
 
         # compute the amplitudes via eq. 27 of M&T, except when |u| is
         # too small..in that case, the computation of Uu is unstable,
         # and we use eq. 26 instead (which doesn't use half of the data,
         # but doesn't blow up either):
+        B = self.B[:self.nfreqs]
+        a = np.zeros(self.nfreqs)*1j
+        a[near] = np.sum(B[near]*Uu.T, axis=1)/self.K # eq. 27
+        a[~near] = np.dot(B[~near], self.G0) # eq. 26
         
-        ku = 0
-        a = []
-        for k in range(self.nfreqs):
-            asum = 0.0 + 0.0j
-            if self.u_near_unity(self.u[k], self.n): # eq. 27
-                for j in range(self.J):
-                    asum += self.B[k, j] * Uu[j, ku]
-                asum /= self.K
-                ku+=1
-            else: # eq. 26
-                for j in range(self.J):
-                    asum += self.B[k, j] * self.G0[j]
-            a.append(asum * asum)
-        
-        return a
+        return a*a
 
     def compute_frequency_errors(self):
-        if self.nfreqs==0: return
+        if self.nfreqs==0: return np.array([])
         U2 = np.zeros((self.J,self.J))*1j
         self.generate_U(U2, None, 2, self.z, self.z)
         # For each eigenstate, compute an estimate of the error, roughly as suggested in W&N, eq. (2.19).
-        freq_err = []
-        for i in range(self.nfreqs):
-            U2b = np.dot(U2,self.B)
-            
-            # ideally, B[i] should satisfy U2 B[i] = u^2 U0 B[i].
-            # since B U0 B = 1, then we can get a second estimate
-            # for u by sqrt(B[i] U2 B[i]), and from this we compute
-            # the relative error in the (complex) frequency. 
-
-            freq_err.append(abs(np.log(np.sqrt(np.sum(self.B*U2b)) / self.u[i])) / abs(np.log(self.u[i])))
-        
-        return freq_err
+        # ideally, B[i] should satisfy U2 B[i] = u^2 U0 B[i].
+        # since B U0 B = 1, then we can get a second estimate
+        # for u by sqrt(B[i] U2 B[i]), and from this we compute
+        # the relative error in the (complex) frequency. 
+        B = self.B[:self.nfreqs]
+        u = self.u[:self.nfreqs]
+        bUb = np.sum(np.dot(B,U2)*B, axis=1)
+        return abs(np.log(np.sqrt(bUb) / u)) / abs(np.log(u))
     
     def mode_ok(self, k, ok_d):
         if k==-1: # initialize
             ok_d.num_ok = 0
             if self.nfreqs == 0: return 0
-            ok_d.min_err = self.get_freq_error(0)
-            ok_d.max_amp = abs(self.get_amplitude(0))
-            for i in range(1,self.nfreqs):
-                ok_d.min_err = min([ok_d.min_err, self.get_freq_error(i)])
-                ok_d.max_amp = max([ok_d.max_amp, abs(self.get_amplitude(i))])
+            ok_d.min_err = np.min(self.get_freq_error())
+            ok_d.max_amp = np.max(abs(self.get_amplitude()))
         elif k==-2: # finish
             if ok_d.verbose:
                 print "# harminv: %d/%d modes are ok: errs <= %e and %e * %e\n, amps >= %g, %e * %g, |Q| >= %g\n" % (ok_d.num_ok, self.nfreqs, ok_d.err_thresh, ok_d.rel_err_thresh, ok_d.min_err, ok_d.amp_thresh, ok_d.rel_amp_thresh, ok_d.max_amp, ok_d.Q_thresh)
@@ -444,7 +382,7 @@ class HarminvFilter():
             errk = self.get_freq_error(k)
             ampk = abs(self.get_amplitude(k))
 
-            ok = (not(ok_d.only_f_inrange) or (f >= ok_d.fmin and f <= ok_d.fmax)) and (errk <= ok_d.err_thresh) and (errk <= ok_d.min_err * ok_d.rel_err_thresh) and (ampk >= ok_d.amp_thresh) and (ampk >= ok_d.rel_amp_thresh * ok_d.max_amp) and (abs(self.get_Q()) >= ok_d.Q_thresh)
+            ok = (not(ok_d.only_f_inrange) or (f >= ok_d.fmin and f <= ok_d.fmax)) and (errk <= ok_d.err_thresh) and (errk <= ok_d.min_err * ok_d.rel_err_thresh) and (ampk >= ok_d.amp_thresh) and (ampk >= ok_d.rel_amp_thresh * ok_d.max_amp) and (abs(self.get_Q(k)) >= ok_d.Q_thresh)
 
             ok_d.num_ok += ok
 
@@ -23,9 +23,9 @@
 """
 
 from terapy.filters.base import Filter
-from terapy.core.dataman import DataArray
 from terapy.filters.apodization import ApodizationWindow
-from terapy.filters.lowpass import BandpassFilterSelectionDialog
+from terapy.filters.lowpass import BandpassFilterSelectionDialog, edge_window
+from terapy.filters.cache import cached
 import numpy as np
 import wx
 from terapy.core import icon_path
@@ -38,6 +38,7 @@ class HighPass(Filter):
     """
     __extname__ = "High-pass filter"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.window = ApodizationWindow()
@@ -51,36 +52,35 @@ class HighPass(Filter):
         self.config = ["custom","type","size","relative","position"]
     
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
         
         # High-pass filter 
-        p0 = min([np.floor(self.size/100.0*array.shape[0]), np.floor(array.shape[0]/2)])
-        # compute window 
-        wnd = DataArray(shape=[2*p0])
-        wnd.data = np.ones(2*p0)
-        self.window.apply_filter(wnd)
-        # take left half
-        wnd.data[p0:] = max(wnd.data)
-        # compute how much to add
-        shp = max([0,array.shape[0]-2*p0])
+        N = array.shape[axis]
+        p0 = int(min([np.floor(self.size/100.0*N), np.floor(N/2)]))
+        # compute window, take left half
+        wnd, wmax = cached(edge_window, self.type, p0, self.custom, False)
         if self.relative:
             # find max amplitude
-            p1 = array.data.argmax()
+            p1 = array.data.argmax(axis=axis)
         else:
             # take position from config
-            p1 = np.floor((1.0-self.position/100.0)*array.shape[0])
+            p1 = np.floor((1.0-self.position/100.0)*N)
         
-        if p1<p0:
-            fct = np.concatenate((wnd.data,max(wnd.data)*np.ones(shp)))
-        elif p1+p0>array.shape[0]:
-            fct = np.concatenate((max(wnd.data)*np.zeros(shp),wnd.data))
+        # window starts at N-p1-p0, but must fit in data range
+        start = np.where(p1<p0, 0, np.where(p1+p0>N, N-2*p0, N-p1-p0)).astype(int)
+        # before window: 0, after window: max value
+        idx = np.arange(N) - np.expand_dims(start,-1)
+        fct = np.where(idx<0, 0.0, wnd[np.clip(idx,0,2*p0)])
+        if fct.ndim==1:
+            fct = self.expand(fct,array,axis)
         else:
-            fct = np.concatenate((np.zeros(array.shape[0]-p1-p0),wnd.data,np.ones(p1-p0)*max(wnd.data)))
+            fct = np.rollaxis(fct,fct.ndim-1,axis)
         
         array.data = array.data*fct
         return True
-
+    
     def set_filter(self, parent = None):
         dlg = BandpassFilterSelectionDialog(parent, title="High-pass filter window", wlist = self.window_list, sel = self.type, custom = self.custom, sz = self.size, relative = self.relative, position = self.position)
         if dlg.ShowModal() == wx.ID_OK:
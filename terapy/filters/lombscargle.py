@@ -27,6 +27,10 @@ from scipy.signal import lombscargle
 import numpy as np
 import wx
 from terapy.core import icon_path
+from terapy.core.validator import NumberValidator
+
+EXTIRPOLATION_FACTOR = 16 # FFT grid size relative to number of frequencies
+EXTIRPOLATION_ORDER = 10 # number of grid points each sample is spread onto
 
 class LombScargle(Filter):
     """
@@ -39,24 +43,174 @@ class LombScargle(Filter):
     def __init__(self):
         Filter.__init__(self)
         self.is_transform = True
+        self.method = 0 # 0 = exact, 1 = fast (Press-Rybicki)
+        self.methods = ["Exact","Fast (Press-Rybicki)"]
+        self.grid = 0 # 0 = standard, 1 = oversampled
+        self.grids = ["Standard","Oversampled"]
+        self.ofac = 4.0 # oversampling factor for oversampled grid
+        self.config = ["method","grid","ofac"]
     
     def apply_filter(self, array):
         if len(array.shape)!=1:
             return False
         # make frequency axis
+        N = array.shape[0]
         df  = 1/abs(array.coords[0][-1] - array.coords[0][0])    # time is stored in ps -> 1/ps = THz
         my = max(abs(array.data))
-        data_f = np.linspace(df/array.shape[0], df*(array.shape[0]-1)*np.pi, array.shape[0]) # Lomb-Scargle doesn't allow f=0
+        if self.grid==1:
+            # frequency step df/ofac, up to same max. frequency as standard grid
+            nw = max([int(self.ofac*(N-1)/2.0),1])
+            data_f = 2*np.pi*df/self.ofac*np.arange(1,nw+1)
+        else:
+            data_f = np.linspace(df/N, df*(N-1)*np.pi, N) # Lomb-Scargle doesn't allow f=0
         #data_f = data_f[:len(data_f)/2-1] # return frequencies up to 1/dt/2 to be consistent with FFT (not compulsory)
         # calculate spectrum 
-        data_s = abs(lombscargle(array.coords[0], array.data/my, data_f))*my**2
+        if self.method==1 and len(data_f)>1:
+            data_s = abs(fast_lombscargle(array.coords[0], array.data/my, data_f[0], data_f[1]-data_f[0], len(data_f)))*my**2
+        else:
+            data_s = abs(lombscargle(array.coords[0], array.data/my, data_f))*my**2
         array.coords[0] = data_f/(2*np.pi)
         array.data = data_s
+        array.shape = list(data_s.shape)
         return True
 
     def get_units(self, units):
         if len(units)!=2: return [1,1]
         return [1/units[0], units[1]]
     
+    def set_filter(self, parent = None):
+        dlg = LombScargleDialog(parent, methods = self.methods, method = self.method, grids = self.grids, grid = self.grid, ofac = self.ofac)
+        if dlg.ShowModal() == wx.ID_OK:
+            self.method, self.grid, self.ofac = dlg.GetValue()
+            dlg.Destroy()
+            return True
+        else:
+            dlg.Destroy()
+            return False
+    
     def get_icon(self):
         return wx.Image(icon_path + "filter-transform.png").ConvertToBitmap()
+
+def extirpolate(x, h, n, order = EXTIRPOLATION_ORDER):
+    """
+    
+        Spread values at non-integer positions onto a periodic regular grid
+        such that sums of smooth functions are preserved (Press & Rybicki, 1989).
+        
+        Parameters:
+            x        -    positions, in grid units (float array)
+            h        -    values (complex array)
+            n        -    grid size (int)
+            order    -    number of grid points each value is spread onto (int)
+        
+        Output:
+            values on regular grid (complex array)
+    
+    """
+    x = np.mod(x, n)
+    nodes = np.floor(x).astype(int)[:,np.newaxis] - (order//2 - 1) + np.arange(order)
+    d = x[:,np.newaxis] - nodes
+    g = np.zeros(n)*1j
+    for i in range(order):
+        # Lagrange polynomial for node i
+        L = np.ones(len(x))
+        for j in range(order):
+            if j!=i:
+                L = L*d[:,j]/(i-j)
+        idx = np.mod(nodes[:,i], n)
+        g += np.bincount(idx, weights=(h*L).real, minlength=n) + 1j*np.bincount(idx, weights=(h*L).imag, minlength=n)
+    return g
+
+def trig_sums(t, h, w0, dw, nw):
+    """
+    
+        Compute sum_j h_j exp(i w_k t_j) on frequency grid w_k = w0 + k dw, k = 0..nw-1,
+        by extirpolation and FFT.
+        
+        Parameters:
+            t     -    sample positions (float array)
+            h     -    sample values (float array)
+            w0    -    first angular frequency (float)
+            dw    -    angular frequency step (float)
+            nw    -    number of frequencies (int)
+        
+        Output:
+            trigonometric sums (complex array)
+    
+    """
+    n = int(2**np.ceil(np.log2(EXTIRPOLATION_FACTOR*nw)))
+    g = extirpolate(t*dw*n/(2*np.pi), h*np.exp(1j*w0*t), n)
+    return np.fft.ifft(g)[:nw]*n
+
+def fast_lombscargle(x, y, w0, dw, nw):
+    """
+    
+        Compute Lomb-Scargle periodogram in O(N log N) operations (Press & Rybicki, 1989).
+        Output matches scipy.signal.lombscargle.
+        
+        Parameters:
+            x     -    sample positions (float array)
+            y     -    sample values (float array)
+            w0    -    first angular frequency (float)
+            dw    -    angular frequency step (float)
+            nw    -    number of frequencies (int)
+        
+        Output:
+            periodogram (float array)
+    
+    """
+    t = x - x[0] # periodogram doesn't depend on time origin
+    N = len(t)
+    S1 = trig_sums(t, y, w0, dw, nw) # sums of y*cos(wt), y*sin(wt)
+    S2 = trig_sums(t, np.ones(N), 2*w0, 2*dw, nw) # sums of cos(2wt), sin(2wt)
+    cc = (N + S2.real)/2.0 # sum of cos(wt)**2
+    ss = (N - S2.real)/2.0 # sum of sin(wt)**2
+    cs = S2.imag/2.0 # sum of cos(wt)*sin(wt)
+    tau2 = np.arctan2(2*cs, cc-ss) # 2*w*tau
+    c_tau = np.cos(tau2/2)
+    s_tau = np.sin(tau2/2)
+    xc = S1.real
+    xs = S1.imag
+    return 0.5*((c_tau*xc + s_tau*xs)**2/(c_tau**2*cc + 2*c_tau*s_tau*cs + s_tau**2*ss) + (c_tau*xs - s_tau*xc)**2/(c_tau**2*ss - 2*c_tau*s_tau*cs + s_tau**2*cc))
+
+class LombScargleDialog(wx.Dialog):
+    def __init__(self, parent = None, title="Lomb-Scargle periodogram", methods = [], method = 0, grids = [], grid = 0, ofac = 4.0):
+        wx.Dialog.__init__(self, parent, title=title)
+        self.label_method = wx.StaticText(self, -1, "Method")
+        self.choice_method = wx.Choice(self, -1, choices=methods)
+        self.choice_method.SetSelection(method)
+        self.label_grid = wx.StaticText(self, -1, "Frequency grid")
+        self.choice_grid = wx.Choice(self, -1, choices=grids)
+        self.choice_grid.SetSelection(grid)
+        self.label_ofac = wx.StaticText(self, -1, "Oversampling factor")
+        self.input_ofac = wx.TextCtrl(self, -1, str(ofac), validator=NumberValidator(negative=False))
+        self.button_OK = wx.Button(self, wx.ID_OK)
+        self.button_Cancel = wx.Button(self, wx.ID_CANCEL)
+        
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        hbox.AddStretchSpacer(1)
+        hbox.Add(self.button_Cancel, 0, wx.RIGHT|wx.ALIGN_RIGHT, 5)
+        hbox.Add(self.button_OK, 0, wx.RIGHT|wx.ALIGN_RIGHT, 5)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.label_method, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.choice_method, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_grid, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.choice_grid, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_ofac, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_ofac, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(hbox, 0, wx.ALL|wx.EXPAND, 2)
+        self.SetSizer(sizer)
+        self.Fit()
+        self.onGridSelect()
+        
+        self.Bind(wx.EVT_CHOICE, self.onGridSelect, self.choice_grid)
+    
+    def onGridSelect(self, event = None):
+        state = (self.choice_grid.GetSelection()==1)
+        self.label_ofac.Enable(state)
+        self.input_ofac.Enable(state)
+    
+    def GetValue(self):
+        ofac = float(self.input_ofac.GetValue())
+        if ofac<1: ofac = 1.0
+        return self.choice_method.GetSelection(), self.choice_grid.GetSelection(), ofac
@@ -23,8 +23,8 @@
 """
 
 from terapy.filters.base import Filter
-from terapy.core.dataman import DataArray
-from terapy.filters.apodization import ApodizationWindow
+from terapy.filters.apodization import ApodizationWindow, window
+from terapy.filters.cache import cached
 import numpy as np
 import wx
 from terapy.core import icon_path
@@ -37,6 +37,7 @@ class LowPass(Filter):
     """
     __extname__ = "Low-pass filter"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.window = ApodizationWindow()
@@ -50,32 +51,29 @@ class LowPass(Filter):
         self.config = ["custom","type","size","relative","position"]
     
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
         # Low-pass filter 
-        p0 = min([np.floor(self.size/100.0*array.shape[0]), np.floor(array.shape[0]/2)])
-        # compute window 
-        wnd = DataArray(shape=[2*p0])
-        wnd.data = np.ones(2*p0)
-        self.window.apply_filter(wnd)
-        # take right half
-        wnd.data[:p0] = max(wnd.data)
-        # compute how much to add
-        shp = max([0,array.shape[0]-2*p0])
+        N = array.shape[axis]
+        p0 = int(min([np.floor(self.size/100.0*N), np.floor(N/2)]))
+        # compute window, take right half
+        wnd, wmax = cached(edge_window, self.type, p0, self.custom, True)
         if self.relative:
             # find max amplitude
-            p1 = array.data.argmax()
+            p1 = array.data.argmax(axis=axis)
         else:
             # take position from config
-            p1 = np.floor(self.position/100.0*array.shape[0])
-        
-        if p1<p0:
-            fct = np.concatenate((wnd.data,np.zeros(shp)))
-        elif p1+p0>array.shape[0]:
-            fct = np.concatenate((max(wnd.data)*np.ones(shp),wnd.data))
+            p1 = np.floor(self.position/100.0*N)
+        # window starts at p1-p0, but must fit in data range
+        start = np.clip(p1-p0,0,N-2*p0).astype(int)
+        # before window: max value, after window: 0
+        idx = np.arange(N) - np.expand_dims(start,-1)
+        fct = np.where(idx<0, wmax, wnd[np.clip(idx,0,2*p0)])
+        if fct.ndim==1:
+            fct = self.expand(fct,array,axis)
         else:
-            fct = np.concatenate((np.ones(p1-p0)*max(wnd.data),wnd.data,np.zeros(array.shape[0]-p1-p0)))
-        
+            fct = np.rollaxis(fct,fct.ndim-1,axis)
         array.data = array.data*fct
         return True
     
@@ -94,6 +92,31 @@ class LowPass(Filter):
     def get_icon(self):
         return wx.Image(icon_path + "filter-lopass.png").ConvertToBitmap()
 
+def edge_window(type, p0, custom, falling):
+    """
+    
+        Compute window edge for band-pass filters.
+        Window has size 2*p0, and one half of it is set to window max. value.
+        
+        Parameters:
+            type       -    window type, as in ApodizationWindow.window_list (int)
+            p0         -    half window size (int)
+            custom     -    custom window function (str)
+            falling    -    if True, keep right (falling) half, else left (rising) half (bool)
+        
+        Output:
+            window followed by value beyond window (numpy array), window max. value (float)
+    
+    """
+    wnd = np.ones(2*p0)*window(type, 2*p0, custom)
+    wmax = max(wnd) if p0>0 else 1.0
+    if falling:
+        wnd[:p0] = wmax
+        return np.concatenate((wnd,[0.0])), wmax
+    else:
+        wnd[p0:] = wmax
+        return np.concatenate((wnd,[wmax])), wmax
+
 class BandpassFilterSelectionDialog(wx.Dialog):
     def __init__(self, parent = None, title="", wlist = [], sel = 0, custom = "", sz = 0, relative = True, position = 25):
         wx.Dialog.__init__(self, parent, title=title)
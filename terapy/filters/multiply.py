@@ -34,6 +34,7 @@ class Multiply(Filter):
     """
     __extname__ = "Multiply by factor"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.factor = 1.0
@@ -43,6 +44,12 @@ class Multiply(Filter):
         array.data = array.data*self.factor
         return True
     
+    def get_operator(self, array):
+        factor = self.factor
+        def op(data):
+            data *= factor
+        return op, factor
+    
     def set_filter(self, parent = None):
         dlg = wx.TextEntryDialog(parent,message="Multiplication factor",defaultValue=str(self.factor))
         if dlg.ShowModal() == wx.ID_OK:
@@ -23,7 +23,7 @@
 """
 
 from terapy.filters.base import Filter
-from scipy.interpolate import interp1d
+from terapy.filters.resample import resample, same_grid
 import wx
 from terapy.core import icon_path
 from wx.lib.pubsub import setupkwargs
@@ -51,11 +51,32 @@ class Normalize(Filter):
     def apply_filter(self, array):
         if len(array.shape)!=1 or self.ref==None:
             return False
-        i1d = interp1d(array.coords[0],array.data,kind=self.methods[self.imethod],bounds_error=False,fill_value=0.0)
+        array.data = resample(array.coords[0],array.data,self.ref.coords[0],kind=self.methods[self.imethod])/self.ref.data
         array.coords[0] = self.ref.coords[0]
-        array.data = i1d(self.ref.coords[0])/self.ref.data
         array.shape = self.ref.shape
         return True
+    
+    def get_operator(self, array):
+        if len(array.shape)!=1 or self.ref==None or not(self.same_grid(array)):
+            return None
+        ref = self.ref.data
+        def op(data):
+            data /= ref
+        return op, ref
+    
+    def same_grid(self, array):
+        """
+        
+            Check if given array is sampled on reference grid.
+            
+            Parameters:
+                array    -    data array (DataArray)
+            
+            Output:
+                True if coordinates are identical (bool)
+        
+        """
+        return same_grid(array.coords[0],self.ref.coords[0])
         
     def set_filter(self, parent = None):
         # need parent with history object providing several functions (see core.history for details)
@@ -24,7 +24,7 @@
 
 from terapy.filters.base import Filter
 import wx
-from numpy import mean
+from numpy import arange, maximum, expand_dims, ones
 from terapy.core import icon_path
 
 class Offset(Filter):
@@ -35,6 +35,7 @@ class Offset(Filter):
     """
     __extname__ = "Offset correction"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.position = 3.0
@@ -42,20 +43,56 @@ class Offset(Filter):
         self.config = ["position","width"]
 
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
-        pmin = abs(array.data).argmax()
-        dx = array.coords[0][1]-array.coords[0][0] # assume uniform sampling
-        pmin = pmin - int(self.position/dx + self.width/2.0/dx)
-        if pmin<0:
-            pmin = 0
-        
-        pmax = pmin + 1 + int(self.width/dx)
         
-        avg = mean(array.data[pmin:pmax])
-        array.data = array.data - avg
+        dx = array.coords[axis][1]-array.coords[axis][0] # assume uniform sampling
+        array.data = array.data - self.get_offset(array.data, axis, dx)
         return True
     
+    def get_operator(self, array):
+        axis = self.get_axis(array)
+        if axis==None:
+            return None
+        dx = array.coords[axis][1]-array.coords[axis][0] # assume uniform sampling
+        # offset has type of trace average, which may differ from data type (e.g. integers, single precision)
+        # in that case, offset must be computed before data type changes => filter is applied on its own
+        sample = ones((1,1), dtype=array.data.dtype)
+        mask = sample>0
+        if ((sample*mask).sum(axis=0)/mask.sum(axis=0)).dtype!=array.data.dtype:
+            return None
+        def op(data):
+            data -= self.get_offset(data, axis, dx)
+        return op, None
+    
+    def get_offset(self, data, axis, dx):
+        """
+        
+            Compute offset of each trace along given axis.
+            
+            Parameters:
+                data    -    data (numpy array)
+                axis    -    axis index (int)
+                dx      -    coordinate step (float)
+            
+            Output:
+                offsets, broadcastable to data (numpy array)
+        
+        """
+        N = data.shape[axis]
+        pmin = abs(data).argmax(axis=axis)
+        pmin = pmin - int(self.position/dx + self.width/2.0/dx)
+        pmin = maximum(pmin,0)
+        pmax = pmin + 1 + int(self.width/dx)
+        # average over [pmin,pmax[ for each trace
+        idx = self.expand(arange(N),data,axis)
+        pmin = expand_dims(pmin,axis)
+        pmax = expand_dims(pmax,axis)
+        mask = (idx>=pmin)*(idx<pmax)
+        avg = (data*mask).sum(axis=axis)/mask.sum(axis=axis)
+        return expand_dims(avg,axis)
+    
     def set_filter(self, parent = None):
         dlg = OffsetDialog(parent,position=self.position, width = self.width)
         if dlg.ShowModal() == wx.ID_OK:
@@ -34,6 +34,7 @@ class Power(Filter):
     """
     __extname__ = "Raise to power n"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.power = 2.0
@@ -43,6 +44,12 @@ class Power(Filter):
         array.data = array.data**self.power
         return True
     
+    def get_operator(self, array):
+        power = self.power
+        def op(data):
+            data **= power
+        return op, power
+    
     def set_filter(self, parent = None):
         dlg = wx.TextEntryDialog(parent,message="Power exponent",defaultValue=str(self.power))
         if dlg.ShowModal() == wx.ID_OK:
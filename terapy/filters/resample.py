@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Resampling of data onto another coordinate grid
+
+    Identical grids are detected and left untouched. For nearest neighbour
+    and linear interpolation, index and weight tables are computed once per
+    grid pair and kept in kernel cache. Other interpolation kinds fall back
+    to scipy's interp1d. Points outside source grid are set to 0.
+
+"""
+
+import numpy as np
+import hashlib
+from scipy.interpolate import interp1d
+from terapy.filters.cache import kernels, freeze
+
+def same_grid(x, xi):
+    """
+
+        Check if two coordinate vectors are identical.
+
+        Parameters:
+            x     -    first grid (numpy array)
+            xi    -    second grid (numpy array)
+
+        Output:
+            True/False
+
+    """
+    return x is xi or (len(x)==len(xi) and np.array_equal(x,xi))
+
+def is_uniform(x, rtol=1e-9):
+    """
+
+        Check if coordinate vector is increasing with constant step.
+
+        Parameters:
+            x       -    grid (numpy array)
+            rtol    -    tolerance on step, relative to mean step (float)
+
+        Output:
+            True/False
+
+    """
+    if len(x)<2:
+        return False
+    dx = np.diff(x)
+    step = (x[-1]-x[0])/(len(x)-1.0)
+    return step>0 and bool((abs(dx-step)<=rtol*step).all())
+
+def grid_key(x):
+    """
+
+        Return hashable key identifying given coordinate vector.
+
+        Parameters:
+            x    -    grid (numpy array)
+
+        Output:
+            key (tuple)
+
+    """
+    x = np.ascontiguousarray(x, dtype=float)
+    return (hashlib.md5(x).hexdigest(), len(x))
+
+def make_table(kind, x, xi):
+    """
+
+        Compute interpolation table from grid x to grid xi.
+
+        Parameters:
+            kind    -    "nearest" or "linear" (str)
+            x       -    source grid (numpy array)
+            xi      -    destination grid (numpy array)
+
+        Output:
+            sorting permutation of x (numpy array, or None if x is sorted),
+            left indices (numpy array), right weights (numpy array),
+            mask of points inside source grid (numpy array)
+
+    """
+    x = np.asarray(x, dtype=float)
+    xi = np.asarray(xi, dtype=float)
+    perm = None
+    if (np.diff(x)<0).any():
+        perm = np.argsort(x, kind='mergesort')
+        x = x[perm]
+    inside = (xi>=x[0])&(xi<=x[-1])
+    if kind=="nearest":
+        # same rounding as interp1d: halfway points go to left neighbour
+        idx = np.searchsorted((x[1:]+x[:-1])/2.0, xi, side='left')
+        w = np.zeros(len(xi))
+    else:
+        idx = np.clip(np.searchsorted(x, xi, side='right')-1, 0, max(0,len(x)-2))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = (xi-x[idx])/(x[np.minimum(idx+1,len(x)-1)]-x[idx])
+        w[~np.isfinite(w)] = 0.0
+    return perm, idx, w, inside
+
+def get_table(kind, x, xi):
+    """
+
+        Return interpolation table from grid x to grid xi, from cache if possible.
+
+        Parameters:
+            see make_table
+
+        Output:
+            see make_table
+
+    """
+    key = ("resample", kind, grid_key(x), grid_key(xi))
+    table = kernels.get(key)
+    if table is None:
+        table = freeze(make_table(kind, x, xi))
+        kernels.set(key, table)
+    return table
+
+def resample(x, y, xi, kind="linear", axis=-1):
+    """
+
+        Resample data defined on grid x onto grid xi.
+        Data may hold several traces, which are resampled at once.
+
+        Parameters:
+            x       -    source grid (numpy array)
+            y       -    data, sampled on x along given axis (numpy array)
+            xi      -    destination grid (numpy array)
+            kind    -    "nearest", "linear", "quadratic" or "cubic" (str)
+            axis    -    axis of y corresponding to x (int)
+
+        Output:
+            resampled data (numpy array); y itself if grids are identical
+
+    """
+    if same_grid(x, xi):
+        return y
+    if not(kind in ["nearest","linear"]) or len(x)<2:
+        return interp1d(x, y, kind=kind, axis=axis, bounds_error=False, fill_value=0.0)(xi)
+    y = np.asarray(y)
+    axis = axis % y.ndim
+    perm, idx, w, inside = get_table(kind, x, xi)
+    if perm is not None:
+        y = np.take(y, perm, axis=axis)
+    shape = [1]*y.ndim
+    shape[axis] = -1
+    if kind=="nearest":
+        yi = np.take(y, idx, axis=axis)
+    else:
+        w = np.reshape(w, shape)
+        yi = np.take(y, idx, axis=axis)*(1-w) + np.take(y, np.minimum(idx+1,y.shape[axis]-1), axis=axis)*w
+    return np.where(np.reshape(inside, shape), yi, 0.0)
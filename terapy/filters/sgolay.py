@@ -27,6 +27,7 @@ from terapy.filters.base import Filter
 import numpy as np
 import wx
 from terapy.core import icon_path
+from terapy.filters.cache import cached
 
 class SavitzkyGolay(Filter):
     """
@@ -37,6 +38,7 @@ class SavitzkyGolay(Filter):
     """
     __extname__ = "Savitzky-Golay smoothing"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.size = 11
@@ -46,10 +48,10 @@ class SavitzkyGolay(Filter):
         self.config = ["size","order"]
 
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
         # from SciPy cookbook http://wiki.scipy.org/Cookbook/SavitzkyGolay
-        from math import factorial
         try:
             self.size = np.abs(np.int(self.size))
             self.order = np.abs(np.int(self.order))
@@ -59,17 +61,22 @@ class SavitzkyGolay(Filter):
             raise TypeError("self.size size must be a positive odd number")
         if self.size < self.order + 2:
             raise TypeError("self.size is too small for the polynomial order")
-        order_range = range(self.order+1)
         half_window = (self.size -1) // 2
         # precompute coefficients
-        b = np.mat([[k**i for i in order_range] for k in range(-half_window, half_window+1)])
-        m = np.linalg.pinv(b).A[self.deriv] * self.rate**self.deriv * factorial(self.deriv)
+        m = cached(sgolay_coefficients, self.size, self.order, self.deriv, self.rate)
         # pad the signal at the extremes with
         # values taken from the signal itself
-        firstvals = array.data[0] - np.abs( array.data[1:half_window+1][::-1] - array.data[0] )
-        lastvals = array.data[-1] + np.abs(array.data[-half_window-1:-1][::-1] - array.data[-1])
-        data_y = np.concatenate((firstvals, array.data, lastvals))
-        array.data = np.convolve( m[::-1], data_y, mode='valid')
+        y0 = self.slice_axis(array.data,slice(0,1),axis)
+        y1 = self.slice_axis(array.data,slice(-1,None),axis)
+        firstvals = y0 - np.abs( self.slice_axis(array.data,slice(half_window,0,-1),axis) - y0 )
+        lastvals = y1 + np.abs( self.slice_axis(array.data,slice(-2,-half_window-2,-1),axis) - y1 )
+        data_y = np.concatenate((firstvals, array.data, lastvals), axis=axis)
+        # convolution along axis, one window coefficient at a time
+        N = array.shape[axis]
+        res = 0.0
+        for k in range(len(m)):
+            res = res + m[k]*self.slice_axis(data_y,slice(k,k+N),axis)
+        array.data = res
         return True
     
     def set_filter(self, parent = None):
@@ -85,6 +92,27 @@ class SavitzkyGolay(Filter):
     def get_icon(self):
         return wx.Image(icon_path + "filter-denoise.png").ConvertToBitmap()
 
+def sgolay_coefficients(size, order, deriv, rate):
+    """
+    
+        Compute Savitzky-Golay convolution coefficients.
+        
+        Parameters:
+            size     -    window size (odd int)
+            order    -    polynomial order (int)
+            deriv    -    derivative order (int)
+            rate     -    sampling rate factor (float)
+        
+        Output:
+            coefficients (numpy array)
+    
+    """
+    from math import factorial
+    order_range = range(order+1)
+    half_window = (size -1) // 2
+    b = np.mat([[k**i for i in order_range] for k in range(-half_window, half_window+1)])
+    return np.linalg.pinv(b).A[deriv] * rate**deriv * factorial(deriv)
+
 class SGSmoothingSelectionDialog(wx.Dialog):
     def __init__(self, parent = None, title="Savitzky-Golay smoothing", sz = 11, order = 5):
         wx.Dialog.__init__(self, parent, title=title)
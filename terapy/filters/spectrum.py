@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Shared spectrum computation service
+
+    Spectra are computed once per data set and kept in a small cache,
+    such that filter banks working on the same data (e.g. amplitude and
+    phase canvases) share a single transform.
+
+"""
+
+import numpy as np
+import hashlib
+from terapy.filters.cache import LRUCache, cached
+
+spectra = LRUCache(32) # computed spectra
+
+def next_fast_length(n):
+    """
+
+        Return smallest 5-smooth number (2^a*3^b*5^c) larger or equal to given length.
+
+        Parameters:
+            n    -    length (int)
+
+        Output:
+            fast transform length (int)
+
+    """
+    if n<=1: return 1
+    best = 2**int(np.ceil(np.log2(n)))
+    p5 = 1
+    while p5<best:
+        p35 = p5
+        while p35<best:
+            # smallest power of 2 such that p35*2^a >= n
+            q = -(-n//p35)
+            m = p35*2**int(np.ceil(np.log2(q)))
+            if m<best: best = m
+            p35 *= 3
+        p5 *= 5
+    return best
+
+def frequency_axis(N, span):
+    """
+
+        Return frequency axis corresponding to given time axis.
+        Axes are cached per (N, span).
+
+        Parameters:
+            N       -    number of points (int)
+            span    -    time span (float)
+
+        Output:
+            positive frequencies (numpy array)
+
+    """
+    return cached(make_frequency_axis, N, span).copy()
+
+def make_frequency_axis(N, span):
+    df  = 1/abs(span)    # time is stored in ps -> 1/ps = THz
+    return np.linspace(0, df*(N-1), N)[:N//2-1]
+
+class Spectrum():
+    """
+
+        Spectrum class
+
+        Hold the positive half of a discrete Fourier transform and
+        derive the usual quantities from it.
+
+    """
+    def __init__(self, data, dt, axis):
+        """
+
+            Initialization.
+
+            Parameters:
+                data    -    complex spectrum, positive frequencies (numpy array)
+                dt      -    time step (float)
+                axis    -    frequency axis (int)
+
+        """
+        self.data = data
+        self.data.flags.writeable = False
+        self.dt = dt
+        self.axis = axis
+
+    def complex(self):
+        return self.data*self.dt
+
+    def amplitude(self):
+        return abs(self.data)*self.dt
+
+    def phase(self):
+        return np.arctan2(self.data.imag,self.data.real)
+
+    def real(self):
+        return self.data.real*self.dt
+
+    def imag(self):
+        return self.data.imag*self.dt
+
+    def get(self, qty):
+        """
+
+            Return selected quantity.
+
+            Parameters:
+                qty    -    0 = complex, 1 = amplitude, 2 = phase, 3 = real part, 4 = imaginary part (int)
+
+            Output:
+                computed quantity (numpy array)
+
+        """
+        return [self.complex, self.amplitude, self.phase, self.real, self.imag][qty]()
+
+def get_spectrum(data, dt, axis=-1, fast=False):
+    """
+
+        Compute spectrum of given data, or get it from cache.
+
+        Parameters:
+            data    -    time-domain data (numpy array)
+            dt      -    time step (float)
+            axis    -    time axis (int)
+            fast    -    if True, zero-pad data to next fast transform length (bool)
+
+        Output:
+            spectrum (Spectrum)
+
+    """
+    data = np.ascontiguousarray(data)
+    axis = axis % data.ndim
+    N = data.shape[axis]
+    if fast:
+        N = next_fast_length(N)
+    key = (hashlib.md5(data).hexdigest(), data.shape, data.dtype.str, dt, axis, N)
+    sp = spectra.get(key)
+    if sp!=None:
+        return sp
+
+    sl = [slice(None)]*data.ndim
+    sl[axis] = slice(0,N//2-1)
+    if np.iscomplexobj(data):
+        sp = np.fft.fft(data, n=N, axis=axis)[tuple(sl)]
+    else:
+        sp = np.fft.rfft(data, n=N, axis=axis)[tuple(sl)]
+    sp = Spectrum(sp, dt, axis)
+    spectra.set(key, sp)
+    return sp
+
+def clear_cache():
+    """
+
+        Empty spectrum cache.
+
+    """
+    spectra.clear()
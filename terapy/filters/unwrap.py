@@ -35,27 +35,28 @@ class PhaseUnwrapping(Filter):
     """
     __extname__ = "Phase unwrapping"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.threshold = 1.0 # unwrap threshold (in units of pi)
         self.config = ["threshold"]
     
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
         
-        if isinstance(array.data[0],complex):
+        if np.iscomplexobj(array.data):
             phase = np.arctan2(array.data.imag,array.data.real)
-            array.data = np.unwrap(-phase,np.pi*self.threshold)
+            array.data = np.unwrap(-phase,np.pi*self.threshold,axis=axis)
             #array.data = abs(array.data)*np.exp(1j*np.unwrap(phase,np.pi*self.threshold))
         else:
-            array.data = np.unwrap(np.array(array.data),np.pi*self.threshold)
-        
+            array.data = np.unwrap(np.array(array.data),np.pi*self.threshold,axis=axis)
         return True
-
+    
     def get_units(self, units):
-        if len(units)!=2: return [1,1]
-        return [units[0], units[1]]
+        if len(units)<2: return [1,1]
+        return units[:]
 
     def set_filter(self, parent = None):
         dlg = wx.TextEntryDialog(parent,message="Unwrap threshold (in units of pi)",defaultValue=str(self.threshold))
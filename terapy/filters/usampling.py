@@ -24,7 +24,7 @@
 
 from terapy.filters.base import Filter
 import numpy as np
-from scipy.interpolate import interp1d
+from terapy.filters.resample import resample, is_uniform
 import wx
 from terapy.core import icon_path
 
@@ -46,14 +46,22 @@ class UniformSampling(Filter):
         if len(array.shape)!=1:
             return False
         
-        s = array.coords[0].argsort()
-        array.coords[0] = array.coords[0][s]
-        array.data = array.data[s]
+        # discard unmeasured points (e.g. unused points of adaptive scans)
+        s = np.isfinite(array.coords[0])*np.isfinite(array.data)
+        if s.sum()<2:
+            return False
+        if s.all() and is_uniform(array.coords[0]):
+            return True # already uniformly sampled
+        data_x = array.coords[0][s]
+        data_y = array.data[s]
+        if (np.diff(data_x)<0).any():
+            s = data_x.argsort()
+            data_x = data_x[s]
+            data_y = data_y[s]
         
-        data_xi = np.linspace(array.coords[0].min(),array.coords[0].max(),array.shape[0])
+        data_xi = np.linspace(data_x.min(),data_x.max(),array.shape[0])
         
-        i1d = interp1d(array.coords[0],array.data,kind=self.methods[self.imethod],bounds_error=False,fill_value=0.0)
-        array.data = i1d(data_xi)
+        array.data = resample(data_x,data_y,data_xi,kind=self.methods[self.imethod])
         array.coords[0] = data_xi
         return True
 
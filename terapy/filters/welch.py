@@ -23,10 +23,11 @@
 """
 
 from terapy.filters.base import Filter
-from scipy.signal import welch 
+from scipy.signal import welch, get_window
 import numpy as np
 import wx
 from terapy.core import icon_path
+from terapy.filters.cache import cached
 
 class Welch(Filter):
     """
@@ -36,6 +37,7 @@ class Welch(Filter):
     """
     __extname__ = "Welch periodogram"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.window_list = ["Boxcar", "Triangular", "Blackman", "Hamming", "Hann", "Bartlett", "Flat top", "Parzen", "Bohman", "Blackman-Harris", "Nuttall", "Bartlett-Hann"]
@@ -48,20 +50,21 @@ class Welch(Filter):
         self.config = ["type","length","overlap","scaling"]
         
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
         # make frequency axis
-        fmax = 1/(array.coords[0][1] - array.coords[0][0])
+        fmax = 1/(array.coords[axis][1] - array.coords[axis][0])
         # calculate spectrum
-        val_length = np.floor(self.length/100.0*array.shape[0])
+        val_length = int(np.floor(self.length/100.0*array.shape[axis]))
         if val_length<1:
             val_length=1
-        val_overlap = np.floor(val_length*self.overlap/100.0)
-        
-        a = welch(array.data,fs=fmax,window=self.window_code[self.type],nperseg=val_length,noverlap=val_overlap,scaling=['density','spectrum'][self.scaling])
+        val_overlap = int(np.floor(val_length*self.overlap/100.0))
+        wnd = cached(get_window, self.window_code[self.type], val_length)
+        a = welch(array.data,fs=fmax,window=wnd,nperseg=val_length,noverlap=val_overlap,scaling=['density','spectrum'][self.scaling],axis=axis)
         array.data = abs(a[1])
-        array.coords[0] = a[0]
-        array.shape[0] = len(array.data)
+        array.coords[axis] = a[0]
+        array.shape = list(array.data.shape)
         return True
     
     def set_filter(self, parent = None):
@@ -75,8 +78,11 @@ class Welch(Filter):
             return False
 
     def get_units(self, units):
-        if len(units)!=2: return [1,1]
-        return [1/units[0], units[1]]
+        if len(units)<2: return [1,1]
+        axis = self.get_units_axis(units)
+        units = units[:]
+        units[axis] = 1/units[axis]
+        return units
     
     def get_icon(self):
         return wx.Image(icon_path + "filter-transform.png").ConvertToBitmap()
@@ -28,6 +28,7 @@ from statsmodels.robust import stand_mad
 import numpy as np
 import wx
 from terapy.core import icon_path
+from terapy.filters.cache import cached
 
 class WaveletDenoise(Filter):
     """
@@ -37,6 +38,7 @@ class WaveletDenoise(Filter):
     """
     __extname__ = "Wavelet denoising"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
         self.wl_filter_list = []
@@ -52,25 +54,40 @@ class WaveletDenoise(Filter):
         self.config = ["threshold","auto_threshold","type","thresholding"]
 
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
-        mlv = pywt.dwt_max_level(array.shape[0],pywt.Wavelet(self.type))
-        coeffs = pywt.wavedec(array.data, self.type, level=mlv, mode='per')
+        N = array.shape[axis]
+        wavelet = cached(pywt.Wavelet, self.type)
+        mlv = cached(pywt.dwt_max_level, N, wavelet.dec_len)
+        if array.data.ndim==1:
+            coeffs = pywt.wavedec(array.data, wavelet, level=mlv, mode='per')
+        else:
+            coeffs = pywt.wavedec(array.data, wavelet, level=mlv, mode='per', axis=axis)
         if self.auto_threshold:
-            sigma = stand_mad(coeffs[-1])
+            # one threshold per trace
+            sigma = stand_mad(coeffs[-1], axis=axis)
             uthresh = sigma*np.sqrt(2*np.log(len(coeffs)))
-            self.threshold = uthresh
+            if np.ndim(uthresh)>0:
+                self.threshold = float(np.mean(uthresh))
+                uthresh = np.expand_dims(uthresh,axis)
+            else:
+                self.threshold = uthresh
         else:
             uthresh = self.threshold
+        
         denoised = coeffs[:]
         if self.thresholding==0: # Hard thresholding
             denoised[1:] = (pywt.thresholding.hard(i, value=uthresh) for i in denoised[1:])
         elif self.thresholding==1: # Soft thresholding
             denoised[1:] = (pywt.thresholding.soft(i, value=uthresh) for i in denoised[1:])
-        signal = pywt.waverec(denoised, self.type, mode='per')
-        array.data = signal[0:array.shape[0]]
+        if array.data.ndim==1:
+            signal = pywt.waverec(denoised, wavelet, mode='per')
+        else:
+            signal = pywt.waverec(denoised, wavelet, mode='per', axis=axis)
+        array.data = self.slice_axis(signal,slice(0,N),axis)
         return True
-
+    
     def set_filter(self, parent = None):
         dlg = WaveletSelectionDialog(parent, wlist = self.wl_filter_list, sel = self.wl_filter_code.index(self.type), thresh = self.thresholding, atr = self.auto_threshold, trval = self.threshold)
         if dlg.ShowModal() == wx.ID_OK:
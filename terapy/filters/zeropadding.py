@@ -35,26 +35,36 @@ class ZeroPadding(Filter):
     """
     __extname__ = "Zero padding"
     dim = 1
+    multi_dim = True
     def __init__(self):
         Filter.__init__(self)
     
     def apply_filter(self, array):
-        if len(array.shape)!=1:
+        axis = self.get_axis(array)
+        if axis==None:
             return False
+        
         # zero-padding to power-of-2 length
-        nw = 2**numpy.ceil(numpy.log2(array.shape[0]))
-        dw = nw-array.shape[0]
-        dx = array.coords[0][1]-array.coords[0][0]
+        N = array.shape[axis]
+        nw = 2**numpy.ceil(numpy.log2(N))
+        dw = nw-N
+        dx = array.coords[axis][1]-array.coords[axis][0]
+        shape = list(array.data.shape)
         if dw>1:
-            nm = numpy.floor(dw/2)
-            np = numpy.ceil(dw/2)
-            array.data = numpy.concatenate((numpy.zeros(nm), array.data, numpy.zeros(np)))
-            array.coords[0] = numpy.concatenate((numpy.arange(-dx*nm,0,dx)+min(array.coords[0]), array.coords[0], numpy.arange(dx,dx*(np+1),dx)+max(array.coords[0])))
+            nm = int(numpy.floor(dw/2))
+            np = int(numpy.ceil(dw/2))
+            shape[axis] = nm
+            zm = numpy.zeros(shape)
+            shape[axis] = np
+            zp = numpy.zeros(shape)
+            array.data = numpy.concatenate((zm, array.data, zp), axis=axis)
+            array.coords[axis] = numpy.concatenate((numpy.arange(-dx*nm,0,dx)+min(array.coords[axis]), array.coords[axis], numpy.arange(dx,dx*(np+1),dx)+max(array.coords[axis])))
         elif dw==1:
-            array.data = numpy.concatenate((array.data,[0]))
-            array.coords[0] = numpy.concatenate((array.coords[0], [dx+max(array.coords[0])]))
-            
+            shape[axis] = 1
+            array.data = numpy.concatenate((array.data,numpy.zeros(shape)), axis=axis)
+            array.coords[axis] = numpy.concatenate((array.coords[axis], [dx+max(array.coords[axis])]))
+        array.shape = list(array.data.shape)
         return True
-
+    
     def get_icon(self):
         return wx.Image(icon_path + "filter-zeropadding.png").ConvertToBitmap()
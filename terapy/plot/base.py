@@ -24,6 +24,7 @@
 
 import wx
 from terapy.core.axedit import ConvertUnits, FormatUnits
+from terapy.core.threads import postprocess_pool
 from wx.lib.pubsub import setupkwargs
 from wx.lib.pubsub import pub
 
@@ -35,12 +36,14 @@ class PlotCanvas(wx.Panel):
         Properties:
             is_data    -    if True, canvas is meant to display raw measurement data (bool)
             is_filter  -    if True, canvas is meant to display post-processed data (bool)
+            is_slice   -    if True, canvas displays cuts of arrays of dimension dim or higher (bool)
             dim        -    dimension of plots displayed on this canvas (int)
             name       -    name of canvas type (str)
     
     """
     is_data = False
     is_filter = False
+    is_slice = False
     dim = -1
     name = "Plot"
     def __init__(self, parent=None, id=-1,  *args, **kwargs):
@@ -141,6 +144,15 @@ class PlotCanvas(wx.Panel):
         """
         pass
     
+    def UpdateLive(self):
+        """
+        
+            Update canvas while data are being acquired.
+            By default, do a full update.
+        
+        """
+        self.Update()
+    
     def PopupMenuItems(self,menu):
         """
         
@@ -339,15 +351,41 @@ class Plot():
         """
         self.canvas.Update()
     
+    def UpdateLive(self):
+        """
+        
+            Update plot display while data are being acquired.
+        
+        """
+        self.canvas.UpdateLive()
+    
     def Recompute(self):
         """
         
             Recompute plot data.
+            Post-processing is done by a worker thread, and stale results are discarded.
         
         """
         if self.canvas.is_filter:
             array = self.source.GetData()
-            self.SetData(self.canvas.bank.ApplyFilters(array))
+            gen = postprocess_pool.new_generation(self)
+            postprocess_pool.submit(self, gen, self.canvas.bank.ApplyFilters, (array,), self.OnRecomputed)
+        else:
+            self.OnRecomputed(None)
+    
+    def OnRecomputed(self, array):
+        """
+        
+            Actions triggered when recomputed plot data are ready.
+            
+            Parameters:
+                array    -    new plot data (DataArray), or None if unchanged
+        
+        """
+        if array!=None:
+            if self.canvas.plots.count(self)==0:
+                return # plot has been removed meanwhile
+            self.SetData(array)
         if len(self.children)>0:
             self.children[0].Recompute()
         self.Update()
@@ -24,12 +24,14 @@
 
 from terapy.plot.base import PlotCanvas
 from terapy.plot.plot1d import Plot1D
+from terapy.plot.style import trace_colors
 from wx.lib.pubsub import setupkwargs
 from wx.lib.pubsub import pub
 from terapy.filters import FilterBank
 from terapy.core.axedit import AxisInfos, ConvertUnits, FormatUnits, du
 from terapy.core.plotpanel import PlotPanel
 import matplotlib
+import numpy as np
 import wx
 
 class PlotCanvas1D(PlotCanvas,PlotPanel):
@@ -81,8 +83,14 @@ class PlotCanvas1D(PlotCanvas,PlotPanel):
         self.labels = [xlabel, ylabel]
         self.SetLabels()
         
+        self.live = False # if True, lines are animated and redrawn by blitting
+        self.background = None # axes background, without animated lines
+        self.mpl_connect('draw_event', self.OnDraw)
+        self.axes.callbacks.connect('xlim_changed', self.OnViewChange)
+        
         self.Bind(wx.EVT_LEFT_DCLICK, self.OnLeftDblClick, self)
         self.Bind(wx.EVT_RIGHT_DOWN, self.OnRightClick, self)
+        self.Bind(wx.EVT_SIZE, self.OnSize, self)
     
     def OnLeftDblClick(self, event):
         """
@@ -147,6 +155,8 @@ class PlotCanvas1D(PlotCanvas,PlotPanel):
                 event    -    wx.Event
         
         """
+        if self.live:
+            self.StopLive()
         # update labels
         self.SetLabels()
         # update axes ranges
@@ -159,6 +169,149 @@ class PlotCanvas1D(PlotCanvas,PlotPanel):
         except:
             pass
     
+    def UpdateLive(self):
+        """
+        
+            Update canvas while data are being acquired.
+            Static background is cached and only lines are redrawn, unless
+            data leave current axes limits.
+        
+        """
+        if not(self.IsShownOnScreen()) or not(self.director.canDraw()):
+            self.background = None # redraw everything when possible
+            return
+        if not(self.live):
+            self.StartLive()
+        for x in self.plots:
+            if not(x.plot.get_animated()):
+                # line added meanwhile
+                x.plot.set_animated(True)
+                self.background = None
+        if self.NeedsRescale():
+            self.background = None
+            self.RescaleLive()
+        if self.background==None:
+            # full redraw when idle, background is stored by OnDraw
+            self.draw_idle()
+            return
+        self.restore_region(self.background)
+        for x in self.plots:
+            self.axes.draw_artist(x.plot)
+        self.blit(self.axes.bbox)
+    
+    def StartLive(self):
+        """
+        
+            Switch to live rendering: lines are drawn over cached background.
+        
+        """
+        self.live = True
+        self.background = None
+        for x in self.plots:
+            x.plot.set_animated(True)
+    
+    def StopLive(self):
+        """
+        
+            Switch back to normal rendering.
+        
+        """
+        self.live = False
+        self.background = None
+        for x in self.plots:
+            x.plot.set_animated(False)
+    
+    def NeedsRescale(self):
+        """
+        
+            Tell if plotted data exceed current axes limits.
+            
+            Output:
+                True/False
+        
+        """
+        if not(self.axes.get_autoscale_on()):
+            return False # user defined limits
+        self.axes.relim()
+        data = self.axes.dataLim
+        if not(np.isfinite(data.bounds).all()):
+            return False # no valid data
+        view = self.axes.viewLim
+        xmin, xmax = sorted(view.intervalx)
+        ymin, ymax = sorted(view.intervaly)
+        return data.x0<xmin or data.x1>xmax or data.y0<ymin or data.y1>ymax
+    
+    def RescaleLive(self):
+        """
+        
+            Rescale axes to data, leaving room in the direction in which data grow,
+            so that growing data trigger few full redraws.
+        
+        """
+        old = [self.axes.get_xlim(), self.axes.get_ylim()]
+        try:
+            self.axes.autoscale_view()
+        except:
+            return
+        scales = [self.axes.get_xscale(), self.axes.get_yscale()]
+        setters = [self.axes.set_xlim, self.axes.set_ylim]
+        new = [self.axes.get_xlim(), self.axes.get_ylim()]
+        for n in range(2):
+            if scales[n]!='linear' or old[n][0]>old[n][1]:
+                continue
+            lo, hi = new[n]
+            span = 0.25*(hi-lo)
+            if lo<old[n][0]: lo -= span
+            if hi>old[n][1]: hi += span
+            setters[n](lo, hi, auto=None) # keep autoscale state
+    
+    def OnDraw(self, event):
+        """
+        
+            Actions triggered after figure has been drawn.
+            In live mode, store background and draw animated lines over it.
+            
+            Parameters:
+                event    -    matplotlib.backend_bases.DrawEvent
+        
+        """
+        if self.live:
+            self.background = self.copy_from_bbox(self.axes.bbox)
+            for x in self.plots:
+                self.axes.draw_artist(x.plot)
+    
+    def OnSize(self, event):
+        """
+        
+            Actions triggered when canvas is resized.
+            
+            Parameters:
+                event    -    wx.Event
+        
+        """
+        self.background = None
+        wx.CallAfter(self.OnViewChange, redraw=True)
+        event.Skip()
+    
+    def OnViewChange(self, axes=None, redraw=False):
+        """
+        
+            Actions triggered when displayed range or canvas size changed.
+            Recompute displayed points of decimated plots.
+            
+            Parameters:
+                axes      -    matplotlib.axes.Axes
+                redraw    -    if True, redraw canvas if displayed points changed (bool)
+        
+        """
+        if not(self):
+            return # canvas destroyed meanwhile
+        changed = False
+        for x in self.plots:
+            changed = x.Decimate() or changed
+        if changed and redraw:
+            self.draw_idle()
+    
     def SetImage(self, n=1):
         """
         
@@ -243,14 +396,12 @@ class PlotCanvas1D(PlotCanvas,PlotPanel):
                     x.color = x.array.color
                     Nc+=1
 
-        Np = len(self.plots)-Nc        
-        np = Np-1
+        colors = trace_colors(len(self.plots)-Nc)
         for x in self.plots:
             if x.color != None:
                 color = x.color
             else:
-                color = (1.0-(np+1.0)/(Np*1.0),0.0,(np+1.0)/(Np*1.0))
-                np -= 1
+                color = colors.pop(0)
             if x.source==None:
                 x.SetColor(color)
                 y = x.children
@@ -25,12 +25,15 @@
 from terapy.plot.base import PlotCanvas
 from wx.lib.pubsub import setupkwargs
 from wx.lib.pubsub import pub
-from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.transforms import Bbox
+from matplotlib.image import AxesImage
 from terapy.plot.plot2d import Plot2D
+from terapy.plot.style import colormaps, make_image
 from terapy.core.axedit import AxisInfos, FormatUnits, du
 from terapy.core.plotpanel import PlotPanel
 import wx
 import matplotlib
+import numpy as np
 
 class PlotCanvas2D(PlotCanvas,PlotPanel):
     """
@@ -87,24 +90,19 @@ class PlotCanvas2D(PlotCanvas,PlotPanel):
         self.set_location(False)
         self.set_selection(False)
         # generate colormap
-        cdict = {'red': ((0.0, 0.0, 0.0),(0.5, 1.0, 1.0),(1.0, 1.0, 0.0)),
-                'green': ((0.0, 0.0, 0.0),(0.5, 1.0, 1.0),(1.0, 0.0, 0.0)),
-                'blue': ((0.0, 0.0, 1.0),(0.5, 1.0, 1.0),(1.0, 0.0, 0.0))}
-        self._2d_cmap = LinearSegmentedColormap('my_colormap',cdict,256)        
-        cdict = {'red': ((0.0, 0.0, 1.0),(1.0, 1.0, 0.0)),
-                'green': ((0.0, 0.0, 1.0),(1.0, 0.0, 0.0)),
-                'blue': ((0.0, 0.0, 1.0),(1.0, 0.0, 0.0))}
-        self._2d_cmap_pos = LinearSegmentedColormap('my_colormap_pos',cdict,256)
-        
-        cdict = {'red': ((0.0, 0.0, 0.0),(1.0, 1.0, 0.0)),
-                'green': ((0.0, 0.0, 0.0),(1.0, 1.0, 0.0)),
-                'blue': ((0.0, 0.0, 1.0),(1.0, 1.0, 0.0))}
-        self._2d_cmap_neg = LinearSegmentedColormap('my_colormap_neg',cdict,256)
+        self._2d_cmap, self._2d_cmap_pos, self._2d_cmap_neg = colormaps()
 
         # send color change event to notify history from change
         pub.sendMessage("plot.color_change")
 
+        self.image = None # image artist, kept between updates
+        self.colorbar = None
+        self.drawn = False # if True, figure has been drawn with current layout
+        self.shown = None # last displayed data, to find changed rows
+        self.mpl_connect('draw_event', self.OnDraw)
+        
         self.Bind(wx.EVT_LEFT_DCLICK, self.OnLeftDblClick, self)
+        self.Bind(wx.EVT_SIZE, self.OnSize, self)
     
     def Destroy(self):
         PlotCanvas.Destroy(self)
@@ -163,18 +161,26 @@ class PlotCanvas2D(PlotCanvas,PlotPanel):
         
         """
         if len(self.plots)>0:
-            # get new instance
-            self.get_figure().clear()
-            fig = self.get_figure()
-            self.axes = fig.gca()
-            # plot data
-            extent = [min(self.plots[0].array.coords[0]), max(self.plots[0].array.coords[0]), min(self.plots[0].array.coords[1]), max(self.plots[0].array.coords[1])]
-            plt = self.axes.imshow(self.plots[0].array.data, origin='lower', cmap=self._2d_cmap, interpolation='nearest', extent = extent, aspect="auto")
-            # autoscale and generate colorbar
+            array = self.plots[0].array
+            extent = [min(array.coords[0]), max(array.coords[0]), min(array.coords[1]), max(array.coords[1])]
+            if self.image==None or self.image.get_array().shape!=array.data.shape:
+                # get new instance
+                self.get_figure().clear()
+                fig = self.get_figure()
+                self.axes = fig.gca()
+                # plot data
+                self.image, self.colorbar = make_image(fig, self.axes, array, self._2d_cmap)
+            else:
+                # re-use image and colorbar
+                self.image.set_data(array.data)
+                self.image.set_extent(extent)
+                self.image.autoscale()
+                self.colorbar.update_normal(self.image)
+            self.shown = None
+            # autoscale
             self.axes.set_aspect('auto')
             self.axes.set_autoscale_on(True)
             self.axes.autoscale_view(True,False,False)
-            fig.colorbar(plt,format="%0.1e")
             self.SetLabels()
             # redraw
             try:
@@ -183,6 +189,125 @@ class PlotCanvas2D(PlotCanvas,PlotPanel):
             except:
                 pass
     
+    def UpdateLive(self):
+        """
+        
+            Update canvas while data are being acquired.
+            Image data are replaced in place, and only rows that changed
+            are drawn over current figure and blitted to screen. Colorbar
+            is redrawn only if data exceed its range, which is then extended
+            with some margin.
+        
+        """
+        if len(self.plots)==0:
+            return
+        if not(self.IsShownOnScreen()) or not(self.director.canDraw()):
+            self.drawn = False # redraw everything when possible
+            return
+        data = self.plots[0].array.data
+        if self.image==None or self.image.get_array().shape!=data.shape:
+            self.Update()
+            return
+        rows = self.ChangedRows(data)
+        if rows==None:
+            return # nothing changed
+        self.image.set_data(data)
+        # extend color scale if needed
+        with np.errstate(invalid='ignore'):
+            vmin, vmax = np.nanmin(data), np.nanmax(data)
+        cmin, cmax = self.image.get_clim()
+        if np.isfinite(vmin) and np.isfinite(vmax) and (vmin<cmin or vmax>cmax):
+            # leave room in the direction in which data grow
+            lo, hi = min(vmin,cmin), max(vmax,cmax)
+            span = 0.25*(hi-lo)
+            if vmin<cmin: lo -= span
+            if vmax>cmax: hi += span
+            self.image.set_clim(lo,hi)
+            self.colorbar.update_normal(self.image)
+            self.drawn = False
+        if not(self.drawn):
+            # full redraw when idle
+            self.draw_idle()
+            return
+        # draw changed rows only, over current figure
+        x0, x1, y0, y1 = self.image.get_extent()
+        dy = (y1-y0)/float(data.shape[0])
+        # image of changed rows, not attached to axes so that axes limits aren't changed
+        band = AxesImage(self.axes, cmap=self.image.get_cmap(), norm=self.image.norm, interpolation='nearest', origin='lower', extent=[x0, x1, y0+rows[0]*dy, y0+(rows[1]+1)*dy])
+        band.set_figure(self.get_figure())
+        band.set_transform(self.axes.transData)
+        band.set_clip_path(self.axes.patch)
+        band.set_data(data[rows[0]:rows[1]+1])
+        self.axes.draw_artist(band)
+        self.blit(self.RowsBbox(rows))
+    
+    def ChangedRows(self, data):
+        """
+        
+            Find range of data rows that changed since last display.
+            
+            Parameters:
+                data    -    displayed data (numpy array)
+            
+            Output:
+                first and last changed rows (tuple), or None if nothing changed
+        
+        """
+        if self.shown is None or self.shown.shape!=data.shape:
+            self.shown = np.array(data)
+            return 0, data.shape[0]-1
+        diff = (data!=self.shown) & ~(np.isnan(data) & np.isnan(self.shown))
+        idx = np.flatnonzero(diff.reshape(data.shape[0],-1).any(axis=1))
+        if len(idx)==0:
+            return None
+        self.shown[idx[0]:idx[-1]+1] = data[idx[0]:idx[-1]+1]
+        return idx[0], idx[-1]
+    
+    def RowsBbox(self, rows):
+        """
+        
+            Compute screen region covered by given range of image rows.
+            
+            Parameters:
+                rows    -    first and last row (tuple)
+            
+            Output:
+                region (matplotlib.transforms.Bbox)
+        
+        """
+        x0, x1, y0, y1 = self.image.get_extent()
+        dy = (y1-y0)/float(self.image.get_array().shape[0])
+        p = self.axes.transData.transform([[x0, y0+rows[0]*dy], [x1, y0+(rows[1]+1)*dy]])
+        ymin, ymax = sorted([p[0][1], p[1][1]])
+        band = Bbox.from_extents(self.axes.bbox.x0, ymin-1, self.axes.bbox.x1, ymax+1)
+        region = Bbox.intersection(band, self.axes.bbox)
+        if region==None:
+            return self.axes.bbox
+        return region
+    
+    def OnDraw(self, event):
+        """
+        
+            Actions triggered after figure has been drawn.
+            
+            Parameters:
+                event    -    matplotlib.backend_bases.DrawEvent
+        
+        """
+        self.drawn = True
+    
+    def OnSize(self, event):
+        """
+        
+            Actions triggered when canvas is resized.
+            
+            Parameters:
+                event    -    wx.Event
+        
+        """
+        self.drawn = False
+        event.Skip()
+    
     def Delete(self, event=None):
         """
         
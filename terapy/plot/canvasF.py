@@ -28,6 +28,7 @@ import functools
 from wx.lib.pubsub import setupkwargs
 from wx.lib.pubsub import pub
 from terapy.filters import FilterBank
+from terapy.core.threads import postprocess_pool
 from terapy.core.axedit import AxisInfos, du
 
 class PlotCanvasF(PlotCanvas1D):
@@ -59,6 +60,8 @@ class PlotCanvasF(PlotCanvas1D):
         """
         PlotCanvas1D.__init__(self,parent,id, xlabel, ylabel, xscale, yscale)
         self.bank = FilterBank()
+        self.pending = 0 # number of plots being post-processed
+        self.update_pending = False # if True, a display update is scheduled
         pub.subscribe(self.PostProcess, "filter.change")
         self.Bind(wx.EVT_WINDOW_DESTROY,self.OnDelete)
     
@@ -73,6 +76,7 @@ class PlotCanvasF(PlotCanvas1D):
         """
         PlotCanvas1D.OnDelete(self,event)
         pub.unsubscribe(self.PostProcess, "filter.change")
+        postprocess_pool.cancel(self)
         event.Skip()
 
     def OnRightClick(self, event):
@@ -141,6 +145,8 @@ class PlotCanvasF(PlotCanvas1D):
         """
         
             Post-process displayed data.
+            Plots are processed in parallel by worker threads, and updated as results come.
+            Results of a previous call that are still pending are discarded.
             
             Parameters:
                 inst    -    pubsub event data (filter.FilterBank)
@@ -148,9 +154,54 @@ class PlotCanvasF(PlotCanvas1D):
         """
         if inst == self.bank:
             self.bank.RecomputeReference()
+            gen = postprocess_pool.new_generation(self)
+            self.pending = len(self.plots)
+            if self.pending==0:
+                self.PostProcessChildren()
             for x in self.plots:
-                x.SetData(self.bank.ApplyFilters(x.source.array))
+                # supersedes single plot updates, and is superseded by later ones
+                plot_gen = postprocess_pool.new_generation(x)
+                postprocess_pool.submit(self, gen, self.bank.ApplyFilters, (x.source.array,), functools.partial(self.OnPostProcessed, x, plot_gen))
+    
+    def OnPostProcessed(self, plt, plot_gen, array):
+        """
+        
+            Actions triggered when post-processed data are ready.
+            
+            Parameters:
+                plt         -    plot (Plot1D)
+                plot_gen    -    plot job generation when processing was requested (int)
+                array       -    post-processed data (DataArray), or None if processing failed
+        
+        """
+        self.pending -= 1
+        # plot may have been recomputed on its own since (see Plot.Recompute)
+        if array!=None and self.plots.count(plt)>0 and postprocess_pool.is_current(plt, plot_gen):
+            plt.SetData(array)
+        if self.pending==0:
             self.Update()
-            if len(self.children)>0:
-                inst = self.children[-1].bank
-                self.children[-1].PostProcess(inst)
+            self.PostProcessChildren()
+        elif array!=None:
+            # schedule single update for results arriving together
+            if not(self.update_pending):
+                self.update_pending = True
+                wx.CallAfter(self.UpdateProcessed)
+    
+    def UpdateProcessed(self):
+        """
+        
+            Update canvas with results received so far.
+        
+        """
+        self.update_pending = False
+        self.Update()
+    
+    def PostProcessChildren(self):
+        """
+        
+            Post-process data of child canvas, if any.
+        
+        """
+        if len(self.children)>0:
+            inst = self.children[-1].bank
+            self.children[-1].PostProcess(inst)
@@ -0,0 +1,479 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Canvas class for slices of N-D plots
+
+"""
+
+from terapy.plot.base import PlotCanvas
+from terapy.plot.plot2d import Plot2D
+from terapy.plot.style import colormaps
+from terapy.plot.scheduler import scheduler
+from terapy.core.axedit import AxisInfos
+from terapy.core.plotpanel import PlotPanel
+from wx.lib.pubsub import setupkwargs
+from wx.lib.pubsub import pub
+import wx
+import numpy as np
+
+class PlotCanvasN(PlotCanvas,PlotPanel):
+    """
+
+        Canvas class for slices of N-D plots
+
+        Displays a 2D or 1D cut of a data array of 3 or more dimensions.
+        Indices along other axes are selected with sliders, or follow the
+        current scan position. Only displayed cut is read from data array,
+        such that data stored on disk (e.g. memory-mapped) aren't loaded
+        in memory as a whole.
+
+        Properties:
+            is_data    -    if True, canvas is meant to display raw measurement data (bool)
+            is_filter  -    if True, canvas is meant to display post-processed data (bool)
+            is_slice   -    if True, canvas displays cuts of arrays of dimension dim or higher (bool)
+            dim        -    dimension of plots displayed on this canvas (int)
+            name       -    name of canvas type (str)
+
+    """
+    is_data = True
+    is_slice = True
+    name = "Slice viewer"
+    dim = 3
+    def __init__(self, parent=None, id=-1):
+        """
+
+            Initialization.
+
+            Parameters:
+                parent    -    parent window (wx.Window)
+                id        -    id (int)
+
+        """
+        PlotPanel.__init__(self,parent,id)
+        PlotCanvas.__init__(self,parent,id)
+
+        fig = self.get_figure()
+        self.axes = fig.gca()
+        self.axes.grid(True)
+
+        self.labels = [] # labels of array axes, followed by label of data
+        self.view = [] # displayed axes: [vertical, horizontal] for 2D cuts, [horizontal] for 1D cuts
+        self.index = [] # indices along every axis (those of displayed axes are ignored)
+        self.follow = True # if True, indices follow current scan position
+        self.controls = None # slice selection dialog
+
+        self.set_zoom(False)
+        self.set_location(False)
+        self.set_selection(False)
+        self._2d_cmap = colormaps()[0]
+
+        # send color change event to notify history from change
+        pub.sendMessage("plot.color_change")
+
+        self.image = None # image artist, for 2D cuts
+        self.colorbar = None
+        self.line = None # line artist, for 1D cuts
+
+        self.Bind(wx.EVT_LEFT_DCLICK, self.EditSlice, self)
+
+    def Destroy(self):
+        if self.controls!=None:
+            self.controls.Destroy()
+        PlotCanvas.Destroy(self)
+        PlotPanel.Destroy(self)
+
+    def AddPlot(self,array=None):
+        """
+
+            Add plot to canvas.
+            Data are displayed in their own units, such that large arrays
+            don't need to be rescaled.
+
+            Parameters:
+                array    -    data array to be displayed (DataArray)
+
+        """
+        self.is_full = True
+        self.dim = len(array.shape)
+        self.labels = []
+        for x in array.axes + [array.input]:
+            try:
+                self.labels.append(x.copy())
+            except:
+                self.labels.append(AxisInfos())
+        self.view = [self.dim-2, self.dim-1]
+        self.index = [0]*self.dim
+        plt = Plot2D(self,array)
+        self.plots.append(plt)
+        self.Update()
+        return plt
+
+    def SetLabels(self):
+        """
+
+            Set axes labels, and show indices of cut in title.
+
+        """
+        if len(self.view)==0:
+            return
+        array = self.plots[0].array
+        if len(self.view)==2:
+            self.axes.set_xlabel(self.labels[self.view[1]].label())
+            self.axes.set_ylabel(self.labels[self.view[0]].label())
+        else:
+            self.axes.set_xlabel(self.labels[self.view[0]].label())
+            self.axes.set_ylabel(self.labels[-1].label())
+        title = []
+        for n in range(self.dim):
+            if self.view.count(n)==0:
+                title.append("%s = %g" % (self.labels[n].name, array.coords[n][self.index[n]]))
+        self.axes.set_title(", ".join(title))
+
+    def GetCut(self):
+        """
+
+            Read displayed cut from data array.
+
+            Output:
+                cut data, with rows along vertical axis for 2D cuts (numpy array)
+
+        """
+        array = self.plots[0].array
+        idx = [slice(None) if self.view.count(n)>0 else self.index[n] for n in range(self.dim)]
+        data = np.asarray(array.data[tuple(idx)])
+        if len(self.view)==2 and self.view[0]>self.view[1]:
+            data = data.T
+        return data
+
+    def ShowCut(self):
+        """
+
+            Set displayed cut to plot artists. Artists are re-used if
+            cut type and shape didn't change.
+
+        """
+        array = self.plots[0].array
+        data = self.GetCut()
+        coords = [array.coords[n] for n in self.view]
+        fig = self.get_figure()
+        if len(self.view)==2:
+            extent = [min(coords[1]), max(coords[1]), min(coords[0]), max(coords[0])]
+            if self.image==None or self.image.get_array().shape!=data.shape:
+                fig.clear()
+                self.axes = fig.gca()
+                self.line = None
+                self.image = self.axes.imshow(data, origin='lower', cmap=self._2d_cmap, interpolation='nearest', extent = extent, aspect="auto")
+                self.colorbar = fig.colorbar(self.image,format="%0.1e")
+            else:
+                self.image.set_data(data)
+                self.image.set_extent(extent)
+                self.image.autoscale()
+                self.colorbar.update_normal(self.image)
+        else:
+            if self.line==None:
+                fig.clear()
+                self.axes = fig.gca()
+                self.axes.grid(True)
+                self.image = None
+                self.colorbar = None
+                self.line = self.axes.plot(coords[0], data, color=(0.0,0.0,1.0))[0]
+            else:
+                self.line.set_data(coords[0], data)
+            self.axes.relim()
+            self.axes.autoscale_view()
+        self.SetLabels()
+
+    def Update(self, event=None):
+        """
+
+            Update canvas.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        if len(self.plots)>0:
+            self.ShowCut()
+            # redraw
+            try:
+                # this can fail with invalid data (e.g. undefined/NaN/...)
+                self.draw()
+            except:
+                pass
+
+    def UpdateLive(self):
+        """
+
+            Update canvas while data are being acquired, or slice is changed.
+            Only displayed cut is read again.
+
+        """
+        if len(self.plots)==0:
+            return
+        if self.follow:
+            self.FollowScan()
+        self.ShowCut()
+        self.draw_idle()
+
+    def FollowScan(self):
+        """
+
+            Set indices of non-displayed axes to current scan position.
+
+        """
+        idx = [int(x) for x in self.plots[0].array.idx]
+        index = [idx[n] if self.view.count(n)==0 else self.index[n] for n in range(self.dim)]
+        if index!=self.index:
+            self.index = index
+            if self.controls!=None:
+                self.controls.SetIndex(self.index)
+
+    def SetSlice(self, view, index, follow):
+        """
+
+            Set displayed cut.
+            Canvas is redrawn with next frame of render scheduler, such that
+            fast slider motions don't pile up redraws.
+
+            Parameters:
+                view      -    displayed axes (list of int)
+                index     -    indices along every axis (list of int)
+                follow    -    if True, indices follow scan position (bool)
+
+        """
+        self.view = view
+        self.index = index
+        self.follow = follow
+        scheduler.invalidate(self)
+
+    def EditSlice(self, event=None):
+        """
+
+            Open slice selection dialog.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        if len(self.plots)==0:
+            return
+        if self.controls==None:
+            array = self.plots[0].array
+            self.controls = SliceDialog(self, labels=self.labels[:-1], coords=array.coords, view=self.view, index=self.index, follow=self.follow)
+        self.controls.Show()
+        self.controls.Raise()
+
+    def Delete(self, event=None):
+        """
+
+            Delete canvas.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        if len(self.plots)>0:
+            while len(self.plots)>0:
+                plt = self.plots.pop()
+                plt.Delete()
+            if len(self.plots)==0:
+                pub.sendMessage("plot.empty_page", inst=self)
+
+    def PopupMenuItems(self,menu):
+        """
+
+            Add popup menu items for canvas to given menu.
+
+            Parameters:
+                menu    -    wx.Menu
+
+        """
+        mitem = menu.Append(wx.NewId(),"&Select slice")
+        menu.Bind(wx.EVT_MENU, self.EditSlice, id=mitem.Id)
+
+    def SetName(self, name="Plot"):
+        """
+
+            Set canvas tab name.
+
+            Parameters:
+                name    -    name (str)
+
+        """
+        idx = self.parent.FindCanvas(self)
+        if idx>-1:
+            self.parent.SetPageText(idx,name)
+
+    def SetImage(self, n=2):
+        """
+
+            Set canvas tab icon.
+
+            Parameters:
+                n    -    icon index in parent image list (int)
+
+        """
+        PlotCanvas.SetImage(self, n)
+
+class SliceDialog(wx.Dialog):
+    """
+
+        Slice selection dialog
+
+        Changes are applied to canvas as they are made.
+
+    """
+    def __init__(self, parent = None, title="Select slice", labels = [], coords = [], view = [], index = [], follow = True):
+        """
+
+            Initialization.
+
+            Parameters:
+                parent    -    parent canvas (PlotCanvasN)
+                title     -    dialog title (str)
+                labels    -    labels of array axes (list of AxisInfos)
+                coords    -    coordinates along array axes (list of numpy arrays)
+                view      -    displayed axes (list of int)
+                index     -    indices along every axis (list of int)
+                follow    -    if True, indices follow scan position (bool)
+
+        """
+        wx.Dialog.__init__(self, parent, title=title, style=wx.DEFAULT_DIALOG_STYLE|wx.RESIZE_BORDER)
+        self.canvas = parent
+        self.coords = coords
+        self.names = [x.name if x.name!="" else "Axis " + str(n+1) for n,x in enumerate(labels)]
+        self.label_horizontal = wx.StaticText(self, -1, "Horizontal axis")
+        self.choice_horizontal = wx.Choice(self, -1, choices=self.names)
+        self.label_vertical = wx.StaticText(self, -1, "Vertical axis")
+        self.choice_vertical = wx.Choice(self, -1, choices=["None"]+self.names)
+        self.sliders = []
+        self.values = []
+        grid = wx.FlexGridSizer(len(self.names),3,2,2)
+        grid.AddGrowableCol(1)
+        for n in range(len(self.names)):
+            slider = wx.Slider(self, -1, 0, 0, max(len(coords[n])-1,1))
+            value = wx.StaticText(self, -1, "", size=(80,-1))
+            grid.Add(wx.StaticText(self, -1, self.names[n]), 0, wx.ALIGN_CENTER_VERTICAL)
+            grid.Add(slider, 1, wx.EXPAND)
+            grid.Add(value, 0, wx.ALIGN_CENTER_VERTICAL)
+            self.sliders.append(slider)
+            self.values.append(value)
+            self.Bind(wx.EVT_SLIDER, self.OnSlider, slider)
+        self.check_follow = wx.CheckBox(self, -1, "Follow scan position")
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.label_horizontal, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.choice_horizontal, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_vertical, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.choice_vertical, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(grid, 1, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.check_follow, 0, wx.ALL|wx.EXPAND, 2)
+        self.SetSizer(sizer)
+        self.SetMinSize((300,-1))
+        self.Fit()
+
+        self.choice_horizontal.SetSelection(view[-1])
+        self.choice_vertical.SetSelection(view[0]+1 if len(view)==2 else 0)
+        self.check_follow.SetValue(follow)
+        self.SetIndex(index)
+
+        self.Bind(wx.EVT_CHOICE, self.OnChange, self.choice_horizontal)
+        self.Bind(wx.EVT_CHOICE, self.OnChange, self.choice_vertical)
+        self.Bind(wx.EVT_CHECKBOX, self.OnChange, self.check_follow)
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
+
+    def SetIndex(self, index):
+        """
+
+            Set slider positions.
+
+            Parameters:
+                index    -    indices along every axis (list of int)
+
+        """
+        view = self.GetView()
+        for n in range(len(self.sliders)):
+            self.sliders[n].SetValue(index[n])
+            self.sliders[n].Enable(view.count(n)==0)
+            self.values[n].SetLabel("%g" % (self.coords[n][index[n]]))
+
+    def GetView(self):
+        """
+
+            Get displayed axes.
+
+            Output:
+                displayed axes (list of int)
+
+        """
+        h = self.choice_horizontal.GetSelection()
+        v = self.choice_vertical.GetSelection()-1
+        if v<0 or v==h:
+            return [h]
+        return [v, h]
+
+    def GetValue(self):
+        """
+
+            Get selected slice.
+
+            Output:
+                displayed axes (list of int), indices along every axis (list of int), follow flag (bool)
+
+        """
+        return self.GetView(), [x.GetValue() for x in self.sliders], self.check_follow.GetValue()
+
+    def OnSlider(self, event=None):
+        """
+
+            Actions triggered when a slider is moved.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        # manual selection stops following scan position
+        self.check_follow.SetValue(False)
+        self.OnChange()
+
+    def OnChange(self, event=None):
+        """
+
+            Apply selected slice to canvas.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        view, index, follow = self.GetValue()
+        self.SetIndex(index)
+        self.canvas.SetSlice(view, index, follow)
+
+    def OnClose(self, event=None):
+        """
+
+            Actions triggered when dialog is closed.
+
+            Parameters:
+                event    -    wx.Event
+
+        """
+        self.canvas.controls = None
+        self.Destroy()
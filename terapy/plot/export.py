@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Offscreen rendering of measurements to figure files
+
+    Usage:
+        terapy-export [-h] [-o OUTPUT] [-f FORMAT] [-b BANK] [-r REFERENCE]
+                      [-i INDEX] [-d DIM] [-a AXIS] [-j JOBS] [--size W H] [--dpi DPI]
+                      [--overwrite] files [files ...]
+
+    Figures are drawn with matplotlib's Agg backend, without any window.
+    Labels, units, scales and colors are the same as in plot canvases.
+    1D data sets of a file are drawn together in one figure, 2D data sets
+    get one figure each. Each given filter bank adds figures of processed
+    data. Files are rendered in parallel by a process pool. If input files
+    share a name, their paths relative to their common folder are kept in
+    the output folder.
+
+    Although no window is opened, wx must still be importable: default
+    labels and scales are taken from plot canvas classes, and the terapy
+    package imports wx.
+
+"""
+
+import os
+import sys
+import inspect
+import argparse
+import traceback
+from multiprocessing import Pool, cpu_count
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from terapy.core.axedit import FormatUnits
+from terapy.plot.style import trace_colors, colormaps, make_image
+from terapy.batch import output_names
+
+banks = [] # filter banks of current worker process, as (name, FilterBank) pairs
+
+def find_canvas(dim, is_filter=False):
+    """
+
+        Find canvas class displaying data of given dimension.
+
+        Parameters:
+            dim          -    data dimension (int)
+            is_filter    -    if True, look for post-processing canvas (bool)
+
+        Output:
+            canvas class (PlotCanvas), or None if not found
+
+    """
+    from terapy.plot import canvas_modules
+    for x in canvas_modules:
+        if x.dim==dim and not(x.is_slice) and ((is_filter and x.is_filter) or (not(is_filter) and x.is_data)):
+            return x
+    return None
+
+def canvas_defaults(cls):
+    """
+
+        Get default labels and scales of given canvas class.
+
+        Parameters:
+            cls    -    canvas class (PlotCanvas)
+
+        Output:
+            labels (list of AxisInfos), abscissa scale (str), ordinate scale (str)
+
+    """
+    args, varargs, keywords, defaults = inspect.getargspec(cls.__init__)
+    kwargs = dict(zip(args[-len(defaults):], defaults))
+    labels = [kwargs["xlabel"].copy(), kwargs["ylabel"].copy()]
+    # re-format axis units into current default units, as canvas does
+    for x in labels:
+        x.units = FormatUnits(x.units)
+        x.units._magnitude = 1.0
+    return labels, kwargs["xscale"], kwargs["yscale"]
+
+def render(arrays, fname, bank=None, size=(8.0,6.0), dpi=100):
+    """
+
+        Render data arrays to figure file.
+
+        Parameters:
+            arrays    -    data arrays, of same dimension (list of DataArray)
+                           only first array is drawn for 2D data
+            fname     -    figure file name, format given by extension (str)
+            bank      -    if given, draw data processed by this filter bank (FilterBank)
+            size      -    figure size in inches (tuple)
+            dpi       -    figure resolution in dots per inch (int)
+
+        Output:
+            True if figure was written
+
+    """
+    if len(arrays)==0:
+        return False
+    dim = len(arrays[0].shape)
+    cls = find_canvas(dim, bank!=None)
+    if cls==None:
+        return False
+    labels, xscale, yscale = canvas_defaults(cls)
+    if bank!=None:
+        # canvas units from raw data canvas + filter bank effect
+        raw_labels = canvas_defaults(find_canvas(dim))[0]
+        units = [FormatUnits(v) for v in bank.GetUnits([u.units for u in raw_labels])]
+        for x in units:x._magnitude=1.0
+        for n in range(len(units)): labels[n].units = units[n]
+        arrays = [bank.ApplyFilters(x) for x in arrays]
+    else:
+        arrays = [x.Copy() for x in arrays]
+    for x in arrays:
+        x.Rescale(labels)
+
+    fig = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(fig)
+    axes = fig.gca()
+    axes.grid(True)
+    axes.set_xscale(xscale)
+    axes.set_yscale(yscale)
+    if dim==1:
+        colors = trace_colors(len([x for x in arrays if x.color==None]))
+        for x in arrays:
+            if x.color!=None:
+                color = x.color
+            else:
+                color = colors.pop(0)
+            axes.plot(x.coords[0], x.data, color=color)
+    else:
+        make_image(fig, axes, arrays[0], colormaps()[0])
+    axes.set_xlabel(labels[0].label())
+    axes.set_ylabel(labels[1].label())
+    fig.savefig(fname)
+    return True
+
+def init_worker(fnames, dim, reference, index, axis=None):
+    """
+
+        Initialize worker process: load filter banks once per process.
+
+        Parameters:
+            fnames       -    filter bank file names (list of str)
+            dim          -    dimension of data treated by banks (int)
+            reference    -    file containing reference data (str)
+            index        -    index of reference data set in reference file (int)
+            axis         -    axis along which 1D filters are applied (int), as saved in banks if None
+
+    """
+    global banks
+    from terapy.batch import load_bank
+    banks = [(os.path.splitext(os.path.basename(x))[0], load_bank(x, dim, reference, index, axis)) for x in fnames]
+
+def export_file(job):
+    """
+
+        Render given file with filter banks of current worker.
+
+        Parameters:
+            job    -    (input file name, output base name, output extension, figure size, resolution, overwrite) (tuple)
+
+        Output:
+            (input file name, list of written figures, error message or None) (tuple)
+
+    """
+    fname, base, ext, size, dpi, overwrite = job
+    try:
+        from terapy import files
+        data = files.read(fname)
+        if data==None:
+            return fname, [], "can't read file"
+        # list figures: (output file name, arrays, filter bank)
+        figures = []
+        for dim in sorted(set([len(x.shape) for x in data])):
+            arrays = [x for x in data if len(x.shape)==dim]
+            views = [("", None)] + [("." + name, fb) for name, fb in banks if fb.dim==dim]
+            for suffix, fb in views:
+                if dim==1:
+                    figures.append((base + suffix + "." + ext, arrays, fb))
+                else:
+                    for n in range(len(arrays)):
+                        figures.append(("%s%s.%d.%s" % (base,suffix,n+1,ext), [arrays[n]], fb))
+        written = []
+        for oname, arrays, fb in figures:
+            if os.path.exists(oname) and not(overwrite):
+                return fname, written, "output file '" + oname + "' exists"
+            if not(render(arrays, oname, fb, size, dpi)):
+                return fname, written, "can't render %dD data to '%s': no plot canvas available (is wx importable?)" % (len(arrays[0].shape), oname)
+            written.append(oname)
+        return fname, written, None
+    except:
+        return fname, [], traceback.format_exc()
+
+def main(argv=None):
+    """
+
+        Command line entry point.
+
+        Parameters:
+            argv    -    command line arguments, sys.argv[1:] if None (list of str)
+
+        Output:
+            exit status (int)
+
+    """
+    parser = argparse.ArgumentParser(description="Render measurement files to figures.")
+    parser.add_argument("files", nargs="+", help="measurement files")
+    parser.add_argument("-o", "--output", default=os.curdir, help="output folder (default: current folder)")
+    parser.add_argument("-f", "--format", default="png", help="figure format, e.g. png or pdf (default: png)")
+    parser.add_argument("-b", "--bank", action="append", default=[], help="filter bank file (.ini), adds figures of processed data (can be repeated)")
+    parser.add_argument("-r", "--reference", default=None, help="file containing reference data for reference filters")
+    parser.add_argument("-i", "--index", type=int, default=0, help="index of reference data set in reference file (default: 0)")
+    parser.add_argument("-d", "--dim", type=int, default=1, help="dimension of data processed by filter banks (default: 1)")
+    parser.add_argument("-a", "--axis", type=int, default=None, help="axis along which 1D filters are applied to multi-dimensional data, from 0 (default: as saved in banks)")
+    parser.add_argument("-j", "--jobs", type=int, default=cpu_count(), help="number of worker processes (default: number of cores)")
+    parser.add_argument("--size", type=float, nargs=2, default=[8.0,6.0], metavar=("W","H"), help="figure size in inches (default: 8 6)")
+    parser.add_argument("--dpi", type=int, default=100, help="figure resolution (default: 100)")
+    parser.add_argument("--overwrite", action="store_true", help="overwrite existing figures")
+    args = parser.parse_args(argv)
+
+    ext = args.format.lstrip(".").lower()
+    if not(ext in FigureCanvasAgg.get_supported_filetypes()):
+        print "ERROR: can't write '." + ext + "' figures"
+        return 1
+    if not(os.path.isdir(args.output)):
+        os.makedirs(args.output)
+
+    # check banks and reference once before starting workers
+    try:
+        init_worker(args.bank, args.dim, args.reference, args.index, args.axis)
+    except:
+        print "ERROR: can't load filter bank: " + str(sys.exc_info()[1])
+        return 1
+
+    jobs = []
+    for x, base in zip(args.files, output_names(args.files, args.output)):
+        if not(os.path.isdir(os.path.dirname(base))):
+            os.makedirs(os.path.dirname(base))
+        jobs.append((x, base, ext, tuple(args.size), args.dpi, args.overwrite))
+
+    pool = Pool(max(1,args.jobs), init_worker, (args.bank, args.dim, args.reference, args.index, args.axis))
+    failed = 0
+    try:
+        for fname, written, error in pool.imap_unordered(export_file, jobs):
+            if error==None:
+                print "%s: %d figure(s) written" % (fname, len(written))
+            else:
+                failed += 1
+                print "ERROR: %s: %s" % (fname, error)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        return 1
+    pool.join()
+    print "%d file(s) rendered, %d failed" % (len(jobs)-failed, failed)
+    return int(failed>0)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -487,7 +487,7 @@ class PlotNotebook(wx.Notebook):
         # if no valid target has been found, create one
         if target==None:
             for x in canvas_modules:
-                if x.dim==dim and x.is_data:
+                if (x.dim==dim or (x.is_slice and dim>x.dim)) and x.is_data:
                     target = x(self)
                     self.AddCanvas(target, target.name)
                     target.SetVisible()
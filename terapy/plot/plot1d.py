@@ -26,6 +26,9 @@ from terapy.plot.base import Plot
 from matplotlib.lines import Line2D
 from wx.lib.pubsub import setupkwargs
 from wx.lib.pubsub import pub
+import numpy as np
+
+min_columns = 100 # min. number of columns used to decimate data, if axes width is unknown
 
 class Plot1D(Plot):
     """
@@ -44,6 +47,10 @@ class Plot1D(Plot):
         
         """
         Plot.__init__(self, canvas, array)
+        self.version = 0 # incremented each time data change
+        self.view = None # data version and view for which displayed points were computed
+        self.order = 0 # coordinates sorting order (1: increasing, -1: decreasing, 0: unsorted)
+        self.extrema = [] # indices of end points and extrema of data
         self.plot = Line2D([],[])
         self.canvas.axes.add_line(self.plot)
         self.SetData(array)
@@ -59,7 +66,53 @@ class Plot1D(Plot):
         
         """
         self.array = array
-        self.plot.set_data(array.coords[0],array.data)
+        self.x = array.coords[0]
+        self.y = array.data
+        self.version += 1
+        self.Decimate()
+    
+    def Decimate(self):
+        """
+        
+            Set displayed points from plot data.
+            Long traces are reduced to min/max envelopes, one per pixel column
+            of the current view, such that peaks are displayed exactly.
+            
+            Output:
+                True if displayed points changed
+        
+        """
+        x, y = self.x, self.y
+        cols = max(int(self.canvas.axes.bbox.width), min_columns)
+        if len(y)<=4*cols or len(x)!=len(y) or np.iscomplexobj(y):
+            view = (self.version,)
+        else:
+            if self.view==None or self.view[0]!=self.version:
+                # properties of new data: sorting order, end points and extrema
+                dx = np.diff(x)
+                self.order = 1 if (dx>=0).all() else (-1 if (dx<=0).all() else 0)
+                finite = np.flatnonzero(np.isfinite(y))
+                self.extrema = finite[[0,-1,np.argmin(y[finite]),np.argmax(y[finite])]] if len(finite)>0 else []
+            # bin edges: one bin per pixel column, plus one point beyond each side
+            xmin, xmax = sorted(self.canvas.axes.get_xlim())
+            N = len(x)
+            if self.order==1:
+                edges = np.searchsorted(x, np.linspace(xmin, xmax, cols+1))
+            elif self.order==-1:
+                edges = N - np.searchsorted(x[::-1], np.linspace(xmax, xmin, cols+1))
+            else:
+                edges = np.linspace(0, N, cols+1).astype(int) # unsorted coordinates: bins of equal size
+            i0, i1 = max(edges[0]-1,0), min(edges[-1]+1,N)
+            view = (self.version, i0, i1, cols, xmin, xmax)
+        if view==self.view:
+            return False
+        self.view = view
+        if len(view)==1:
+            self.plot.set_data(x, y)
+        else:
+            idx = envelope(y, np.concatenate(([i0], edges, [i1])), cols, self.extrema)
+            self.plot.set_data(x[idx], y[idx])
+        return True
     
     def GetData(self):
         """
@@ -71,7 +124,7 @@ class Plot1D(Plot):
         
         """
         arr = self.array.Copy()
-        arr.coords[0], arr.data = self.plot.get_data()
+        arr.coords[0], arr.data = self.x, self.y
         arr.shape = arr.data.shape
         return arr
 
@@ -121,3 +174,37 @@ class Plot1D(Plot):
         
         """
         self.name = name # don't do anything with that at the moment (may be for legend)
+
+def envelope(y, edges, cols, extra=[]):
+    """
+    
+        Compute indices of min/max envelope of data.
+        
+        Parameters:
+            y        -    data (numpy array)
+            edges    -    increasing bin edges, as indices of y (numpy array)
+            cols     -    number of columns (int)
+            extra    -    indices of points that must be kept (list of int)
+        
+        Output:
+            sorted indices of points to display (numpy array)
+    
+    """
+    # e.g. global extrema, such that axes limits computed from envelope match those of full data
+    idx = [np.asarray(extra,dtype=int)]
+    i0, i1 = edges[0], edges[-1]
+    if i1-i0<=4*cols:
+        idx.append(np.arange(i0,i1)) # few points, no need to decimate
+    else:
+        edges = np.unique(edges)
+        starts = edges[:-1] - i0
+        block = y[i0:i1]
+        bins = np.repeat(np.arange(len(starts)), np.diff(edges))
+        for fill, func in [(np.inf, np.minimum), (-np.inf, np.maximum)]:
+            v = np.where(np.isnan(block), fill, block)
+            ext = func.reduceat(v, starts)
+            # first point of each bin reaching bin extremum
+            pos = np.flatnonzero(v==ext[bins])
+            first = np.unique(bins[pos], return_index=True)[1]
+            idx.append(i0 + pos[first])
+    return np.unique(np.concatenate(idx))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Render scheduler for live plots
+
+"""
+
+import threading
+import wx
+from time import time
+from collections import OrderedDict
+from terapy.core import refresh_delay
+
+class RenderScheduler():
+    """
+
+        Render scheduler for live plots
+
+        Data updates can be requested from any thread. Requests with the
+        same key are coalesced, such that only the latest one is processed.
+        Pending requests are processed on GUI thread at most once per frame
+        interval, after which every canvas marked as dirty is rendered once.
+        The frame interval grows with measured render time, such that GUI
+        thread stays responsive.
+
+    """
+    def __init__(self, interval = refresh_delay):
+        """
+
+            Initialization.
+
+            Parameters:
+                interval    -    min. delay between two frames, in seconds (float)
+
+        """
+        self.interval = interval
+        self.render_time = 0.0 # average time needed to render a frame (s)
+        self.last = 0.0 # time of last frame
+        self.requests = OrderedDict()
+        self.canvases = []
+        self.scheduled = False # if True, a frame is scheduled
+        self.rendering = False # if True, a frame is being rendered
+        self.lock = threading.Lock()
+
+    def request(self, key, func, *args):
+        """
+
+            Request func(*args) to be called on GUI thread before next frame.
+            Can be called from any thread.
+
+            Parameters:
+                key     -    request key, replaces pending request with same key (hashable)
+                func    -    function (function)
+                args    -    function arguments
+
+        """
+        with self.lock:
+            self.requests[key] = (func, args)
+        self.schedule()
+
+    def invalidate(self, canvas):
+        """
+
+            Mark canvas as dirty, such that it's rendered at next frame.
+
+            Parameters:
+                canvas    -    canvas (PlotCanvas)
+
+        """
+        with self.lock:
+            if self.canvases.count(canvas)==0:
+                self.canvases.append(canvas)
+        if not(self.rendering): # otherwise, canvas is rendered with current frame
+            self.schedule()
+
+    def flush(self):
+        """
+
+            Process pending requests now, and forget dirty canvases.
+            Called when live updates end (e.g. end of scan), such that a
+            frame still scheduled doesn't switch canvases back to live mode.
+
+        """
+        with self.lock:
+            requests = self.requests.values()
+            self.requests = OrderedDict()
+        self.rendering = True
+        for func, args in requests:
+            func(*args)
+        self.rendering = False
+        with self.lock:
+            self.canvases = []
+
+    def get_interval(self):
+        """
+
+            Return current frame interval.
+
+            Output:
+                interval in seconds (float)
+
+        """
+        # leave GUI thread idle at least half of the time
+        return max(self.interval, 2*self.render_time)
+
+    def schedule(self):
+        """
+
+            Schedule next frame, if not already done.
+
+        """
+        with self.lock:
+            if self.scheduled:
+                return
+            self.scheduled = True
+        wx.CallAfter(self.wait)
+
+    def wait(self):
+        """
+
+            Wait until frame interval has elapsed, then render frame.
+
+        """
+        delay = self.last + self.get_interval() - time()
+        if delay>0:
+            wx.CallLater(int(delay*1000)+1, self.render)
+        else:
+            self.render()
+
+    def render(self):
+        """
+
+            Process pending requests and render dirty canvases.
+
+        """
+        with self.lock:
+            requests = self.requests.values()
+            self.requests = OrderedDict()
+            self.scheduled = False
+        self.rendering = True
+        for func, args in requests:
+            func(*args)
+        self.rendering = False
+        with self.lock:
+            canvases = self.canvases
+            self.canvases = []
+        t0 = time()
+        rendered = False
+        hidden = []
+        for x in canvases:
+            if not(x):
+                continue # canvas destroyed meanwhile
+            if x.IsShownOnScreen():
+                x.UpdateLive()
+                rendered = True
+            else:
+                hidden.append(x)
+        # hidden canvases stay dirty, and are rendered with first frame after being shown
+        with self.lock:
+            for x in hidden:
+                if self.canvases.count(x)==0:
+                    self.canvases.append(x)
+        self.last = time()
+        if rendered:
+            self.render_time = 0.7*self.render_time + 0.3*(self.last - t0)
+
+scheduler = RenderScheduler() # shared scheduler for live plots
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Plot styles shared by plot canvases and offscreen rendering
+
+    This module doesn't depend on wx, such that figures can be drawn
+    without any GUI toolkit.
+
+"""
+
+from matplotlib.colors import LinearSegmentedColormap
+
+def trace_colors(N):
+    """
+    
+        Compute default colors of plots, from red to blue.
+        
+        Parameters:
+            N    -    number of plots (int)
+        
+        Output:
+            list of RGB colors (list of tuples)
+    
+    """
+    return [(1.0-(n+1.0)/(N*1.0),0.0,(n+1.0)/(N*1.0)) for n in range(N-1,-1,-1)]
+
+def colormaps():
+    """
+    
+        Generate colormaps of 2D plots.
+        
+        Output:
+            colormaps for signed, positive and negative data (tuple of LinearSegmentedColormap)
+    
+    """
+    cdict = {'red': ((0.0, 0.0, 0.0),(0.5, 1.0, 1.0),(1.0, 1.0, 0.0)),
+            'green': ((0.0, 0.0, 0.0),(0.5, 1.0, 1.0),(1.0, 0.0, 0.0)),
+            'blue': ((0.0, 0.0, 1.0),(0.5, 1.0, 1.0),(1.0, 0.0, 0.0))}
+    cmap = LinearSegmentedColormap('my_colormap',cdict,256)        
+    cdict = {'red': ((0.0, 0.0, 1.0),(1.0, 1.0, 0.0)),
+            'green': ((0.0, 0.0, 1.0),(1.0, 0.0, 0.0)),
+            'blue': ((0.0, 0.0, 1.0),(1.0, 0.0, 0.0))}
+    cmap_pos = LinearSegmentedColormap('my_colormap_pos',cdict,256)
+    
+    cdict = {'red': ((0.0, 0.0, 0.0),(1.0, 1.0, 0.0)),
+            'green': ((0.0, 0.0, 0.0),(1.0, 1.0, 0.0)),
+            'blue': ((0.0, 0.0, 1.0),(1.0, 1.0, 0.0))}
+    cmap_neg = LinearSegmentedColormap('my_colormap_neg',cdict,256)
+    return cmap, cmap_pos, cmap_neg
+
+def make_image(fig, axes, array, cmap):
+    """
+    
+        Display 2D data array as image with colorbar.
+        
+        Parameters:
+            fig      -    figure (matplotlib.figure.Figure)
+            axes     -    axes (matplotlib.axes.Axes)
+            array    -    data array (DataArray)
+            cmap     -    colormap (matplotlib.colors.Colormap)
+        
+        Output:
+            image (matplotlib.image.AxesImage), colorbar (matplotlib.colorbar.Colorbar)
+    
+    """
+    extent = [min(array.coords[0]), max(array.coords[0]), min(array.coords[1]), max(array.coords[1])]
+    image = axes.imshow(array.data, origin='lower', cmap=cmap, interpolation='nearest', extent = extent, aspect="auto")
+    colorbar = fig.colorbar(image,format="%0.1e")
+    return image, colorbar
@@ -47,6 +47,7 @@ class ScanEvent():
         
         """
         self.is_loop = False
+        self.is_group = False # loop that doesn't add a scan dimension
         self.is_display = False
         self.is_save = False
         self.is_axis = False
@@ -137,7 +138,8 @@ class ScanEvent():
                     elif ev.is_axis:
                         ev.run([])
                     elif ev.is_loop:
-                        data.IncrementScanDimension(self.m_ids)
+                        if not(ev.is_group):
+                            data.IncrementScanDimension(self.m_ids)
                         ev.run(data)
         return True
     
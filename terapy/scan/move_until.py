@@ -49,8 +49,11 @@ class MoveUntil(ScanEvent):
         self.condition = 0
         self.condlist = ["Equal","Smaller than","Greater than","Increased by","Decreased by","Multiplied by","Divided by"]
         self.value = 1.0
-        self.propNames = ["Axis","Step size","Delay","Trigger", "Quantity","Condition","Value"]
-        self.config = ["axis","step","delay","trigger","quantity","condition","value"]
+        self.method = 0
+        self.methodlist = ["Step","Bisection","Secant"]
+        self.precision = 0.001
+        self.propNames = ["Axis","Step size","Delay","Trigger", "Quantity","Condition","Value","Search method","Precision"]
+        self.config = ["axis","step","delay","trigger","quantity","condition","value","method","precision"]
         self.is_axis = True
     
     def refresh(self):
@@ -70,45 +73,217 @@ class MoveUntil(ScanEvent):
             ax = self.axlist[self.axis]
             tr = self.trlist[self.trigger]
             v0 = tr.read()[self.quantity]
-            cond = True
+            if self.method==1:
+                self.search_bisection(ax, tr, v0)
+            elif self.method==2:
+                self.search_secant(ax, tr, v0)
+            else:
+                self.search_step(ax, tr, v0)
+    
+    def get_margin(self, v, v0):
+        """
+        
+            Signed distance of trigger value to condition.
+            
+            Parameters:
+                v    -    current trigger value (float)
+                v0   -    initial trigger value (float)
             
-            while cond and self.can_run:
-                v = tr.read()[self.quantity]
-                if self.condition==0: # trigger is equal to
-                    cond = (v!=self.value)
-                elif self.condition==1: # trigger is smaller than
-                    cond = (v>=self.value)
-                elif self.condition==2: # trigger is larger than
-                    cond = (v<=self.value)
-                elif self.condition==3: # trigger increased by
-                    cond (v>=(v0+self.value))
-                elif self.condition==4: # trigger decreased by
-                    cond (v<=(v0-self.value))
-                elif self.condition==5: # trigger multiplied by
-                    cond (v>=v0*self.value)
-                elif self.condition==6: # trigger divided by
-                    cond (v<=v0/self.value)
-                
-                if not(cond): break
-                
-                # condition is not met => move axis
-                p0 = ax.pos()
-                ax.goTo(p0+self.step)
-                # wait that movement is complete
-                while (ax.get_motion_status() != 0 and self.can_run):
-                    sleep(0.01)
-                # wait for specified additional delay
-                t0 = 0.0
-                while (t0<self.delay and self.can_run):
-                    sleep(0.01)
-                    t0+=0.01
-                    
+            Output:
+                distance, positive when condition is met (float)
         
+        """
+        if self.condition==0: # trigger is equal to (or crossed) value
+            if v0>self.value:
+                return self.value-v
+            return v-self.value
+        elif self.condition==1: # trigger is smaller than
+            return self.value-v
+        elif self.condition==2: # trigger is larger than
+            return v-self.value
+        elif self.condition==3: # trigger increased by
+            return v-(v0+self.value)
+        elif self.condition==4: # trigger decreased by
+            return (v0-self.value)-v
+        elif self.condition==5: # trigger multiplied by
+            return v-v0*self.value
+        elif self.condition==6: # trigger divided by
+            return v0/self.value-v
+    
+    def is_met(self, g):
+        """
+        
+            Check whether condition is met for given distance.
+            
+            Parameters:
+                g    -    distance returned by get_margin (float)
+            
+            Output:
+                True if condition is met
+        
+        """
+        if self.condition in [1,2]:
+            return g>0
+        return g>=0
+    
+    def move_to(self, ax, tr, pos):
+        """
+        
+            Move axis to given position, wait and read trigger.
+            
+            Parameters:
+                ax    -    axis device (AxisDevice)
+                tr    -    trigger device (InputDevice)
+                pos   -    target position (float)
+            
+            Output:
+                reached position (float), trigger value (float)
+        
+        """
+        ax.goTo(pos)
+        # wait that movement is complete
+        while (ax.get_motion_status() != 0 and self.can_run):
+            sleep(0.01)
+        # wait for specified additional delay
+        t0 = 0.0
+        while (t0<self.delay and self.can_run):
+            sleep(0.01)
+            t0+=0.01
+        return ax.pos(), tr.read()[self.quantity]
+    
+    def search_step(self, ax, tr, v0):
+        """
+        
+            Move axis by fixed steps until condition is met.
+            
+            Parameters:
+                ax    -    axis device (AxisDevice)
+                tr    -    trigger device (InputDevice)
+                v0    -    initial trigger value (float)
+        
+        """
+        v = tr.read()[self.quantity]
+        while self.can_run and not(self.is_met(self.get_margin(v,v0))):
+            # condition is not met => move axis
+            p, v = self.move_to(ax, tr, ax.pos()+self.step)
+    
+    def bracket(self, ax, tr, v0, predict=False):
+        """
+        
+            Move axis by exponentially growing steps until condition is met.
+            
+            Parameters:
+                ax       -    axis device (AxisDevice)
+                tr       -    trigger device (InputDevice)
+                v0       -    initial trigger value (float)
+                predict  -    if True, use secant prediction when it points ahead (bool)
+            
+            Output:
+                last position where condition is not met (float) and distance,
+                first position where condition is met (float) and distance,
+                or None if no bracket was found
+        
+        """
+        a = ax.pos()
+        ga = self.get_margin(tr.read()[self.quantity],v0)
+        if self.is_met(ga) or self.step==0:
+            return None
+        h = self.step
+        pa, gpa = None, None # previous point, for secant prediction
+        while self.can_run:
+            target = a + h
+            if predict and pa!=None and ga!=gpa:
+                x = a - ga*(a-pa)/(ga-gpa)
+                # accept prediction only if it lies ahead, within next bracketing step
+                if (x-a)*h>0 and abs(x-a)<abs(h):
+                    target = x + 0.5*self.precision*(1 if h>0 else -1)
+            b, v = self.move_to(ax, tr, target)
+            gb = self.get_margin(v,v0)
+            if self.is_met(gb):
+                return a, ga, b, gb
+            if b==a: # axis doesn't move anymore (limit reached)
+                return None
+            pa, gpa = a, ga
+            a, ga = b, gb
+            h = 2*h
+        return None
+    
+    def search_bisection(self, ax, tr, v0):
+        """
+        
+            Bracket condition with growing steps, then bisect bracket down to required precision.
+            
+            Parameters:
+                ax    -    axis device (AxisDevice)
+                tr    -    trigger device (InputDevice)
+                v0    -    initial trigger value (float)
+        
+        """
+        res = self.bracket(ax, tr, v0)
+        if res==None:
+            return
+        a, ga, b, gb = res
+        p = b
+        while self.can_run and abs(b-a)>self.precision:
+            p, v = self.move_to(ax, tr, (a+b)/2.0)
+            if p==a or p==b: # axis resolution reached
+                break
+            if self.is_met(self.get_margin(v,v0)):
+                b = p
+            else:
+                a = p
+        # end on position where condition is met
+        if p!=b and self.can_run:
+            self.move_to(ax, tr, b)
+    
+    def search_secant(self, ax, tr, v0):
+        """
+        
+            Bracket condition using secant prediction from recent readings, then
+            refine bracket with regula falsi (Illinois variant) down to required precision.
+            
+            Parameters:
+                ax    -    axis device (AxisDevice)
+                tr    -    trigger device (InputDevice)
+                v0    -    initial trigger value (float)
+        
+        """
+        res = self.bracket(ax, tr, v0, True)
+        if res==None:
+            return
+        a, ga, b, gb = res
+        p = b
+        side = 0
+        n = 0
+        while self.can_run and abs(b-a)>self.precision:
+            x = (a+b)/2.0
+            if ga!=gb and n<100:
+                x = b - gb*(b-a)/(gb-ga)
+            # keep new point away from bracket ends by at least half the precision
+            d = 0.5*self.precision
+            x = min(max(x,min(a,b)+d),max(a,b)-d)
+            p, v = self.move_to(ax, tr, x)
+            if p==a or p==b: # axis resolution reached
+                break
+            g = self.get_margin(v,v0)
+            if self.is_met(g):
+                b, gb = p, g
+                if side==1: ga = ga/2.0
+                side = 1
+            else:
+                a, ga = p, g
+                if side==-1: gb = gb/2.0
+                side = -1
+            n+=1
+        # end on position where condition is met
+        if p!=b and self.can_run:
+            self.move_to(ax, tr, b)
+    
     def set(self, parent=None):
         self.refresh()
-        dlg = MoveUntilSelectionDialog(parent, axlist=[x.name for x in self.axlist], axis=self.axis, step=self.step, delay=self.delay, trlist=self.trlist, trigger=self.trigger, quantity=self.quantity, condlist=self.condlist, condition=self.condition, value=self.value)
+        dlg = MoveUntilSelectionDialog(parent, axlist=[x.name for x in self.axlist], axis=self.axis, step=self.step, delay=self.delay, trlist=self.trlist, trigger=self.trigger, quantity=self.quantity, condlist=self.condlist, condition=self.condition, value=self.value, methodlist=self.methodlist, method=self.method, precision=self.precision)
         if dlg.ShowModal() == wx.ID_OK:
-            self.axis, self.step, self.delay, self.trigger, self.quantity, self.condition, self.value = dlg.GetValue()
+            self.axis, self.step, self.delay, self.trigger, self.quantity, self.condition, self.value, self.method, self.precision = dlg.GetValue()
             dlg.Destroy()
             return True
         else:
@@ -116,7 +291,7 @@ class MoveUntil(ScanEvent):
             return False
 
     def populate(self):
-        self.propNodes = [self.axlist[self.axis].name, self.step, self.delay, self.trlist[self.trigger].name, self.trlist[self.trigger].qtynames[self.quantity], self.condlist[self.condition], self.value]
+        self.propNodes = [self.axlist[self.axis].name, self.step, self.delay, self.trlist[self.trigger].name, self.trlist[self.trigger].qtynames[self.quantity], self.condlist[self.condition], self.value, self.methodlist[self.method], self.precision]
         self.create_property_root()
         self.set_property_nodes(True)
 
@@ -136,9 +311,13 @@ class MoveUntil(ScanEvent):
                 self.condition = int(val)
             elif pos==6:
                 self.value = float(val)
+            elif pos==7:
+                self.method = int(val)
+            elif pos==8:
+                self.precision = abs(float(val))
         except:
             pass
-        self.propNodes = [self.axlist[self.axis].name, self.step, self.delay, self.trlist[self.trigger].name, self.trlist[self.trigger].qtynames[self.quantity], self.condlist[self.condition], self.value]
+        self.propNodes = [self.axlist[self.axis].name, self.step, self.delay, self.trlist[self.trigger].name, self.trlist[self.trigger].qtynames[self.quantity], self.condlist[self.condition], self.value, self.methodlist[self.method], self.precision]
         self.set_property_nodes(True)
         
     def edit_label(self, event, pos):
@@ -180,6 +359,15 @@ class MoveUntil(ScanEvent):
             w.SetFocus()
             if wx.Platform == '__WXMSW__':
                 w.Bind(wx.EVT_KILL_FOCUS,self.onSelectCondition)
+        elif pos==7:
+            event.Veto()
+            br = self.host.GetBoundingRect(self.get_property_node(7))
+            w = ChoicePopup(self.host,-1,choices=self.methodlist,pos=br.GetPosition(), size=br.GetSize(), style=wx.CB_DROPDOWN|wx.CB_READONLY)
+            w.SetSelection(self.method)
+            w.Bind(wx.EVT_CHOICE,self.onSelectMethod)
+            w.SetFocus()
+            if wx.Platform == '__WXMSW__':
+                w.Bind(wx.EVT_KILL_FOCUS,self.onSelectMethod)
             
 
     def onSelectAxis(self, event=None):
@@ -220,6 +408,15 @@ class MoveUntil(ScanEvent):
         evt.SetItem(self.host.GetSelection())
         self.host.GetEventHandler().ProcessEvent(evt)
     
+    def onSelectMethod(self, event=None):
+        self.method = event.GetEventObject().GetSelection()
+        self.propNodes[7] = self.methodlist[self.method]
+        self.set_property_nodes()
+        # notify tree that editing is finished
+        evt = wx.TreeEvent(wx.wxEVT_COMMAND_TREE_END_LABEL_EDIT,self.host.GetId())
+        evt.SetItem(self.host.GetSelection())
+        self.host.GetEventHandler().ProcessEvent(evt)
+    
     def get_icon(self):
         return wx.Image(icon_path + "event-move.png").ConvertToBitmap()
 
@@ -229,7 +426,7 @@ class MoveUntilSelectionDialog(wx.Dialog):
         Move axis device scan event configuration dialog
     
     """
-    def __init__(self, parent = None, title="Move axis device until", axlist = [], axis = 0, step=0.1, delay=0.1, trlist=[], trigger=0, quantity=0, condlist=[], condition=0, value=0.1):
+    def __init__(self, parent = None, title="Move axis device until", axlist = [], axis = 0, step=0.1, delay=0.1, trlist=[], trigger=0, quantity=0, condlist=[], condition=0, value=0.1, methodlist=[], method=0, precision=0.001):
         """
         
             Initialization.
@@ -239,8 +436,17 @@ class MoveUntilSelectionDialog(wx.Dialog):
                 title     -    dialog title (str)
                 axlist    -    list of axis devices (list of str)
                 axis      -    default selection (int)
-                position  -    position (float)
-                relative  -    if True, move is relative, absolute if False
+                step      -    step size (float)
+                delay     -    delay between steps (float)
+                trlist    -    list of trigger devices (list of InputDevice)
+                trigger   -    trigger device selection (int)
+                quantity  -    trigger quantity selection (int)
+                condlist  -    list of conditions (list of str)
+                condition -    condition selection (int)
+                value     -    condition value (float)
+                methodlist-    list of search methods (list of str)
+                method    -    search method selection (int)
+                precision -    search precision (float)
         
         """
         wx.Dialog.__init__(self, parent, title=title)
@@ -258,6 +464,10 @@ class MoveUntilSelectionDialog(wx.Dialog):
         self.choice_condition = wx.Choice(self, -1, choices=condlist)
         self.label_value = wx.StaticText(self, -1, "Value")
         self.input_value = wx.TextCtrl(self, -1, str(value))
+        self.label_method = wx.StaticText(self, -1, "Search method")
+        self.choice_method = wx.Choice(self, -1, choices=methodlist)
+        self.label_precision = wx.StaticText(self, -1, "Search precision (axis units)")
+        self.input_precision = wx.TextCtrl(self, -1, str(precision))
         self.button_OK = wx.Button(self, wx.ID_OK)
         self.button_Cancel = wx.Button(self, wx.ID_CANCEL)
         
@@ -265,6 +475,7 @@ class MoveUntilSelectionDialog(wx.Dialog):
         self.choice_trigger.SetSelection(trigger)
         self.choice_quantity.SetSelection(quantity)
         self.choice_condition.SetSelection(condition)
+        self.choice_method.SetSelection(method)
         self.Bind(wx.EVT_CHOICE, self.OnTriggerSelect, self.choice_trigger)
         
         hbox = wx.BoxSizer(wx.HORIZONTAL)
@@ -286,6 +497,10 @@ class MoveUntilSelectionDialog(wx.Dialog):
         sizer.Add(self.choice_condition, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(self.label_value, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(self.input_value, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_method, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.choice_method, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_precision, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_precision, 0, wx.ALL|wx.EXPAND, 2)
         sizer.Add(hbox, 0, wx.ALL|wx.EXPAND, 2)
         self.SetSizer(sizer)
         self.Fit()
@@ -314,7 +529,7 @@ class MoveUntilSelectionDialog(wx.Dialog):
             Return dialog values.
             
             Output:
-                selected axis device index (int), position (float), absolute/relative move (bool)
+                selected axis device index (int), step size (float), delay (float), trigger device index (int), trigger quantity index (int), condition index (int), condition value (float), search method index (int), search precision (float)
         
         """
-        return self.choice_axis.GetSelection(), float(self.input_step.GetValue()), float(self.input_delay.GetValue()), self.choice_trigger.GetSelection(), self.choice_quantity.GetSelection(), self.choice_condition.GetSelection(), float(self.input_value.GetValue())
+        return self.choice_axis.GetSelection(), float(self.input_step.GetValue()), float(self.input_delay.GetValue()), self.choice_trigger.GetSelection(), self.choice_quantity.GetSelection(), self.choice_condition.GetSelection(), float(self.input_value.GetValue()), self.choice_method.GetSelection(), abs(float(self.input_precision.GetValue()))
@@ -24,10 +24,10 @@
 
 from terapy.scan.base import ScanEvent
 import wx
-from terapy.core import icon_path, refresh_delay
+from terapy.core import icon_path
+from terapy.plot.scheduler import scheduler
 from wx.lib.pubsub import setupkwargs
 from wx.lib.pubsub import pub
-from time import time
 
 class Plot(ScanEvent):
     """
@@ -44,7 +44,6 @@ class Plot(ScanEvent):
         self.canvas = None
         self.can_plot = True
         self.auto_refresh = True
-        self.clock = 0
         pub.subscribe(self.set_canvas,"broadcast_canvas")
         pub.subscribe(self.set_refresh,"broadcast_refresh")
     
@@ -60,7 +59,8 @@ class Plot(ScanEvent):
     
     def run(self, data):
         arr = data.data[self.m_id]
-        wx.CallAfter(self.plot,arr)
+        # coalesced with pending updates of same array
+        scheduler.request(id(arr), self.plot, arr)
         return True
     
     def get_icon(self):
@@ -74,14 +74,13 @@ class Plot(ScanEvent):
             arr.plot.SetName(arr.name)
         arr.plot.SetData(arr)
         
-        if time() - self.clock > refresh_delay and self.auto_refresh:
-            arr.plot.Update()
-            self.clock = time()
+        if self.auto_refresh:
+            scheduler.invalidate(arr.plot.canvas)
     
     def check_validity(self, data):
-        # can process only 1D and 2D arrays
+        # can process arrays of any dimension, cuts are displayed above 2D
         v = len(data.shape)
-        if v<1 or v>2:
+        if v<1:
             return False
         else:
             return True
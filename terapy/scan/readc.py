@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Concurrent read scan event class
+
+"""
+
+from terapy.scan.base import ScanEvent
+import wx
+import numpy as np
+from time import time
+from multiprocessing.pool import ThreadPool
+from terapy.core import icon_path
+from wx.lib.pubsub import setupkwargs
+from wx.lib.pubsub import pub
+
+class ConcurrentRead(ScanEvent):
+    """
+
+        Concurrent read scan event class
+
+        Run child read events on different input devices at the same time.
+        Reads on the same device are done one after another in a single worker.
+        Each read keeps its own data array. Acquisition time (middle of the read,
+        in seconds since epoch) is stored in the 'timestamps' array of each data array.
+        Other child events (display, save, loops, ...) run in order once all reads
+        are complete.
+
+    """
+    __extname__ = "Concurrent read"
+    def __init__(self, parent = None):
+        ScanEvent.__init__(self, parent)
+        self.is_loop = True
+        self.is_group = True
+        self.pool = None
+        self.workers = 0
+        pub.subscribe(self.close_pool, "scan.after")
+
+    def run(self, data):
+        self.itmList = self.get_children()
+        events = [self.host.GetItemPyData(x) for x in self.itmList]
+        events = [ev for ev in events if ev.is_active]
+
+        # group reads by input device
+        groups = []
+        devices = []
+        for ev in filter(lambda x: x.is_input, events):
+            if hasattr(ev,'inlist') and ev.inlist[ev.input] in devices:
+                groups[devices.index(ev.inlist[ev.input])].append(ev)
+            else:
+                groups.append([ev])
+                if hasattr(ev,'inlist'):
+                    devices.append(ev.inlist[ev.input])
+                else:
+                    devices.append(None)
+
+        if len(groups)>0 and self.can_run:
+            if self.pool==None or self.workers<len(groups):
+                self.close_pool()
+                self.workers = len(groups)
+                self.pool = ThreadPool(self.workers)
+            jobs = [self.pool.apply_async(self.read_group, (data, x)) for x in groups]
+            for job in jobs:
+                for (ev, t) in job.get():
+                    self.set_timestamp(data, ev.m_id, t)
+                    data.current += 1
+
+        for ev in events:
+            if self.can_run:
+                if ev.is_display or ev.is_save:
+                    ev.run(data)
+                elif ev.is_axis:
+                    ev.run([])
+                elif ev.is_loop:
+                    if not(ev.is_group):
+                        data.IncrementScanDimension(self.m_ids)
+                    ev.run(data)
+        return True
+
+    def read_group(self, data, events):
+        """
+
+            Run given read events one after another.
+
+            Parameters:
+                data    -    measurement (Measurement)
+                events  -    read events (list of ScanEvent)
+
+            Output:
+                list of (read event, acquisition time) pairs
+
+        """
+        res = []
+        for ev in events:
+            if self.can_run:
+                t0 = time()
+                ev.run(data)
+                res.append((ev, (t0+time())/2.0))
+        return res
+
+    def set_timestamp(self, data, narray, t):
+        """
+
+            Store acquisition time at current position of selected data array.
+
+            Parameters:
+                data    -    measurement (Measurement)
+                narray  -    array index (int)
+                t       -    time (float)
+
+        """
+        if narray<data.count:
+            arr = data.data[narray]
+            if arr.timestamps is None or list(arr.timestamps.shape)!=list(arr.shape):
+                arr.timestamps = np.zeros(arr.shape)*np.nan
+            arr.timestamps[tuple(arr.idx)] = t
+
+    def close_pool(self, inst=None):
+        """
+
+            Close worker pool and wait for its threads to end.
+            Called once scan is over.
+
+            Parameters:
+                inst    -    pubsub event data
+
+        """
+        if self.pool!=None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+            self.workers = 0
+
+    def get_icon(self):
+        return wx.Image(icon_path + "event-read.png").ConvertToBitmap()
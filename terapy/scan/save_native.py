@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Save to native binary file scan event class
+
+"""
+
+from terapy.scan.save import SaveBase
+from terapy.files.native import Native
+
+class Save_Native(SaveBase):
+    """
+    
+        Save to native binary file scan event class
+    
+    """
+    __extname__ = "Save native"
+    def __init__(self, parent = None):
+        SaveBase.__init__(self, parent)
+        self.is_visible = True
+        self.filter = Native()
+        
+    def run(self, data):
+        fname = self.make_filename()
+        
+        self.filter.create(fname, data.xml, data.systemState) # store event tree and system state
+        if self.backup and hasattr(self,'bfname'):
+            self.filter.create(self.bfname, data.xml, data.systemState)
+        
+        for n in range(self.m_id+1): # save what has been measured before calling 'save'
+            data.data[n].filename = fname
+            self.filter.save(fname, data.data[n],name="M_"+str(n))
+            if self.backup and hasattr(self,'bfname'):
+                self.filter.save(self.bfname, data.data[n],name="M_"+str(n))
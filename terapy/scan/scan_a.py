@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2014  Vincent Paeder
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+    Adaptive scan event class
+
+"""
+
+from terapy.scan.scan_s import Scan
+import wx
+import numpy as np
+from time import sleep
+
+class Scan_A(Scan):
+    """
+
+        Adaptive scan event class
+
+        Scan given axis device between two values, starting with a coarse grid
+        and refining intervals where the measured signal varies most.
+        Refinement stops when the point budget is used or when the relative
+        variation over every interval falls below the given tolerance.
+
+        Points are stored sorted by position. Unused points at the end of the
+        array are left as NaN, and can be removed and regridded with the
+        Uniform sampling filter.
+
+        When nested in another loop, the grid is refined during the first pass
+        and reused for the following ones.
+
+    """
+    __extname__ = "Adaptive scan"
+    def __init__(self, parent = None):
+        Scan.__init__(self, parent)
+        self.N0 = 33
+        self.tol = 0.02
+        self.dv = 0.01
+        self.grid = None
+        self.propNames = ["Axis","Minimum","Maximum","# Points","# Coarse points","Tolerance","Min. step"]
+        self.config = ["axis","N","min","max","N0","tol","dv"]
+
+    def run(self, data):
+        self.itmList = self.get_children()
+        ax = self.axlist[self.axis]
+        ax.prepareScan()
+        arrays = [data.data[n] for n in self.m_ids if n<data.count]
+
+        if self.grid!=None and len(arrays)>0 and arrays[0].idx[:arrays[0].scanDim].any():
+            # outer loop already went through one pass => reuse refined grid
+            for n in range(len(self.grid)):
+                if not(self.can_run): break
+                data.SetScanPosition(self.m_ids, n)
+                self.measure(data, ax, self.grid[n])
+        else:
+            # clear current row, unused points stay NaN
+            for arr in arrays:
+                arr.data[self.get_row(arr)] = np.nan
+                arr.coords[arr.scanDim][:] = np.nan
+                if self.has_timestamps(arr):
+                    arr.timestamps[self.get_row(arr)] = np.nan
+
+            # coarse pass
+            vmin = min(self.min,self.max)
+            vmax = max(self.min,self.max)
+            grid = []
+            for v in np.linspace(vmin,vmax,max(2,min(self.N0,self.N))):
+                if not(self.can_run): break
+                self.insert_point(data, ax, arrays, grid, v)
+
+            # refine interval with largest variation until budget or tolerance is reached
+            while self.can_run and len(grid)<self.N:
+                loss = self.get_losses(arrays, grid)
+                if len(loss)==0: break
+                n = loss.argmax()
+                if loss[n]<self.tol: break
+                self.insert_point(data, ax, arrays, grid, (grid[n]+grid[n+1])/2.0)
+            self.grid = grid
+
+        data.SetScanPosition(self.m_ids, 0)
+        data.DecrementScanDimension(self.m_ids)
+        return True
+
+    def measure(self, data, ax, v):
+        """
+
+            Move axis to given position and run child events.
+
+            Parameters:
+                data    -    measurement (Measurement)
+                ax      -    axis device (AxisDevice)
+                v       -    position (float)
+
+        """
+        ax.goTo(v)
+        while (ax.get_motion_status() != 0 and self.can_run):
+            sleep(0.01)
+        data.SetCoordinateValue(self.m_ids, ax.pos()) # read axis position
+        self.run_children(data)
+
+    def insert_point(self, data, ax, arrays, grid, v):
+        """
+
+            Measure new point, keeping data arrays sorted by position.
+
+            Parameters:
+                data    -    measurement (Measurement)
+                ax      -    axis device (AxisDevice)
+                arrays  -    data arrays filled by this event (list of DataArray)
+                grid    -    sorted list of already measured positions (list of float)
+                v       -    position (float)
+
+        """
+        n = len(grid)
+        pos = int(np.searchsorted(grid,v))
+        if pos<n:
+            # shift following points by one to make room for the new one
+            for arr in arrays:
+                d = arr.scanDim
+                row = tuple(arr.idx[:d])
+                arr.data[row + (slice(pos+1,n+1),)] = arr.data[row + (slice(pos,n),)].copy()
+                arr.data[row + (pos,)] = np.nan
+                arr.coords[d][pos+1:n+1] = arr.coords[d][pos:n].copy()
+                if self.has_timestamps(arr):
+                    arr.timestamps[row + (slice(pos+1,n+1),)] = arr.timestamps[row + (slice(pos,n),)].copy()
+                    arr.timestamps[row + (pos,)] = np.nan
+        grid.insert(pos,v)
+        data.SetScanPosition(self.m_ids, pos)
+        self.measure(data, ax, v)
+
+    def has_timestamps(self, arr):
+        """
+
+            Tell whether given array records acquisition times (see ConcurrentRead).
+
+            Parameters:
+                arr    -    data array (DataArray)
+
+            Output:
+                True/False
+
+        """
+        return arr.timestamps is not None and list(arr.timestamps.shape)==list(arr.shape)
+
+    def get_row(self, arr):
+        """
+
+            Return index of current row along scanned dimension of given array.
+
+            Parameters:
+                arr    -    data array (DataArray)
+
+            Output:
+                index (tuple)
+
+        """
+        return tuple(arr.idx[:arr.scanDim]) + (slice(None),)
+
+    def get_losses(self, arrays, grid):
+        """
+
+            Compute refinement criterion for each interval of given grid.
+
+            The criterion is the largest of the relative signal step over the
+            interval and the relative deviation of its end points from a linear
+            interpolation between their neighbours.
+
+            Parameters:
+                arrays  -    data arrays filled by this event (list of DataArray)
+                grid    -    sorted list of measured positions (list of float)
+
+            Output:
+                interval criteria (numpy array)
+
+        """
+        n = len(grid)
+        x = np.array(grid)
+        if n<2:
+            return np.zeros(0)
+        cols = [np.real(np.reshape(arr.data[self.get_row(arr)][:n],(n,-1))) for arr in arrays]
+        if len(cols)==0:
+            return np.zeros(n-1)
+        y = np.hstack(cols)
+        y = y[:,np.isfinite(y).any(axis=0)]
+        if y.shape[1]==0:
+            return np.zeros(n-1)
+        ymin = np.nanmin(y,axis=0)
+        rng = np.nanmax(y,axis=0) - ymin
+        rng[rng==0] = 1.0
+        y = np.nan_to_num((y-ymin)/rng)
+
+        dx = np.diff(x)
+        # signal step
+        loss = np.abs(np.diff(y,axis=0)).max(axis=1)
+        # curvature
+        if n>2:
+            w = ((x[1:-1]-x[:-2])/(x[2:]-x[:-2]))[:,np.newaxis]
+            dev = np.abs(y[1:-1] - y[:-2] - (y[2:]-y[:-2])*w).max(axis=1)
+            dev = np.concatenate(([0.0],dev,[0.0]))
+            loss = np.maximum(loss,np.maximum(dev[:-1],dev[1:]))
+        # don't split intervals below minimum step
+        loss[dx<max(2*self.dv,0.0)] = 0.0
+        loss[dx<=0] = 0.0
+        return loss
+
+    def set(self, parent=None):
+        self.refresh()
+        dlg = AdaptiveScanDialog(parent, axlist=[x.name for x in self.axlist], axis=self.axis, vmin=self.min, vmax=self.max, N=self.N, N0=self.N0, tol=self.tol, dv=self.dv)
+        if dlg.ShowModal() == wx.ID_OK:
+            self.axis,self.min,self.max,self.N,self.N0,self.tol,self.dv = dlg.GetValue()
+            dlg.Destroy()
+            return True
+        else:
+            dlg.Destroy()
+            return False
+
+    def populate(self):
+        try:
+            self.propNodes = [self.axlist[self.axis].name, self.min, self.max, self.N, self.N0, self.tol, self.dv]
+        except:
+            self.propNodes = ["", self.min, self.max, self.N, self.N0, self.tol, self.dv]
+        self.create_property_root()
+        self.set_property_nodes(True)
+
+    def set_property(self, pos, val):
+        try:
+            if pos==0:
+                self.axis = int(val)
+            elif pos==1:
+                self.min = float(val)
+                if self.max==self.min:
+                    self.min = self.max - 1.0
+            elif pos==2:
+                self.max = float(val)
+                if self.max==self.min:
+                    self.max = self.min + 1.0
+            elif pos==3:
+                self.N = int(val)
+                if self.N<2:
+                    self.N = 2
+            elif pos==4:
+                self.N0 = int(val)
+                if self.N0<2:
+                    self.N0 = 2
+            elif pos==5:
+                self.tol = abs(float(val))
+            elif pos==6:
+                self.dv = abs(float(val))
+        except:
+            pass
+        self.propNodes = [self.axlist[self.axis].name, self.min, self.max, self.N, self.N0, self.tol, self.dv]
+        self.set_property_nodes()
+
+class AdaptiveScanDialog(wx.Dialog):
+    """
+
+        Adaptive scan event configuration dialog
+
+    """
+    def __init__(self, parent = None, title="Adaptive scan properties", axlist = [], axis = 0, vmin = 0.0, vmax = 25.6, N=257, N0=33, tol=0.02, dv = 0.01):
+        """
+
+            Initialization.
+
+            Parameters:
+                parent    -    parent window (wx.Window)
+                title     -    dialog title (str)
+                axlist    -    list of axis devices (list of str)
+                axis      -    default selection (int)
+                vmin      -    start value (float)
+                vmax      -    end value (float)
+                N         -    maximum number of points (int)
+                N0        -    number of points of coarse pass (int)
+                tol       -    relative tolerance (float)
+                dv        -    minimum step size (float)
+
+        """
+        wx.Dialog.__init__(self, parent, title=title,style=wx.DEFAULT_DIALOG_STYLE)
+        self.label_axis = wx.StaticText(self, -1, "Axis")
+        self.choice_axis = wx.Choice(self, -1, choices=axlist)
+        self.label_min = wx.StaticText(self, -1, "Minimum:")
+        self.input_min = wx.TextCtrl(self, -1, str(vmin))
+        self.label_max = wx.StaticText(self, -1, "Maximum:")
+        self.input_max = wx.TextCtrl(self, -1, str(vmax))
+        self.label_N = wx.StaticText(self, -1, "Maximum number of points:")
+        self.input_N = wx.TextCtrl(self, -1, str(N))
+        self.label_N0 = wx.StaticText(self, -1, "Number of points in coarse pass:")
+        self.input_N0 = wx.TextCtrl(self, -1, str(N0))
+        self.label_tol = wx.StaticText(self, -1, "Relative tolerance:")
+        self.input_tol = wx.TextCtrl(self, -1, str(tol))
+        self.label_dv = wx.StaticText(self, -1, "Minimum step size:")
+        self.input_dv = wx.TextCtrl(self, -1, str(dv))
+        self.button_OK = wx.Button(self, wx.ID_OK)
+        self.button_Cancel = wx.Button(self, wx.ID_CANCEL)
+
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        hbox.AddStretchSpacer(1)
+        hbox.Add(self.button_Cancel, 0, wx.RIGHT|wx.ALIGN_RIGHT, 5)
+        hbox.Add(self.button_OK, 0, wx.RIGHT|wx.ALIGN_RIGHT, 5)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.label_axis, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.choice_axis, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_min, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_min, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_max, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_max, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_N, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_N, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_N0, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_N0, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_tol, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_tol, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.label_dv, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(self.input_dv, 0, wx.ALL|wx.EXPAND, 2)
+        sizer.Add(hbox, 0, wx.ALL|wx.EXPAND, 2)
+        self.SetSizer(sizer)
+        self.Fit()
+        self.choice_axis.SetSelection(axis)
+
+    def GetValue(self):
+        """
+
+            Return dialog values.
+
+            Output:
+                selected axis device index, start value (float), end value (float), maximum number of points (int), number of coarse points (int), relative tolerance (float), minimum step size (float)
+
+        """
+        vmin = float(self.input_min.GetValue())
+        vmax = float(self.input_max.GetValue())
+        if vmax==vmin:
+            vmax = vmin + 1.0
+        N = max(2,int(self.input_N.GetValue()))
+        N0 = max(2,int(self.input_N0.GetValue()))
+        return self.choice_axis.GetSelection(), vmin, vmax, N, N0, abs(float(self.input_tol.GetValue())), abs(float(self.input_dv.GetValue()))